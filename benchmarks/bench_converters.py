@@ -0,0 +1,148 @@
+"""Micro-benchmarks for the text protocol temporal and decimal converters.
+
+For each converter the fast path (fixed layout, parsed by slicing or
+``fromisoformat``) is timed against the regex path it falls back to, which is
+what every value went through before. Two result-set level numbers follow:
+decoding a column of repeated timestamps with and without per-result interning,
+and serializing rows to JSON from datetime objects versus from the raw strings
+``converters.raw_temporal_conversions`` leaves in place.
+
+    python benchmarks/bench_converters.py [calls] [repeat]
+"""
+
+import datetime
+import json
+import os
+import sys
+import timeit
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from pymysql import converters  # noqa: E402
+from pymysql.connections import _interning  # noqa: E402
+
+
+def regex_datetime(obj):
+    m = converters.DATETIME_RE.match(obj)
+    groups = list(m.groups())
+    groups[-1] = converters._convert_second_fraction(groups[-1])
+    return datetime.datetime(*[int(x) for x in groups])
+
+
+def regex_timedelta(obj):
+    m = converters.TIMEDELTA_RE.match(obj)
+    groups = list(m.groups())
+    groups[-1] = converters._convert_second_fraction(groups[-1])
+    negate = -1 if groups[0] else 1
+    hours, minutes, seconds, microseconds = groups[1:]
+    return (
+        datetime.timedelta(
+            hours=int(hours),
+            minutes=int(minutes),
+            seconds=int(seconds),
+            microseconds=int(microseconds),
+        )
+        * negate
+    )
+
+
+def split_date(obj):
+    return datetime.date(*[int(x) for x in obj.split("-", 2)])
+
+
+CASES = [
+    # (label, fast, previous, value)
+    ("DATETIME", converters.convert_datetime, regex_datetime, "2024-05-06 07:08:09"),
+    (
+        "DATETIME(6)",
+        converters.convert_datetime,
+        regex_datetime,
+        "2024-05-06 07:08:09.123456",
+    ),
+    ("DATE", converters.convert_date, split_date, "2024-05-06"),
+    ("TIME", converters.convert_timedelta, regex_timedelta, "07:08:09"),
+    ("DECIMAL", Decimal, None, "12345.6789"),
+]
+
+
+def best_per_call(fn, calls, repeat):
+    return min(timeit.repeat(fn, number=calls, repeat=repeat)) / calls
+
+
+def json_default(o):
+    # Same as lambda_function._json_default for temporals
+    return o.isoformat(sep=" ", timespec="seconds")
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print(f"calls={calls} repeat={repeat} (best of repeat)")
+    print(f"{'converter':<12} {'fast':>10} {'previous':>10}")
+    for label, fast, previous, value in CASES:
+        t_fast = best_per_call(lambda: fast(value), calls, repeat)
+        if previous is None:
+            print(f"{label:<12} {t_fast * 1e9:7.0f} ns {'-':>10}")
+            continue
+        assert fast(value) == previous(value), label
+        t_prev = best_per_call(lambda: previous(value), calls, repeat)
+        print(
+            f"{label:<12} {t_fast * 1e9:7.0f} ns {t_prev * 1e9:7.0f} ns "
+            f"({t_prev / t_fast:.2f}x)"
+        )
+
+    # 1000 rows, created_at/updated_at drawn from 50 distinct timestamps (bulk
+    # inserts share NOW()), decoded through one converter per column pair.
+    base = datetime.datetime(2024, 5, 6, 7, 8, 9)
+    stamps = [str(base + datetime.timedelta(seconds=i % 50)) for i in range(1000)]
+    rows = list(zip(stamps, stamps))
+    rows_calls = max(calls // 1000, 10)
+
+    def decode(convert):
+        return [(convert(a), convert(b)) for a, b in rows]
+
+    plain = best_per_call(
+        lambda: decode(converters.convert_datetime), rows_calls, repeat
+    )
+    interned = best_per_call(
+        lambda: decode(_interning(converters.convert_datetime, {})),
+        rows_calls,
+        repeat,
+    )
+    print()
+    print("decode 1000 rows x 2 DATETIME columns (50 distinct values)")
+    print(f"  per value      {plain * 1e6:8.1f} us/result")
+    print(f"  interned       {interned * 1e6:8.1f} us/result ({plain / interned:.2f}x)")
+
+    objects = decode(converters.convert_datetime)
+    as_dicts = [{"createdAt": a, "updatedAt": b} for a, b in objects]
+    raw_dicts = [{"createdAt": a, "updatedAt": b} for a, b in rows]
+    assert json.dumps(as_dicts, default=json_default) == json.dumps(raw_dicts)
+    dump_objects = best_per_call(
+        lambda: json.dumps(
+            [
+                {"createdAt": a, "updatedAt": b}
+                for a, b in decode(converters.convert_datetime)
+            ],
+            default=json_default,
+        ),
+        rows_calls,
+        repeat,
+    )
+    dump_raw = best_per_call(
+        lambda: json.dumps([{"createdAt": a, "updatedAt": b} for a, b in rows]),
+        rows_calls,
+        repeat,
+    )
+    print("decode + json.dumps, same rows")
+    print(f"  datetime       {dump_objects * 1e6:8.1f} us/result")
+    print(
+        f"  raw strings    {dump_raw * 1e6:8.1f} us/result "
+        f"({dump_objects / dump_raw:.2f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
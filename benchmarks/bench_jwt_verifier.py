@@ -0,0 +1,68 @@
+"""Benchmark jwt.Verifier against jwt.decode.
+
+Both decode the same HS256 token with the options require_auth uses
+(``require: [exp, iat, sub]``). ``jwt.decode`` merges options, resolves the
+algorithm, prepares the key and dispatches every claim check on each call;
+``Verifier.verify`` only does the per-token work. The difference per call is
+the fixed overhead removed by precompiling.
+
+    python benchmarks/bench_jwt_verifier.py [calls] [repeat]
+"""
+
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import jwt  # noqa: E402
+
+SECRET = "benchmark-secret-0123456789abcdef"
+ALGORITHMS = ["HS256"]
+OPTIONS = {"require": ["exp", "iat", "sub"]}
+
+
+def make_token():
+    now = int(time.time())
+    return jwt.encode(
+        {"sub": "1234", "iat": now, "exp": now + 3600, "name": "나눔 복지관"},
+        SECRET,
+        algorithm="HS256",
+    )
+
+
+def best_per_call(fn, calls, repeat):
+    return min(timeit.repeat(fn, number=calls, repeat=repeat)) / calls
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    token = make_token()
+    verifier = jwt.Verifier(SECRET, ALGORITHMS, OPTIONS)
+    assert verifier.verify(token) == jwt.decode(
+        token, SECRET, algorithms=ALGORITHMS, options=OPTIONS
+    )
+
+    decode = best_per_call(
+        lambda: jwt.decode(token, SECRET, algorithms=ALGORITHMS, options=OPTIONS),
+        calls,
+        repeat,
+    )
+    verify = best_per_call(lambda: verifier.verify(token), calls, repeat)
+    build = best_per_call(
+        lambda: jwt.Verifier(SECRET, ALGORITHMS, OPTIONS), calls // 10, repeat
+    )
+
+    print(f"calls={calls} repeat={repeat} (best of repeat)")
+    print(f"jwt.decode        {decode * 1e6:8.2f} us/call")
+    print(f"Verifier.verify   {verify * 1e6:8.2f} us/call")
+    print(f"overhead removed  {(decode - verify) * 1e6:8.2f} us/call "
+          f"({decode / verify:.2f}x)")
+    print(f"Verifier()        {build * 1e6:8.2f} us (one-time)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark the cost of connection observers.
+
+Reads the synthetic ``nm_targets`` result set from ``bench_packet_reader``
+over a local socketpair three ways: with no observer registered, with a no-op
+``ConnectionObserver`` and with one that aggregates ``ResultStats`` and
+fingerprints the statement, as the Lambda's per-invocation observer does. A
+small result set shows the fixed per-result cost, a large one the per-row and
+per-recv cost.
+
+    python benchmarks/bench_observers.py [rows] [repeat]
+"""
+
+import os
+import select
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_packet_reader import build_result_set, _connection  # noqa: E402
+from pymysql import connections  # noqa: E402
+from pymysql.observers import ConnectionObserver, fingerprint  # noqa: E402
+
+SQL = (
+    b"SELECT t.target_id, t.target_name FROM nm_targets t "
+    b"JOIN nm_groups g ON g.group_id = t.group_id "
+    b"WHERE g.org_id = '1234' AND t.group_id = 5 AND t.is_deleted = 0"
+)
+
+
+class Aggregating(ConnectionObserver):
+    def __init__(self):
+        self.by_sql = {}
+
+    def after_result(self, conn, sql, stats, error):
+        entry = self.by_sql.setdefault(fingerprint(sql), [0, 0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += stats.rows
+        entry[2] += stats.wait + stats.transfer
+        entry[3] += stats.decode
+
+
+def read_once(data, rows, observer):
+    conn = _connection(connections.Connection, data)
+    if observer is not None:
+        conn.add_observer(observer)
+        conn._observed_sql = SQL
+    select.select([conn._sock], [], [])
+    start = time.perf_counter()
+    conn._read_query_result()
+    elapsed = time.perf_counter() - start
+    assert len(conn._result.rows) == rows
+    conn._sock.close()
+    return elapsed
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    variants = (
+        ("none", None),
+        ("no-op", ConnectionObserver()),
+        ("aggregating", Aggregating()),
+    )
+    for n in (10, rows):
+        data = build_result_set(n)
+        print(f"{n} rows x 13 columns, {len(data) / 1024:.0f} KiB on the wire")
+        # Interleaved so drift affects every variant alike; best of *repeat*.
+        best = {}
+        for _ in range(repeat):
+            for name, observer in variants:
+                elapsed = read_once(data, n, observer)
+                best[name] = min(best.get(name, elapsed), elapsed)
+        for name, _ in variants:
+            print(
+                f"  {name:<12}{best[name] * 1e6:10.1f} us/result "
+                f"({(best[name] / best['none'] - 1) * 100:+.1f}%)"
+            )
+
+
+if __name__ == "__main__":
+    main()
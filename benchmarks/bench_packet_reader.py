@@ -0,0 +1,225 @@
+"""Benchmark the pymysql result set reader.
+
+Compares the current reader (recv_into into a reusable buffer, rows decoded
+straight from memoryview slices) with the PyMySQL 1.1.2 reader it replaced
+(makefile().read(), bytearray concatenation, MysqlPacket per row and a bytes
+slice per column).
+
+A synthetic ``nm_targets`` style result set (13 columns, Korean TEXT) is
+sent over a local socketpair, so the measurement is client-side reading and
+parsing without network latency.
+
+    python benchmarks/bench_packet_reader.py [rows] [repeat]
+"""
+
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from pymysql import connections  # noqa: E402
+from pymysql.constants import FIELD_TYPE  # noqa: E402
+from pymysql.protocol import MysqlPacket  # noqa: E402
+
+COLUMNS = [
+    ("target_id", FIELD_TYPE.LONGLONG),
+    ("target_name", FIELD_TYPE.VAR_STRING),
+    ("target_type", FIELD_TYPE.VAR_STRING),
+    ("target_gubun", FIELD_TYPE.VAR_STRING),
+    ("zipcode", FIELD_TYPE.VAR_STRING),
+    ("address1", FIELD_TYPE.VAR_STRING),
+    ("address2", FIELD_TYPE.VAR_STRING),
+    ("mobile_phone", FIELD_TYPE.VAR_STRING),
+    ("office_phone", FIELD_TYPE.VAR_STRING),
+    ("apply_reason", FIELD_TYPE.BLOB),
+    ("directions", FIELD_TYPE.BLOB),
+    ("created_at", FIELD_TYPE.DATETIME),
+    ("updated_at", FIELD_TYPE.DATETIME),
+]
+
+
+def _lenenc(value):
+    if value is None:
+        return b"\xfb"
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return connections._lenenc_int(len(value)) + value
+
+
+class _PacketWriter:
+    def __init__(self):
+        self.out = bytearray()
+        self.seq = 1
+
+    def add(self, payload):
+        self.out += struct.pack("<I", len(payload))[:3] + bytes([self.seq]) + payload
+        self.seq = (self.seq + 1) % 256
+
+
+def build_result_set(rows):
+    w = _PacketWriter()
+    w.add(_lenenc_int_bytes(len(COLUMNS)))
+    for name, type_code in COLUMNS:
+        w.add(
+            b"".join(_lenenc(s) for s in ("def", "nanum", "t", "nm_targets", name, name))
+            + b"\x0c"
+            + struct.pack("<HIBHBxx", 45, 1020, type_code, 0, 0)
+        )
+    eof = b"\xfe\x00\x00\x02\x00"
+    w.add(eof)
+    for i in range(rows):
+        w.add(
+            b"".join(
+                _lenenc(v)
+                for v in (
+                    str(i + 1),
+                    "홍길동%d" % i,
+                    "일반",
+                    "독거" if i % 3 else None,
+                    "03045",
+                    "서울특별시 종로구 세종대로 %d" % i,
+                    "%d동 %d호" % (i % 20, i % 700),
+                    "01012345678",
+                    None,
+                    "거동이 불편하여 방문 지원이 필요합니다. " * 3,
+                    "지하철 3호선 경복궁역 4번 출구에서 도보 5분",
+                    "2024-05-06 07:08:09",
+                    "2024-05-06 07:08:09",
+                )
+            )
+        )
+    w.add(eof)
+    return bytes(w.out)
+
+
+def _lenenc_int_bytes(n):
+    return connections._lenenc_int(n)
+
+
+def _serve(data):
+    """Return the client end of a socketpair that receives *data*."""
+    client, server = socket.socketpair()
+
+    def send():
+        with server:
+            server.sendall(data)
+
+    threading.Thread(target=send, daemon=True).start()
+    return client
+
+
+class LegacyResult(connections.MySQLResult):
+    """Row reading as in PyMySQL 1.1.2."""
+
+    def _read_rowdata_packet(self):
+        rows = []
+        while True:
+            packet = self.connection._read_packet()
+            if self._check_packet_is_eof(packet):
+                self.connection = None
+                break
+            rows.append(self._read_row_from_packet(packet))
+        self.affected_rows = len(rows)
+        self.rows = tuple(rows)
+
+    def _read_row_from_packet(self, packet):
+        row = []
+        for encoding, converter in self.converters:
+            try:
+                data = packet.read_length_coded_string()
+            except IndexError:
+                break
+            if data is not None:
+                if encoding is not None:
+                    data = data.decode(encoding)
+                if converter is not None:
+                    data = converter(data)
+            row.append(data)
+        return tuple(row)
+
+
+class LegacyConnection(connections.Connection):
+    """Packet reading as in PyMySQL 1.1.2 (``makefile().read()``)."""
+
+    def _legacy_read_bytes(self, num_bytes):
+        self._sock.settimeout(self._read_timeout)
+        return self._rfile.read(num_bytes)
+
+    def _read_packet(self, packet_type=MysqlPacket):
+        buff = bytearray()
+        while True:
+            packet_header = self._legacy_read_bytes(4)
+            btrl, btrh, packet_number = struct.unpack("<HBB", packet_header)
+            bytes_to_read = btrl + (btrh << 16)
+            self._next_seq_id = (self._next_seq_id + 1) % 256
+            buff += self._legacy_read_bytes(bytes_to_read)
+            if bytes_to_read < connections.MAX_PACKET_LEN:
+                break
+        packet = packet_type(bytes(buff), self.encoding)
+        if packet.is_error_packet():
+            packet.raise_for_error()
+        return packet
+
+    def _read_query_result(self, unbuffered=False, binary=False):
+        result = LegacyResult(self)
+        result.read()
+        self._result = result
+        return result.affected_rows
+
+
+def _connection(cls, data):
+    conn = cls(defer_connect=True, user="bench", read_timeout=30)
+    sock = _serve(data)
+    conn._sock = sock
+    conn._reset_recv_buffer()
+    conn._rfile = sock.makefile("rb")
+    conn._next_seq_id = 1
+    return conn
+
+
+def run(cls, data, rows, repeat):
+    best = None
+    for _ in range(repeat):
+        conn = _connection(cls, data)
+        start = time.perf_counter()
+        conn._read_query_result()
+        elapsed = time.perf_counter() - start
+        assert len(conn._result.rows) == rows
+        conn._sock.close()
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Memory: blocks still allocated after the read (the result) and the
+    # peak working memory above that (receive buffers and per-row temporaries).
+    conn = _connection(cls, data)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    conn._read_query_result()
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    conn._sock.close()
+    retained = sum(s.count_diff for s in after.compare_to(before, "filename"))
+    return rows / best, peak - current, retained
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    data = build_result_set(rows)
+    print(f"{rows} rows x {len(COLUMNS)} columns, {len(data) / 1024 / 1024:.1f} MiB on the wire")
+    print(f"{'reader':<10}{'rows/sec':>12}{'working KiB':>14}{'retained blocks':>18}")
+    results = {}
+    for name, cls in (("legacy", LegacyConnection), ("current", connections.Connection)):
+        rate, peak, blocks = run(cls, data, rows, repeat)
+        results[name] = rate
+        print(f"{name:<10}{rate:>12,.0f}{peak / 1024:>14,.0f}{blocks:>18,}")
+    print(f"speedup: {results['current'] / results['legacy']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
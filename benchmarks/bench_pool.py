@@ -0,0 +1,228 @@
+"""Stress benchmark for pymysql.pool.ConnectionPool.
+
+Runs a threaded MySQL protocol stand-in on localhost (handshake, COM_QUERY
+returning a one-row result set, COM_PING, COM_QUIT) and drives it from many
+client threads, each doing "acquire, SELECT, release" in a loop. The same load
+is also run with a new connection per request for comparison.
+
+The stand-in adds a fixed delay to the handshake (``--connect-ms``) and to
+each query (``--query-ms``) to stand in for network and server time, and can
+close a fraction of connections after answering a query (``--drop``). A
+dropped connection fails its next query unless the pool health checks it
+first (``--ping-interval``); either way the pool replaces it and counts it as
+``recycled_error``.
+
+    python benchmarks/bench_pool.py [--threads 32] [--requests 200] [--max-size 8]
+"""
+
+import argparse
+import os
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pymysql  # noqa: E402
+from pymysql.pool import ConnectionPool  # noqa: E402
+
+
+def _lenenc_str(b):
+    return bytes([len(b)]) + b
+
+
+class StandInServer:
+    """Just enough of the server side of the protocol for a SELECT 1 loop."""
+
+    def __init__(self, connect_delay, query_delay, drop_rate):
+        self.connect_delay = connect_delay
+        self.query_delay = query_delay
+        self.drop_rate = drop_rate
+        self.connections = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self.listener = socket.socket()
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(256)
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except OSError:
+                return
+            with self._lock:
+                self.connections += 1
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+
+    @staticmethod
+    def _send(sock, seq, payload):
+        sock.sendall(struct.pack("<I", len(payload))[:3] + bytes([seq]) + payload)
+        return seq + 1
+
+    @staticmethod
+    def _recv(rfile):
+        header = rfile.read(4)
+        if len(header) < 4:
+            return None
+        return rfile.read(header[0] | header[1] << 8 | header[2] << 16)
+
+    def _ok(self, sock, seq, status):
+        return self._send(sock, seq, b"\x00\x00\x00" + struct.pack("<HH", status, 0))
+
+    def _serve(self, sock):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        rfile = sock.makefile("rb")
+        try:
+            time.sleep(self.connect_delay)
+            caps = 0xFFFFFFFF & ~(1 << 11) & ~(1 << 5)  # no SSL, no compression
+            salt = b"12345678abcdefghijkl"
+            greeting = (
+                b"\x0a8.0.0-standin\x00"
+                + struct.pack("<I", 1)
+                + salt[:8]
+                + b"\x00"
+                + struct.pack("<HBHHB", caps & 0xFFFF, 45, 2, caps >> 16, 21)
+                + b"\x00" * 10
+                + salt[8:]
+                + b"\x00mysql_native_password\x00"
+            )
+            self._send(sock, 0, greeting)
+            self._recv(rfile)
+            status = 0x0002  # SERVER_STATUS_AUTOCOMMIT
+            self._ok(sock, 2, status)
+            while True:
+                packet = self._recv(rfile)
+                if not packet or packet[0] == 0x01:  # COM_QUIT
+                    return
+                query = packet[1:].upper()
+                if packet[0] == 0x03 and query.startswith(b"SET AUTOCOMMIT"):
+                    status = 0x0002 if query.endswith(b"1") else 0
+                    self._ok(sock, 1, status)
+                elif packet[0] == 0x03 and query.startswith(b"SELECT"):
+                    time.sleep(self.query_delay)
+                    seq = self._send(sock, 1, b"\x01")
+                    seq = self._send(
+                        sock,
+                        seq,
+                        _lenenc_str(b"def") + b"\x00" * 3 + _lenenc_str(b"1")
+                        + b"\x00\x0c" + struct.pack("<HIBHBxx", 63, 1, 8, 0, 0),
+                    )
+                    eof = b"\xfe\x00\x00" + struct.pack("<H", status)
+                    seq = self._send(sock, seq, eof)
+                    seq = self._send(sock, seq, b"\x011")
+                    self._send(sock, seq, eof)
+                    if self.drop_rate and random.random() < self.drop_rate:
+                        with self._lock:
+                            self.dropped += 1
+                        return
+                else:
+                    self._ok(sock, 1, status)
+        except OSError:
+            pass
+        finally:
+            sock.close()
+
+
+def run(label, threads, requests, work):
+    errors = []
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        local = []
+        for _ in range(requests):
+            t0 = time.perf_counter()
+            try:
+                work()
+            except pymysql.err.Error as e:
+                with lock:
+                    errors.append(e)
+            local.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(local)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    n = len(latencies)
+    print(
+        f"{label:<22} {n / elapsed:9.0f} req/s  "
+        f"p50 {latencies[n // 2] * 1e3:6.2f} ms  "
+        f"p99 {latencies[int(n * 0.99)] * 1e3:7.2f} ms  errors {len(errors)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--max-size", type=int, default=8)
+    parser.add_argument("--connect-ms", type=float, default=5.0)
+    parser.add_argument("--query-ms", type=float, default=1.0)
+    parser.add_argument("--drop", type=float, default=0.01)
+    parser.add_argument("--ping-interval", type=float, default=None)
+    args = parser.parse_args()
+
+    server = StandInServer(args.connect_ms / 1e3, args.query_ms / 1e3, args.drop)
+    connect_kwargs = dict(
+        host="127.0.0.1", port=server.port, user="bench", password="bench"
+    )
+    print(
+        f"threads={args.threads} requests/thread={args.requests} "
+        f"connect={args.connect_ms}ms query={args.query_ms}ms drop={args.drop} "
+        f"ping_interval={args.ping_interval}"
+    )
+
+    def per_request():
+        conn = pymysql.connect(**connect_kwargs)
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+                cur.fetchall()
+        finally:
+            conn.close()
+
+    before = server.connections
+    run("connect per request", args.threads, args.requests, per_request)
+    print(f"{'':<22} server connections: {server.connections - before}")
+
+    pool = ConnectionPool(
+        min_size=2,
+        max_size=args.max_size,
+        ping_interval=args.ping_interval,
+        **connect_kwargs,
+    )
+
+    def pooled():
+        with pool.connection(timeout=30) as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+                cur.fetchall()
+
+    before, dropped = server.connections, server.dropped
+    run(f"pool (max_size={args.max_size})", args.threads, args.requests, pooled)
+    stats = pool.stats()
+    print(f"{'':<22} server connections: {server.connections - before}")
+    print(
+        f"{'':<22} wait avg {stats['wait_avg'] * 1e3:.2f} ms, "
+        f"max {stats['wait_max'] * 1e3:.2f} ms, in_use {stats['in_use']}, "
+        f"created {stats['created']}, recycled_error {stats['recycled_error']} "
+        f"(server dropped {server.dropped - dropped})"
+    )
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,7 @@ from .exceptions import (
     PyJWTError,
 )
 from .jwks_client import PyJWKClient
+from .verifier import DecodeResult, Verifier, decode_many
 
 __version__ = "2.10.1"
 
@@ -48,8 +49,11 @@ __all__ = [
     "PyJWKClient",
     "PyJWK",
     "PyJWKSet",
+    "Verifier",
+    "DecodeResult",
     "decode",
     "decode_complete",
+    "decode_many",
     "encode",
     "get_unverified_header",
     "register_algorithm",
@@ -1,5 +1,7 @@
+import threading
 import time
-from typing import Optional
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
 
 from .api_jwk import PyJWKSet, PyJWTSetWithTimestamp
 
@@ -29,3 +31,43 @@ class JWKSetCache:
             and time.monotonic()
             > self.jwk_set_with_timestamp.get_timestamp() + self.lifespan
         )
+
+
+class UnknownKidCache:
+    """Negative cache for key IDs that were missing from a freshly fetched JWK Set.
+
+    A kid that is still unknown after a refresh is not refetched for
+    ``backoff`` seconds; each further miss doubles the wait up to
+    ``max_backoff``. At most ``maxsize`` kids are remembered (oldest first out),
+    so a stream of random kids cannot grow it without bound.
+    """
+
+    def __init__(self, backoff: float, max_backoff: float, maxsize: int = 1024) -> None:
+        self.backoff = backoff
+        self.max_backoff = max(backoff, max_backoff)
+        self.maxsize = maxsize
+        # kid -> (monotonic time the kid may be retried, current delay)
+        self._entries: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def is_blocked(self, kid: Hashable) -> bool:
+        entry = self._entries.get(kid)
+        return entry is not None and time.monotonic() < entry[0]
+
+    def add(self, kid: Hashable) -> None:
+        if self.backoff <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            previous = self._entries.pop(kid, None)
+            delay = (
+                self.backoff
+                if previous is None
+                else min(previous[1] * 2, self.max_backoff)
+            )
+            self._entries[kid] = (time.monotonic() + delay, delay)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, kid: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(kid, None)
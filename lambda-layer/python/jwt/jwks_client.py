@@ -1,14 +1,19 @@
 import json
+import threading
 import urllib.request
+from concurrent.futures import Future
 from functools import lru_cache
 from ssl import SSLContext
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.error import URLError
 
 from .api_jwk import PyJWK, PyJWKSet
 from .api_jwt import decode_complete as decode_token
 from .exceptions import PyJWKClientConnectionError, PyJWKClientError
-from .jwk_set_cache import JWKSetCache
+from .jwk_set_cache import JWKSetCache, UnknownKidCache
+
+# (raw JWKS data, parsed set, signing keys by kid)
+_ParsedJWKSet = Tuple[Any, PyJWKSet, Dict[str, PyJWK]]
 
 
 class PyJWKClient:
@@ -22,6 +27,9 @@ class PyJWKClient:
         headers: Optional[Dict[str, Any]] = None,
         timeout: int = 30,
         ssl_context: Optional[SSLContext] = None,
+        stale_while_revalidate: bool = True,
+        unknown_kid_backoff: float = 30,
+        max_unknown_kid_backoff: float = 300,
     ):
         if headers is None:
             headers = {}
@@ -30,6 +38,18 @@ class PyJWKClient:
         self.headers = headers
         self.timeout = timeout
         self.ssl_context = ssl_context
+        # Once the cached JWK Set expires, keep serving it while one
+        # background fetch replaces it, instead of blocking every caller.
+        self.stale_while_revalidate = stale_while_revalidate
+        self.unknown_kids = UnknownKidCache(
+            unknown_kid_backoff, max_unknown_kid_backoff
+        )
+
+        self._refresh_lock = threading.Lock()
+        self._refresh_future: Optional["Future[_ParsedJWKSet]"] = None
+        # Parsed form of the JWKS data last seen in the cache, so keys are
+        # parsed and indexed by kid once per fetch rather than once per call.
+        self._parsed: Optional[_ParsedJWKSet] = None
 
         if cache_jwk_set:
             # Init jwt set cache with default or given lifespan.
@@ -49,36 +69,98 @@ class PyJWKClient:
                 self.get_signing_key
             )  # type: ignore
 
-    def fetch_data(self) -> Any:
-        jwk_set: Any = None
+    def _request_data(self) -> Any:
         try:
             r = urllib.request.Request(url=self.uri, headers=self.headers)
             with urllib.request.urlopen(
                 r, timeout=self.timeout, context=self.ssl_context
             ) as response:
-                jwk_set = json.load(response)
+                return json.load(response)
         except (URLError, TimeoutError) as e:
             raise PyJWKClientConnectionError(
                 f'Fail to fetch data from the url, err: "{e}"'
             ) from e
-        else:
+
+    def fetch_data(self) -> Any:
+        jwk_set: Any = None
+        try:
+            jwk_set = self._request_data()
             return jwk_set
         finally:
             if self.jwk_set_cache is not None:
                 self.jwk_set_cache.put(jwk_set)
 
-    def get_jwk_set(self, refresh: bool = False) -> PyJWKSet:
-        data = None
-        if self.jwk_set_cache is not None and not refresh:
-            data = self.jwk_set_cache.get()
-
-        if data is None:
-            data = self.fetch_data()
+    def _parse(self, data: Any) -> _ParsedJWKSet:
+        parsed = self._parsed
+        if parsed is not None and parsed[0] is data:
+            return parsed
 
         if not isinstance(data, dict):
             raise PyJWKClientError("The JWKS endpoint did not return a JSON object")
 
-        return PyJWKSet.from_dict(data)
+        jwk_set = PyJWKSet.from_dict(data)
+        by_kid: Dict[str, PyJWK] = {}
+        for key in jwk_set.keys:
+            if key.public_key_use in ["sig", None] and key.key_id:
+                by_kid.setdefault(key.key_id, key)
+        parsed = self._parsed = (data, jwk_set, by_kid)
+        return parsed
+
+    def _run_refresh(self, future: "Future[_ParsedJWKSet]") -> None:
+        try:
+            data = self._request_data()
+            parsed = self._parse(data)
+        except BaseException as e:
+            # The stale set (if any) stays cached; the next expired read retries.
+            with self._refresh_lock:
+                self._refresh_future = None
+            future.set_exception(e)
+        else:
+            if self.jwk_set_cache is not None:
+                self.jwk_set_cache.put(data)
+            with self._refresh_lock:
+                self._refresh_future = None
+            future.set_result(parsed)
+
+    def _refresh(self, background: bool = False) -> "Future[_ParsedJWKSet]":
+        """Start a JWKS fetch, or join the one already in flight.
+
+        Concurrent callers share a single request. With ``background`` the
+        fetch runs in a daemon thread and the caller does not wait for it.
+        """
+        with self._refresh_lock:
+            future = self._refresh_future
+            owner = future is None
+            if owner:
+                future = self._refresh_future = Future()
+        if owner:
+            if background:
+                threading.Thread(
+                    target=self._run_refresh,
+                    args=(future,),
+                    name="PyJWKClient-refresh",
+                    daemon=True,
+                ).start()
+            else:
+                self._run_refresh(future)
+        return future
+
+    def _get_parsed(self, refresh: bool = False) -> _ParsedJWKSet:
+        cache = self.jwk_set_cache
+        if refresh or cache is None:
+            return self._refresh().result()
+
+        cached = cache.jwk_set_with_timestamp
+        if cached is None:
+            return self._refresh().result()
+        if cache.is_expired():
+            if not self.stale_while_revalidate:
+                return self._refresh().result()
+            self._refresh(background=True)
+        return self._parse(cached.get_jwk_set())
+
+    def get_jwk_set(self, refresh: bool = False) -> PyJWKSet:
+        return self._get_parsed(refresh)[1]
 
     def get_signing_keys(self, refresh: bool = False) -> List[PyJWK]:
         jwk_set = self.get_jwk_set(refresh)
@@ -93,19 +175,33 @@ class PyJWKClient:
 
         return signing_keys
 
-    def get_signing_key(self, kid: str) -> PyJWK:
-        signing_keys = self.get_signing_keys()
-        signing_key = self.match_kid(signing_keys, kid)
-
-        if not signing_key:
-            # If no matching signing key from the jwk set, refresh the jwk set and try again.
-            signing_keys = self.get_signing_keys(refresh=True)
-            signing_key = self.match_kid(signing_keys, kid)
+    def _get_signing_keys_by_kid(self, refresh: bool = False) -> Dict[str, PyJWK]:
+        by_kid = self._get_parsed(refresh)[2]
+        if not by_kid:
+            raise PyJWKClientError("The JWKS endpoint did not contain any signing keys")
+        return by_kid
 
-            if not signing_key:
-                raise PyJWKClientError(
-                    f'Unable to find a signing key that matches: "{kid}"'
-                )
+    def get_signing_key(self, kid: str) -> PyJWK:
+        not_found = PyJWKClientError(
+            f'Unable to find a signing key that matches: "{kid}"'
+        )
+        if not isinstance(kid, str):
+            raise not_found
+
+        signing_key = self._get_signing_keys_by_kid().get(kid)
+
+        if signing_key is None:
+            # If no matching signing key from the jwk set, refresh the jwk set
+            # (joining any refresh already in flight) and try again, unless
+            # this kid was just missing from a fresh set.
+            if self.unknown_kids.is_blocked(kid):
+                raise not_found
+            signing_key = self._get_signing_keys_by_kid(refresh=True).get(kid)
+
+            if signing_key is None:
+                self.unknown_kids.add(kid)
+                raise not_found
+            self.unknown_kids.discard(kid)
 
         return signing_key
 
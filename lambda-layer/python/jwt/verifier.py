@@ -0,0 +1,386 @@
+from __future__ import annotations
+
+import binascii
+import hmac
+import json
+import itertools
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple
+
+from .algorithms import HMACAlgorithm, get_default_algorithms, has_crypto
+from .api_jwk import PyJWK
+from .api_jwt import PyJWT
+from .exceptions import (
+    DecodeError,
+    InvalidAlgorithmError,
+    InvalidSignatureError,
+    MissingRequiredClaimError,
+    PyJWTError,
+)
+
+if has_crypto:
+    from .algorithms import ECAlgorithm, OKPAlgorithm, RSAAlgorithm
+
+    _ASYMMETRIC_ALGORITHMS: tuple[type, ...] = (
+        RSAAlgorithm,
+        ECAlgorithm,
+        OKPAlgorithm,
+    )
+else:
+    _ASYMMETRIC_ALGORITHMS = ()
+
+if TYPE_CHECKING:
+    from .algorithms import AllowedPublicKeys
+
+_URLSAFE_TO_STD = bytes.maketrans(b"-_", b"+/")
+
+
+def _b64url_decode(segment: bytes) -> bytes:
+    # utils.base64url_decode without the str/bytes coercion and the extra
+    # copies base64.urlsafe_b64decode makes; same non-strict decoding.
+    return binascii.a2b_base64(
+        segment.translate(_URLSAFE_TO_STD) + b"=" * (-len(segment) % 4)
+    )
+
+
+class Verifier:
+    """A JWT decoder bound to one key, algorithm list and set of options.
+
+    ``jwt.decode`` merges options, looks up the algorithm, prepares the key
+    and walks every claim check on each call. A ``Verifier`` does all of that
+    once in ``__init__`` so that :meth:`verify` only parses the token, checks
+    the signature and runs the claim checks that are actually enabled.
+    HMAC keys are loaded into an ``hmac`` object up front and copied per token.
+
+    ``verify(token)`` accepts and rejects exactly the tokens that
+    ``jwt.decode(token, key, algorithms, options, audience=..., issuer=...,
+    subject=..., leeway=...)`` would, raising the same exceptions.
+    Detached payloads (``b64: false``) are not supported.
+    """
+
+    def __init__(
+        self,
+        key: AllowedPublicKeys | PyJWK | str | bytes,
+        algorithms: Sequence[str] | None = None,
+        options: dict[str, Any] | None = None,
+        *,
+        audience: str | Iterable[str] | None = None,
+        issuer: str | Sequence[str] | None = None,
+        subject: str | None = None,
+        leeway: float | timedelta = 0,
+    ) -> None:
+        options = dict(options or {})
+        options.setdefault("verify_signature", True)
+        if not options["verify_signature"]:
+            for name in (
+                "verify_exp",
+                "verify_nbf",
+                "verify_iat",
+                "verify_aud",
+                "verify_iss",
+                "verify_sub",
+                "verify_jti",
+            ):
+                options.setdefault(name, False)
+
+        self._jwt = PyJWT(options)
+        self.options = self._jwt.options
+        self._verify_signature = self.options["verify_signature"]
+
+        if isinstance(leeway, timedelta):
+            leeway = leeway.total_seconds()
+        if audience is not None and not isinstance(audience, (str, Iterable)):
+            raise TypeError("audience must be a string, iterable or None")
+
+        # alg -> callable(signing_input, signature) -> bool
+        self._verifiers: dict[str, Callable[[bytes, bytes], bool]] = {}
+        if self._verify_signature:
+            if algorithms is None and isinstance(key, PyJWK):
+                algorithms = [key.algorithm_name]
+            if not algorithms:
+                raise DecodeError(
+                    'It is required that you pass in a value for the "algorithms" argument when calling decode().'
+                )
+            for alg in algorithms:
+                self._verifiers[alg] = self._compile_signature_check(alg, key)
+
+        self._required = tuple(self.options["require"])
+        self._claim_checks = self._compile_claim_checks(
+            audience, issuer, subject, leeway
+        )
+
+    @staticmethod
+    def _compile_signature_check(
+        alg: str, key: AllowedPublicKeys | PyJWK | str | bytes
+    ) -> Callable[[bytes, bytes], bool]:
+        if isinstance(key, PyJWK):
+            alg_obj = key.Algorithm
+            prepared_key = key.key
+        else:
+            alg_obj = get_default_algorithms().get(alg)
+            if alg_obj is None:
+                # Same error jwt.decode raises once a token names this alg.
+                def unsupported(signing_input: bytes, signature: bytes) -> bool:
+                    raise InvalidAlgorithmError("Algorithm not supported")
+
+                return unsupported
+            prepared_key = alg_obj.prepare_key(key)
+
+        if type(alg_obj) is HMACAlgorithm:
+            keyed = hmac.new(prepared_key, digestmod=alg_obj.hash_alg)
+
+            def verify_hmac(signing_input: bytes, signature: bytes) -> bool:
+                mac = keyed.copy()
+                mac.update(signing_input)
+                return hmac.compare_digest(signature, mac.digest())
+
+            return verify_hmac
+
+        def verify_generic(signing_input: bytes, signature: bytes) -> bool:
+            return alg_obj.verify(signing_input, prepared_key, signature)
+
+        return verify_generic
+
+    def _compile_claim_checks(
+        self,
+        audience: Any,
+        issuer: Any,
+        subject: str | None,
+        leeway: float,
+    ) -> tuple[Callable[[dict[str, Any], float], None], ...]:
+        options = self.options
+        jwt = self._jwt
+        checks: list[Callable[[dict[str, Any], float], None]] = []
+
+        if options["verify_iat"]:
+
+            def check_iat(payload: dict[str, Any], now: float) -> None:
+                if "iat" in payload:
+                    jwt._validate_iat(payload, now, leeway)
+
+            checks.append(check_iat)
+
+        if options["verify_nbf"]:
+
+            def check_nbf(payload: dict[str, Any], now: float) -> None:
+                if "nbf" in payload:
+                    jwt._validate_nbf(payload, now, leeway)
+
+            checks.append(check_nbf)
+
+        if options["verify_exp"]:
+
+            def check_exp(payload: dict[str, Any], now: float) -> None:
+                if "exp" in payload:
+                    jwt._validate_exp(payload, now, leeway)
+
+            checks.append(check_exp)
+
+        if options["verify_iss"] and issuer is not None:
+            checks.append(lambda payload, now: jwt._validate_iss(payload, issuer))
+
+        if options["verify_aud"]:
+            strict = options.get("strict_aud", False)
+            checks.append(
+                lambda payload, now: jwt._validate_aud(payload, audience, strict=strict)
+            )
+
+        if options["verify_sub"]:
+            checks.append(lambda payload, now: jwt._validate_sub(payload, subject))
+
+        if options["verify_jti"]:
+            checks.append(lambda payload, now: jwt._validate_jti(payload))
+
+        return tuple(checks)
+
+    def verify_complete(self, token: str | bytes) -> dict[str, Any]:
+        if isinstance(token, str):
+            token = token.encode("utf-8")
+        if not isinstance(token, bytes):
+            raise DecodeError(f"Invalid token type. Token must be a {bytes}")
+
+        try:
+            signing_input, crypto_segment = token.rsplit(b".", 1)
+            header_segment, payload_segment = signing_input.split(b".", 1)
+        except ValueError as err:
+            raise DecodeError("Not enough segments") from err
+
+        try:
+            header = json.loads(_b64url_decode(header_segment))
+        except (TypeError, binascii.Error) as err:
+            raise DecodeError("Invalid header padding") from err
+        except ValueError as e:
+            raise DecodeError(f"Invalid header string: {e}") from e
+        if not isinstance(header, dict):
+            raise DecodeError("Invalid header string: must be a json object")
+
+        try:
+            payload_data = _b64url_decode(payload_segment)
+        except (TypeError, binascii.Error) as err:
+            raise DecodeError("Invalid payload padding") from err
+        try:
+            signature = _b64url_decode(crypto_segment)
+        except (TypeError, binascii.Error) as err:
+            raise DecodeError("Invalid crypto padding") from err
+
+        if header.get("b64", True) is False:
+            raise DecodeError(
+                "Verifier does not support tokens with a detached payload (b64=false)."
+            )
+
+        if self._verify_signature:
+            try:
+                alg = header["alg"]
+            except KeyError:
+                raise InvalidAlgorithmError("Algorithm not specified") from None
+            check = self._verifiers.get(alg) if isinstance(alg, str) else None
+            if check is None:
+                raise InvalidAlgorithmError("The specified alg value is not allowed")
+            if not check(signing_input, signature):
+                raise InvalidSignatureError("Signature verification failed")
+
+        try:
+            payload = json.loads(payload_data)
+        except ValueError as e:
+            raise DecodeError(f"Invalid payload string: {e}") from e
+        if not isinstance(payload, dict):
+            raise DecodeError("Invalid payload string: must be a json object")
+
+        for claim in self._required:
+            if payload.get(claim) is None:
+                raise MissingRequiredClaimError(claim)
+
+        now = time.time()
+        for check in self._claim_checks:
+            check(payload, now)
+
+        return {"payload": payload, "header": header, "signature": signature}
+
+    def verify(self, token: str | bytes) -> Any:
+        return self.verify_complete(token)["payload"]
+
+
+class DecodeResult(NamedTuple):
+    """One entry yielded by :func:`decode_many`: a payload or the error."""
+
+    payload: Any
+    error: PyJWTError | None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _verify_each(
+    verifier: Verifier, tokens: Iterable[str | bytes]
+) -> Iterator[DecodeResult]:
+    verify = verifier.verify
+    for token in tokens:
+        try:
+            yield DecodeResult(verify(token), None)
+        except PyJWTError as e:
+            yield DecodeResult(None, e)
+
+
+# Verifier of a decode_many worker process, built once by _init_worker.
+_worker_verifier: Verifier | None = None
+
+
+def _init_worker(args: tuple[Any, ...], kwargs: dict[str, Any]) -> None:
+    global _worker_verifier
+    _worker_verifier = Verifier(*args, **kwargs)
+
+
+def _verify_chunk(tokens: list[str | bytes]) -> list[DecodeResult]:
+    assert _worker_verifier is not None
+    return list(_verify_each(_worker_verifier, tokens))
+
+
+def _is_asymmetric(key: Any, algorithms: Sequence[str] | None) -> bool:
+    if isinstance(key, PyJWK):
+        return isinstance(key.Algorithm, _ASYMMETRIC_ALGORITHMS)
+    available = get_default_algorithms()
+    return any(
+        isinstance(available.get(alg), _ASYMMETRIC_ALGORITHMS)
+        for alg in algorithms or ()
+    )
+
+
+def _decode_in_pool(
+    tokens: Iterable[str | bytes],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    max_workers: int,
+    chunksize: int,
+) -> Iterator[DecodeResult]:
+    pool = ProcessPoolExecutor(
+        max_workers, initializer=_init_worker, initargs=(args, kwargs)
+    )
+    try:
+        # Keep a bounded number of chunks in flight so a huge input is never
+        # read (or its results held) all at once; results stay in input order.
+        pending: deque = deque()
+        it = iter(tokens)
+        while True:
+            chunk = list(itertools.islice(it, chunksize))
+            if not chunk:
+                break
+            pending.append(pool.submit(_verify_chunk, chunk))
+            if len(pending) >= 2 * max_workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def decode_many(
+    tokens: Iterable[str | bytes],
+    key: AllowedPublicKeys | PyJWK | str | bytes,
+    algorithms: Sequence[str] | None = None,
+    options: dict[str, Any] | None = None,
+    *,
+    audience: str | Iterable[str] | None = None,
+    issuer: str | Sequence[str] | None = None,
+    subject: str | None = None,
+    leeway: float | timedelta = 0,
+    max_workers: int | None = None,
+    chunksize: int = 256,
+) -> Iterator[DecodeResult]:
+    """Decode a stream of tokens that share one key and option set.
+
+    Returns a generator of :class:`DecodeResult`, one per token and in input
+    order; a token that fails validation yields its ``PyJWTError`` instead of
+    raising. Key preparation and algorithm lookup happen once (see
+    :class:`Verifier`), and *tokens* is consumed lazily, so a file object
+    or other iterator of any size runs in constant memory.
+
+    If *max_workers* is given and *algorithms* (or a ``PyJWK`` key) include
+    an RSA, EC or OKP algorithm, tokens are verified in chunks of *chunksize*
+    across that many worker processes. HMAC verification is cheaper than the
+    inter-process round trip, so it always runs in the calling process. For
+    the process pool, *key* must be picklable (e.g. a PEM string or bytes).
+
+    Configuration errors (missing *algorithms*, bad *audience*) are raised
+    immediately rather than on first iteration.
+    """
+    args = (key, algorithms, options)
+    kwargs = {
+        "audience": audience,
+        "issuer": issuer,
+        "subject": subject,
+        "leeway": leeway,
+    }
+    verifier = Verifier(*args, **kwargs)
+
+    if (
+        max_workers is not None
+        and max_workers > 1
+        and _is_asymmetric(key, algorithms)
+    ):
+        return _decode_in_pool(tokens, args, kwargs, max_workers, chunksize)
+    return _verify_each(verifier, tokens)
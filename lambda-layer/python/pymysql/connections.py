@@ -2,20 +2,31 @@
 # http://dev.mysql.com/doc/internals/en/client-server-protocol.html
 # Error codes:
 # https://dev.mysql.com/doc/refman/5.5/en/error-handling.html
+import base64
+import codecs
+import contextlib
+import datetime
 import errno
+import json
 import os
+import re
 import socket
 import struct
 import sys
+import time
 import traceback
 import warnings
+import zlib
+from collections import OrderedDict
+from decimal import Decimal
 
 from . import _auth
 
 from .charset import charset_by_name, charset_by_id
-from .constants import CLIENT, COMMAND, CR, ER, FIELD_TYPE, SERVER_STATUS
+from .constants import CLIENT, COMMAND, CR, ER, FIELD_TYPE, FLAG, SERVER_STATUS
 from . import converters
 from .cursors import Cursor
+from .observers import ResultStats
 from .optionfile import Parser
 from .protocol import (
     dump_packet,
@@ -66,6 +77,17 @@ DEFAULT_CHARSET = "utf8mb4"
 
 MAX_PACKET_LEN = 2**24 - 1
 
+# Initial size of the per-connection receive buffer. It grows for larger
+# packets and shrinks back once drained.
+RECV_BUFFER_SIZE = 64 * 1024
+
+# Bytes of commands Connection.execute_pipelined sends before it stops to read
+# the responses, so that neither side blocks writing into a full socket buffer.
+PIPELINE_WINDOW = 64 * 1024
+
+# Compressed protocol frame header: compressed length, sequence id, uncompressed length
+COMPRESSED_HEADER_LEN = 7
+
 
 def _pack_int24(n):
     return struct.pack("<I", n)[:3]
@@ -143,6 +165,7 @@ class Connection:
     :param read_default_group: Group to read from in the configuration file.
     :param autocommit: Autocommit mode. None means use server default. (default: False)
     :param local_infile: Boolean to enable the use of LOAD DATA LOCAL command. (default: False)
+        See also :meth:`register_local_infile` to serve the data from memory.
     :param max_allowed_packet: Max size of packet sent to server in bytes. (default: 16MB)
         Only used to limit size of "LOAD LOCAL INFILE" data packet smaller than default (16KB).
     :param defer_connect: Don't explicitly connect on construction - wait for connect call.
@@ -154,7 +177,16 @@ class Connection:
         (if no authenticate method) for returning a string from the user. (experimental)
     :param server_public_key: SHA256 authentication plugin public key value. (default: None)
     :param binary_prefix: Add _binary prefix on bytes and bytearray. (default: False)
-    :param compress: Not supported.
+    :param max_prepared_statements: Number of server-side prepared statements kept
+        open per connection by :meth:`prepare`. The least recently used statement is
+        closed when the cache is full. (default: 64)
+    :param compress: Use the compressed protocol (zlib) when the server supports it.
+        (default: False)
+    :param compress_min_length: Payloads shorter than this are sent uncompressed
+        when the compressed protocol is in use. (default: 50)
+    :param observers: :class:`~pymysql.observers.ConnectionObserver` instances
+        notified around connect, each command and each result read. See also
+        :meth:`add_observer`. Not used by ``aio.AsyncConnection``. (default: None)
     :param named_pipe: Not supported.
     :param db: **DEPRECATED** Alias for database.
     :param passwd: **DEPRECATED** Alias for password.
@@ -164,10 +196,19 @@ class Connection:
     """
 
     _sock = None
-    _rfile = None
+    _rbuf = None
+    _rpos = _rend = 0
     _auth_plugin_name = ""
     _closed = False
     _secure = False
+    _compress = False
+    _observers = ()
+    # Wire counters, kept with or without observers
+    _bytes_sent = _bytes_received = _packets_read = 0
+    # Only updated while observed
+    _recv_time = 0.0
+    _recv_first = None
+    _observed_sql = None
 
     def __init__(
         self,
@@ -198,6 +239,7 @@ class Connection:
         write_timeout=None,
         bind_address=None,
         binary_prefix=False,
+        max_prepared_statements=64,
         program_name=None,
         server_public_key=None,
         ssl=None,
@@ -208,7 +250,9 @@ class Connection:
         ssl_key_password=None,
         ssl_verify_cert=None,
         ssl_verify_identity=None,
-        compress=None,  # not supported
+        compress=None,
+        compress_min_length=50,
+        observers=None,
         named_pipe=None,  # not supported
         passwd=None,  # deprecated
         db=None,  # deprecated
@@ -226,12 +270,15 @@ class Connection:
             # )
             password = passwd
 
-        if compress or named_pipe:
-            raise NotImplementedError(
-                "compress and named_pipe arguments are not supported"
-            )
+        if named_pipe:
+            raise NotImplementedError("named_pipe argument is not supported")
+        if compress not in (None, False, True, "zlib"):
+            raise NotImplementedError(f"compress={compress!r} is not supported")
+        self.compress = bool(compress)
+        self.compress_min_length = compress_min_length
 
         self._local_infile = bool(local_infile)
+        self._local_infile_streams = {}
         if self._local_infile:
             client_flag |= CLIENT.LOCAL_FILES
 
@@ -349,6 +396,13 @@ class Connection:
         self._auth_plugin_map = auth_plugin_map or {}
         self._binary_prefix = binary_prefix
         self.server_public_key = server_public_key
+        if max_prepared_statements < 1:
+            raise ValueError("max_prepared_statements should be >= 1")
+        self.max_prepared_statements = max_prepared_statements
+        # sql bytes -> PreparedStatement (None when the server can't prepare it)
+        self._prepared_statements = OrderedDict()
+        if observers:
+            self._observers = tuple(observers)
 
         self._connect_attrs = {
             "_client_name": "pymysql",
@@ -426,6 +480,7 @@ class Connection:
         if self._sock is None:
             return
         send_data = struct.pack("<iB", 1, COMMAND.COM_QUIT)
+        self._next_compressed_seq_id = 0
         try:
             self._write_bytes(send_data)
         except Exception:
@@ -440,15 +495,14 @@ class Connection:
 
     def _force_close(self):
         """Close connection without QUIT message."""
-        if self._rfile:
-            self._rfile.close()
         if self._sock:
             try:
                 self._sock.close()
             except:  # noqa
                 pass
         self._sock = None
-        self._rfile = None
+        self._rbuf = self._rview = None
+        self._compress = False
 
     __del__ = _force_close
 
@@ -553,35 +607,248 @@ class Connection:
             )
         return converters.escape_bytes(s)
 
+    def register_local_infile(self, filename, fileobj):
+        """
+        Serve the next ``LOAD DATA LOCAL INFILE`` request for *filename* from
+        *fileobj* instead of the filesystem.
+
+        :param filename: File name used in the LOAD DATA statement.
+        :param fileobj: A binary file-like object. It is read until EOF but not closed.
+
+        The registration is consumed by the first matching request.
+        Requires ``local_infile=True``.
+        """
+        if not self._local_infile:
+            raise err.ProgrammingError("local_infile is not enabled on this connection")
+        if isinstance(filename, str):
+            filename = filename.encode(self.encoding)
+        self._local_infile_streams[filename] = fileobj
+
+    def add_observer(self, observer):
+        """
+        Register a :class:`~pymysql.observers.ConnectionObserver`. Observers
+        are called in the order they were added.
+        """
+        self._observers += (observer,)
+
+    def remove_observer(self, observer):
+        """Unregister *observer*. Does nothing if it isn't registered."""
+        self._observers = tuple(o for o in self._observers if o is not observer)
+
+    def _notify(self, observers, hook, *args):
+        # An observer failing must not fail (or replace the error of) the
+        # operation it watches, so its exception is reported as a warning.
+        for observer in observers:
+            try:
+                getattr(observer, hook)(self, *args)
+            except Exception as e:
+                warnings.warn(
+                    f"{type(observer).__name__}.{hook} raised {e!r}", RuntimeWarning
+                )
+
     def cursor(self, cursor=None):
         """
         Create a new cursor to execute queries with.
 
         :param cursor: The type of cursor to create. None means use Cursor.
         :type cursor: :py:class:`Cursor`, :py:class:`SSCursor`, :py:class:`DictCursor`,
-            or :py:class:`SSDictCursor`.
+            :py:class:`SSDictCursor`, :py:class:`RecordCursor`, :py:class:`SSRecordCursor`,
+            :py:class:`JSONCursor`, :py:class:`PreparedCursor`,
+            :py:class:`PreparedDictCursor`, :py:class:`PreparedRecordCursor`
+            or :py:class:`PreparedJSONCursor`.
         """
         if cursor:
             return cursor(self)
         return self.cursorclass(self)
 
     # The following methods are INTERNAL USE ONLY (called from Cursor)
-    def query(self, sql, unbuffered=False):
+    def query(self, sql, unbuffered=False, json_keys=None):
         # if DEBUG:
         #     print("DEBUG: sending query:", sql)
         if isinstance(sql, str):
             sql = sql.encode(self.encoding, "surrogateescape")
         self._execute_command(COMMAND.COM_QUERY, sql)
-        self._affected_rows = self._read_query_result(unbuffered=unbuffered)
+        self._affected_rows = self._read_query_result(
+            unbuffered=unbuffered, json_keys=json_keys
+        )
         return self._affected_rows
 
-    def next_result(self, unbuffered=False):
-        self._affected_rows = self._read_query_result(unbuffered=unbuffered)
+    def next_result(self, unbuffered=False, json_keys=None):
+        self._affected_rows = self._read_query_result(
+            unbuffered=unbuffered, json_keys=json_keys
+        )
         return self._affected_rows
 
     def affected_rows(self):
         return self._affected_rows
 
+    def prepare(self, sql):
+        """
+        Prepare *sql* on the server with COM_STMT_PREPARE and return a
+        :class:`PreparedStatement`. Use ``?`` as the parameter marker.
+
+        Statements are cached per connection by SQL text, so preparing the
+        same statement again costs nothing. Returns None for statements the
+        server can't prepare (ER_UNSUPPORTED_PS); this is cached as well.
+        """
+        if isinstance(sql, str):
+            sql = sql.encode(self.encoding, "surrogateescape")
+        cache = self._prepared_statements
+        try:
+            stmt = cache[sql]
+        except KeyError:
+            pass
+        else:
+            cache.move_to_end(sql)
+            return stmt
+
+        self._execute_command(COMMAND.COM_STMT_PREPARE, sql)
+        stmt = cache[sql] = self._read_prepare_response(sql)
+        self._evict_statements()
+        return stmt
+
+    def prepare_pipelined(self, sqls):
+        """
+        Like :meth:`prepare` for several statements, but every COM_STMT_PREPARE
+        not answered from the cache is sent before any response is read, so
+        the new statements cost one round trip together.
+
+        Returns the statements (or None, see :meth:`prepare`) in order. If a
+        statement fails to prepare, the first such error is raised after all
+        the responses were read; the others stay cached.
+
+        INTERNAL USE ONLY (called from PreparedCursor.execute_batch)
+        """
+        encoding = self.encoding
+        sqls = [
+            sql.encode(encoding, "surrogateescape") if isinstance(sql, str) else sql
+            for sql in sqls
+        ]
+        cache = self._prepared_statements
+        missing = {}
+        for sql in sqls:
+            if sql in cache:
+                cache.move_to_end(sql)
+            else:
+                missing[sql] = None
+        missing = list(missing)
+
+        error = None
+        start = 0
+        while start < len(missing):
+            pending = []
+            size = 0
+            for sql in missing[start:]:
+                self._execute_command(COMMAND.COM_STMT_PREPARE, sql)
+                pending.append((sql, self._next_seq_id, self._next_compressed_seq_id))
+                size += len(sql)
+                if size >= PIPELINE_WINDOW:
+                    break
+            start += len(pending)
+
+            for sql, seq_id, compressed_seq_id in pending:
+                self._next_seq_id = seq_id
+                self._next_compressed_seq_id = compressed_seq_id
+                try:
+                    cache[sql] = self._read_prepare_response(sql)
+                except err.MySQLError as e:
+                    if not self._sock:
+                        raise
+                    if error is None:
+                        error = e
+
+        stmts = [cache.get(sql) for sql in sqls]
+        self._evict_statements()
+        if error is not None:
+            raise error
+        return stmts
+
+    def _read_prepare_response(self, sql):
+        try:
+            return PreparedStatement(self, sql, self._read_packet())
+        except err.OperationalError as e:
+            if e.args[0] != ER.UNSUPPORTED_PS:
+                raise
+            return None
+
+    def _evict_statements(self):
+        cache = self._prepared_statements
+        while len(cache) > self.max_prepared_statements:
+            _, old = cache.popitem(last=False)
+            if old is not None:
+                self._close_statement(old)
+
+    def _close_statement(self, stmt):
+        # COM_STMT_CLOSE has no response packet
+        self._execute_command(
+            COMMAND.COM_STMT_CLOSE, struct.pack("<I", stmt.statement_id)
+        )
+
+    def execute_prepared(self, stmt, args=(), unbuffered=False, json_keys=None):
+        """
+        Execute a statement returned by :meth:`prepare` with COM_STMT_EXECUTE.
+        Results are read with the binary protocol.
+
+        INTERNAL USE ONLY (called from PreparedCursor)
+        """
+        self._execute_command(COMMAND.COM_STMT_EXECUTE, stmt.execute_payload(args))
+        self._affected_rows = self._read_query_result(
+            unbuffered=unbuffered, binary=True, json_keys=json_keys
+        )
+        return self._affected_rows
+
+    def execute_pipelined(self, commands, json_keys=None):
+        """
+        Send several commands without waiting for each response, then read the
+        responses in order. *commands* are ``(command, payload, binary)`` tuples,
+        *binary* being true for COM_STMT_EXECUTE.
+
+        Returns a list with one :class:`MySQLResult` per command, or the
+        exception raised for the command's error response. Errors that leave
+        the connection unusable are raised right away, with ``batch_index``
+        set to the position of the command being read.
+
+        INTERNAL USE ONLY (called from Cursor.execute_batch)
+        """
+        results = []
+        start = 0
+        while start < len(commands):
+            # Sequence ids the response to each command starts at
+            pending = []
+            size = 0
+            for command, payload, binary in commands[start:]:
+                self._execute_command(command, payload)
+                pending.append(
+                    (
+                        binary,
+                        self._next_seq_id,
+                        self._next_compressed_seq_id,
+                        self._observed_sql,
+                    )
+                )
+                size += len(payload)
+                if size >= PIPELINE_WINDOW:
+                    break
+            start += len(pending)
+
+            for binary, seq_id, compressed_seq_id, sql in pending:
+                self._next_seq_id = seq_id
+                self._next_compressed_seq_id = compressed_seq_id
+                self._observed_sql = sql
+                try:
+                    self._read_query_result(binary=binary, json_keys=json_keys)
+                    result = self._result
+                    while self._result.has_next:
+                        self.next_result()
+                except err.MySQLError as e:
+                    if not self._sock:
+                        e.batch_index = len(results)
+                        raise
+                    results.append(e)
+                else:
+                    results.append(result)
+        return results
+
     def kill(self, thread_id):
         if not isinstance(thread_id, int):
             raise TypeError("thread_id must be an integer")
@@ -641,6 +908,22 @@ class Connection:
         self.collation = collation
 
     def connect(self, sock=None):
+        observers = self._observers
+        if not observers:
+            return self._connect(sock)
+        self._notify(observers, "before_connect")
+        start = time.perf_counter()
+        error = None
+        try:
+            self._connect(sock)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self._notify(observers, "after_connect", elapsed, error)
+
+    def _connect(self, sock):
         self._closed = False
         try:
             if sock is None:
@@ -674,12 +957,23 @@ class Connection:
                 sock.settimeout(None)
 
             self._sock = sock
-            self._rfile = sock.makefile("rb")
+            self._reset_recv_buffer()
             self._next_seq_id = 0
+            self._compress = False
+            # prepared statements belong to the server session
+            self._prepared_statements.clear()
 
             self._get_server_information()
             self._request_authentication()
 
+            # Everything after the authentication OK packet is framed
+            # with the compressed protocol when it was negotiated.
+            if self.client_flag & CLIENT.COMPRESS:
+                self._compress = True
+                self._next_compressed_seq_id = 0
+                self._decompressed = b""
+                self._decompressed_pos = 0
+
             # Send "SET NAMES" query on init for:
             # - Ensure charaset (and collation) is set to the server.
             #   - collation_id in handshake packet may be ignored.
@@ -746,6 +1040,49 @@ class Connection:
         :raise OperationalError: If the connection to the MySQL server is lost.
         :raise InternalError: If the packet sequence number is wrong.
         """
+        return packet_type(bytes(self._read_packet_view()), self.encoding)
+
+    def _read_packet_view(self):
+        """Read an entire "mysql packet" and return its payload as a memoryview.
+
+        For the common case (not compressed, shorter than 16MB) the view points
+        straight into the receive buffer, so it is only valid until the next
+        read from this connection. Error packets are raised here.
+
+        :raise OperationalError: If the connection to the MySQL server is lost.
+        :raise InternalError: If the packet sequence number is wrong.
+        """
+        data = None
+        if not self._compress:
+            if self._rend - self._rpos < 4:
+                self._fill_recv_buffer(4)
+            buf = self._rbuf
+            pos = self._rpos
+            bytes_to_read = buf[pos] | buf[pos + 1] << 8 | buf[pos + 2] << 16
+            if bytes_to_read < MAX_PACKET_LEN and buf[pos + 3] == self._next_seq_id:
+                self._next_seq_id = (self._next_seq_id + 1) % 256
+                self._packets_read += 1
+                if self._rend - pos < 4 + bytes_to_read:
+                    self._fill_recv_buffer(4 + bytes_to_read)
+                    pos = self._rpos
+                pos += 4
+                self._rpos = pos + bytes_to_read
+                data = self._rview[pos : pos + bytes_to_read]
+                if DEBUG:
+                    dump_packet(bytes(data))
+        if data is None:
+            data = memoryview(self._read_packet_data())
+            self._packets_read += 1
+
+        if data and data[0] == 0xFF:
+            if self._result is not None and self._result.unbuffered_active is True:
+                self._result.unbuffered_active = False
+            MysqlPacket(bytes(data), self.encoding).raise_for_error()
+        return data
+
+    def _read_packet_data(self):
+        # Packets of 16MB or more are split; compressed reads come from
+        # the decompression buffer. Both are joined into new bytes.
         buff = bytearray()
         while True:
             packet_header = self._read_bytes(4)
@@ -774,20 +1111,109 @@ class Connection:
             # https://dev.mysql.com/doc/internals/en/sending-more-than-16mbyte.html
             if bytes_to_read < MAX_PACKET_LEN:
                 break
-
-        packet = packet_type(bytes(buff), self.encoding)
-        if packet.is_error_packet():
-            if self._result is not None and self._result.unbuffered_active is True:
-                self._result.unbuffered_active = False
-            packet.raise_for_error()
-        return packet
+        return bytes(buff)
 
     def _read_bytes(self, num_bytes):
-        self._sock.settimeout(self._read_timeout)
-        while True:
+        if self._compress:
+            return self._read_decompressed_bytes(num_bytes)
+        return self._read_socket_bytes(num_bytes)
+
+    def _read_decompressed_bytes(self, num_bytes):
+        buf = self._decompressed
+        pos = self._decompressed_pos
+        while len(buf) - pos < num_bytes:
+            buf = buf[pos:] + self._read_compressed_frame()
+            pos = 0
+        self._decompressed = buf
+        self._decompressed_pos = pos + num_bytes
+        return buf[pos : pos + num_bytes]
+
+    def _read_compressed_frame(self):
+        """Read one compressed protocol frame and return its payload uncompressed.
+
+        :raise OperationalError: If the connection to the MySQL server is lost.
+        :raise InternalError: If the sequence number or length is wrong.
+        """
+        header = self._read_socket_bytes(COMPRESSED_HEADER_LEN)
+        compressed_length = header[0] | header[1] << 8 | header[2] << 16
+        seq_id = header[3]
+        length = header[4] | header[5] << 8 | header[6] << 16
+        if seq_id != self._next_compressed_seq_id:
+            self._force_close()
+            raise err.InternalError(
+                "Compressed packet sequence number wrong - got %d expected %d"
+                % (seq_id, self._next_compressed_seq_id)
+            )
+        self._next_compressed_seq_id = (seq_id + 1) % 256
+        payload = self._read_socket_bytes(compressed_length)
+        if length == 0:  # sent uncompressed
+            return payload
+        payload = zlib.decompress(payload)
+        if len(payload) != length:
+            self._force_close()
+            raise err.InternalError(
+                "Compressed packet length wrong - got %d expected %d"
+                % (len(payload), length)
+            )
+        return payload
+
+    def _compress_frames(self, data):
+        """Wrap *data* in compressed protocol frames."""
+        frames = []
+        for start in range(0, len(data), MAX_PACKET_LEN):
+            chunk = data[start : start + MAX_PACKET_LEN]
+            length = 0
+            if len(chunk) >= self.compress_min_length:
+                compressed = zlib.compress(chunk)
+                if len(compressed) < len(chunk):
+                    length = len(chunk)
+                    chunk = compressed
+            frames.append(
+                _pack_int24(len(chunk))
+                + bytes([self._next_compressed_seq_id])
+                + _pack_int24(length)
+            )
+            frames.append(chunk)
+            self._next_compressed_seq_id = (self._next_compressed_seq_id + 1) % 256
+        return b"".join(frames)
+
+    def _reset_recv_buffer(self):
+        self._rbuf = bytearray(RECV_BUFFER_SIZE)
+        self._rview = memoryview(self._rbuf)
+        self._rpos = self._rend = 0
+
+    def _fill_recv_buffer(self, num_bytes):
+        """Receive from the socket until *num_bytes* are buffered after ``_rpos``."""
+        avail = self._rend - self._rpos
+        if self._rpos + num_bytes > len(self._rbuf):
+            # Move the unread bytes to the front, growing the buffer if the
+            # packet doesn't fit and shrinking it back after a large packet.
+            size = max(num_bytes, RECV_BUFFER_SIZE)
+            if size > len(self._rbuf) or (
+                avail <= RECV_BUFFER_SIZE and len(self._rbuf) > RECV_BUFFER_SIZE
+            ):
+                old = self._rview[self._rpos : self._rend]
+                self._rbuf = bytearray(size)
+                self._rview = memoryview(self._rbuf)
+                self._rbuf[:avail] = old
+            else:
+                # The unread bytes may overlap their destination, and a
+                # same-size slice assignment is a plain memcpy: copy them out
+                # first.
+                self._rbuf[:avail] = bytes(self._rview[self._rpos : self._rend])
+            self._rpos = 0
+            self._rend = avail
+
+        sock = self._sock
+        sock.settimeout(self._read_timeout)
+        view = self._rview
+        need = self._rpos + num_bytes
+        timed = self._observers
+        while self._rend < need:
+            if timed:
+                started = time.perf_counter()
             try:
-                data = self._rfile.read(num_bytes)
-                break
+                received = sock.recv_into(view[self._rend :])
             except OSError as e:
                 if e.errno == errno.EINTR:
                     continue
@@ -800,14 +1226,29 @@ class Connection:
                 # Don't convert unknown exception to MySQLError.
                 self._force_close()
                 raise
-        if len(data) < num_bytes:
-            self._force_close()
-            raise err.OperationalError(
-                CR.CR_SERVER_LOST, "Lost connection to MySQL server during query"
-            )
-        return data
+            if not received:
+                self._force_close()
+                raise err.OperationalError(
+                    CR.CR_SERVER_LOST, "Lost connection to MySQL server during query"
+                )
+            self._rend += received
+            self._bytes_received += received
+            if timed:
+                waited = time.perf_counter() - started
+                self._recv_time += waited
+                if self._recv_first is None:
+                    self._recv_first = waited
+
+    def _read_socket_bytes(self, num_bytes):
+        if self._rend - self._rpos < num_bytes:
+            self._fill_recv_buffer(num_bytes)
+        pos = self._rpos
+        self._rpos = pos + num_bytes
+        return bytes(self._rview[pos : pos + num_bytes])
 
     def _write_bytes(self, data):
+        if self._compress:
+            data = self._compress_frames(data)
         self._sock.settimeout(self._write_timeout)
         try:
             self._sock.sendall(data)
@@ -816,10 +1257,46 @@ class Connection:
             raise err.OperationalError(
                 CR.CR_SERVER_GONE_ERROR, f"MySQL server has gone away ({e!r})"
             )
+        self._bytes_sent += len(data)
+
+    def _read_query_result(self, unbuffered=False, binary=False, json_keys=None):
+        if self._observers:
+            return self._read_observed_query_result(unbuffered, binary, json_keys)
+        return self._read_result(unbuffered, binary, json_keys)
+
+    def _read_observed_query_result(self, unbuffered, binary, json_keys):
+        observers = self._observers
+        sql = self._observed_sql
+        self._notify(observers, "before_result", sql)
+        received, packets = self._bytes_received, self._packets_read
+        recv_time = self._recv_time
+        self._recv_first = None
+        start = time.perf_counter()
+        error = None
+        try:
+            return self._read_result(unbuffered, binary, json_keys)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            network = self._recv_time - recv_time
+            wait = self._recv_first or 0.0
+            result = self._result
+            stats = ResultStats(
+                self._bytes_received - received,
+                self._packets_read - packets,
+                len(result.rows) if result is not None and result.rows else 0,
+                elapsed,
+                wait,
+                network - wait,
+                elapsed - network,
+            )
+            self._notify(observers, "after_result", sql, stats, error)
 
-    def _read_query_result(self, unbuffered=False):
+    def _read_result(self, unbuffered, binary, json_keys):
         self._result = None
-        result = MySQLResult(self)
+        result = MySQLResult(self, binary=binary, json_keys=json_keys)
         if unbuffered:
             result.init_unbuffered_query()
         else:
@@ -856,12 +1333,50 @@ class Connection:
         if isinstance(sql, str):
             sql = sql.encode(self.encoding)
 
+        observers = self._observers
+        if not observers:
+            return self._send_command(command, sql)
+        sql_text = self._observed_sql = self._statement_text(command, sql)
+        self._notify(observers, "before_command", command, sql_text)
+        sent = self._bytes_sent
+        start = time.perf_counter()
+        error = None
+        try:
+            self._send_command(command, sql)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self._notify(
+                observers,
+                "after_command",
+                command,
+                sql_text,
+                self._bytes_sent - sent,
+                elapsed,
+                error,
+            )
+
+    def _statement_text(self, command, payload):
+        """The SQL a command payload runs, for observers, as (hashable) bytes."""
+        if command in (COMMAND.COM_QUERY, COMMAND.COM_STMT_PREPARE):
+            return bytes(payload)
+        if command == COMMAND.COM_STMT_EXECUTE:
+            (statement_id,) = struct.unpack_from("<I", payload)
+            for stmt in self._prepared_statements.values():
+                if stmt is not None and stmt.statement_id == statement_id:
+                    return bytes(stmt.sql)
+        return None
+
+    def _send_command(self, command, sql):
         packet_size = min(MAX_PACKET_LEN, len(sql) + 1)  # +1 is for command
 
         # tiny optimization: build first packet manually instead of
         # calling self..write_packet()
         prelude = struct.pack("<iB", packet_size, command)
         packet = prelude + sql[: packet_size - 1]
+        self._next_compressed_seq_id = 0
         self._write_bytes(packet)
         if DEBUG:
             dump_packet(packet)
@@ -879,10 +1394,65 @@ class Connection:
                 break
 
     def _request_authentication(self):
+        data_init, data = self._handshake_response()
+
+        if self.ssl and self.server_capabilities & CLIENT.SSL:
+            self.write_packet(data_init)
+
+            self._sock = self.ctx.wrap_socket(self._sock, server_hostname=self.host)
+            self._reset_recv_buffer()
+            self._secure = True
+
+        self.write_packet(data)
+        auth_packet = self._read_packet()
+
+        # if authentication method isn't accepted the first byte
+        # will have the octet 254
+        if auth_packet.is_auth_switch_request():
+            if DEBUG:
+                print("received auth switch")
+            # https://dev.mysql.com/doc/internals/en/connection-phase-packets.html#packet-Protocol::AuthSwitchRequest
+            auth_packet.read_uint8()  # 0xfe packet identifier
+            plugin_name = auth_packet.read_string()
+            if (
+                self.server_capabilities & CLIENT.PLUGIN_AUTH
+                and plugin_name is not None
+            ):
+                auth_packet = self._process_auth(plugin_name, auth_packet)
+            else:
+                raise err.OperationalError("received unknown auth switch request")
+        elif auth_packet.is_extra_auth_data():
+            if DEBUG:
+                print("received extra data")
+            # https://dev.mysql.com/doc/internals/en/successful-authentication.html
+            if self._auth_plugin_name == "caching_sha2_password":
+                auth_packet = _auth.caching_sha2_password_auth(self, auth_packet)
+            elif self._auth_plugin_name == "sha256_password":
+                auth_packet = _auth.sha256_password_auth(self, auth_packet)
+            else:
+                raise err.OperationalError(
+                    "Received extra packet for auth method %r", self._auth_plugin_name
+                )
+
+        if DEBUG:
+            print("Succeed to auth")
+
+    def _handshake_response(self):
+        """
+        Negotiate client flags and build the HandshakeResponse payload.
+
+        Returns ``(data_init, data)``: *data_init* is the SSLRequest packet sent
+        before the TLS handshake, *data* the full response sent after it.
+        """
         # https://dev.mysql.com/doc/internals/en/connection-phase-packets.html#packet-Protocol::HandshakeResponse
         if int(self.server_version.split(".", 1)[0]) >= 5:
             self.client_flag |= CLIENT.MULTI_RESULTS
 
+        if self.compress and self.server_capabilities & CLIENT.COMPRESS:
+            self.client_flag |= CLIENT.COMPRESS
+        else:
+            self.client_flag &= ~CLIENT.COMPRESS
+
         if self.user is None:
             raise ValueError("Did not specify a username")
 
@@ -893,14 +1463,6 @@ class Connection:
         data_init = struct.pack(
             "<iIB23s", self.client_flag, MAX_PACKET_LEN, charset_id, b""
         )
-
-        if self.ssl and self.server_capabilities & CLIENT.SSL:
-            self.write_packet(data_init)
-
-            self._sock = self.ctx.wrap_socket(self._sock, server_hostname=self.host)
-            self._rfile = self._sock.makefile("rb")
-            self._secure = True
-
         data = data_init + self.user + b"\0"
 
         authresp = b""
@@ -954,39 +1516,7 @@ class Connection:
                 connect_attrs += _lenenc_int(len(v)) + v
             data += _lenenc_int(len(connect_attrs)) + connect_attrs
 
-        self.write_packet(data)
-        auth_packet = self._read_packet()
-
-        # if authentication method isn't accepted the first byte
-        # will have the octet 254
-        if auth_packet.is_auth_switch_request():
-            if DEBUG:
-                print("received auth switch")
-            # https://dev.mysql.com/doc/internals/en/connection-phase-packets.html#packet-Protocol::AuthSwitchRequest
-            auth_packet.read_uint8()  # 0xfe packet identifier
-            plugin_name = auth_packet.read_string()
-            if (
-                self.server_capabilities & CLIENT.PLUGIN_AUTH
-                and plugin_name is not None
-            ):
-                auth_packet = self._process_auth(plugin_name, auth_packet)
-            else:
-                raise err.OperationalError("received unknown auth switch request")
-        elif auth_packet.is_extra_auth_data():
-            if DEBUG:
-                print("received extra data")
-            # https://dev.mysql.com/doc/internals/en/successful-authentication.html
-            if self._auth_plugin_name == "caching_sha2_password":
-                auth_packet = _auth.caching_sha2_password_auth(self, auth_packet)
-            elif self._auth_plugin_name == "sha256_password":
-                auth_packet = _auth.sha256_password_auth(self, auth_packet)
-            else:
-                raise err.OperationalError(
-                    "Received extra packet for auth method %r", self._auth_plugin_name
-                )
-
-        if DEBUG:
-            print("Succeed to auth")
+        return data_init, data
 
     def _process_auth(self, plugin_name, auth_packet):
         handler = self._get_auth_plugin_handler(plugin_name)
@@ -1095,8 +1625,10 @@ class Connection:
         return self.protocol_version
 
     def _get_server_information(self):
+        self._parse_server_information(self._read_packet())
+
+    def _parse_server_information(self, packet):
         i = 0
-        packet = self._read_packet()
         data = packet.get_all_data()
 
         self.protocol_version = data[i]
@@ -1177,12 +1709,523 @@ class Connection:
     NotSupportedError = err.NotSupportedError
 
 
+class PreparedStatement:
+    """A server-side prepared statement created by :meth:`Connection.prepare`."""
+
+    __slots__ = ("statement_id", "sql", "param_count", "field_count", "encoding")
+
+    def __init__(self, connection, sql, first_packet):
+        # https://dev.mysql.com/doc/dev/mysql-server/latest/page_protocol_com_stmt_prepare.html
+        (
+            self.statement_id,
+            self.field_count,
+            self.param_count,
+        ) = struct.unpack_from("<IHH", first_packet.get_all_data(), 1)
+        self.sql = sql
+        self.encoding = connection.encoding
+        # parameter and column definitions are not needed; execute sends types
+        # and the result set carries its own column definitions.
+        for count in (self.param_count, self.field_count):
+            if count:
+                for _ in range(count):
+                    connection._read_packet()
+                eof_packet = connection._read_packet()
+                assert eof_packet.is_eof_packet(), "Protocol error, expecting EOF"
+
+    def execute_payload(self, args):
+        """Build the COM_STMT_EXECUTE payload (without the command byte)."""
+        # flags=CURSOR_TYPE_NO_CURSOR, iteration_count=1
+        head = struct.pack("<IBI", self.statement_id, 0, 1)
+        n = self.param_count
+        if args is None:
+            args = ()
+        if len(args) != n:
+            raise err.ProgrammingError(
+                f"Statement takes {n} parameters ({len(args)} given)"
+            )
+        if not n:
+            return head
+
+        null_bitmap = bytearray((n + 7) // 8)
+        types = bytearray()
+        values = []
+        for i, arg in enumerate(args):
+            if arg is None:
+                null_bitmap[i >> 3] |= 1 << (i & 7)
+                types += b"\x06\x00"  # MYSQL_TYPE_NULL
+                continue
+            type_code, flag, value = _encode_binary_param(arg, self.encoding)
+            types.append(type_code)
+            types.append(flag)
+            values.append(value)
+        # new_params_bound_flag=1: types are sent with every execute
+        return b"".join((head, null_bitmap, b"\x01", types, *values))
+
+
+def _lenenc_bytes(b):
+    return _lenenc_int(len(b)) + b
+
+
+def _encode_binary_param(value, encoding):
+    """Return (type, flag, data) for a COM_STMT_EXECUTE parameter."""
+    if isinstance(value, bool):
+        return FIELD_TYPE.LONGLONG, 0, struct.pack("<q", value)
+    if isinstance(value, int):
+        if -(1 << 63) <= value < (1 << 63):
+            return FIELD_TYPE.LONGLONG, 0, struct.pack("<q", value)
+        if 0 <= value < (1 << 64):
+            return FIELD_TYPE.LONGLONG, 0x80, struct.pack("<Q", value)
+        return FIELD_TYPE.NEWDECIMAL, 0, _lenenc_bytes(str(value).encode("ascii"))
+    if isinstance(value, str):
+        return (
+            FIELD_TYPE.VAR_STRING,
+            0,
+            _lenenc_bytes(value.encode(encoding, "surrogateescape")),
+        )
+    if isinstance(value, float):
+        if value != value or value in (float("inf"), float("-inf")):
+            raise err.ProgrammingError("%r can not be used with MySQL" % value)
+        return FIELD_TYPE.DOUBLE, 0, struct.pack("<d", value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return FIELD_TYPE.BLOB, 0, _lenenc_bytes(bytes(value))
+    if isinstance(value, Decimal):
+        return FIELD_TYPE.NEWDECIMAL, 0, _lenenc_bytes(str(value).encode("ascii"))
+    if isinstance(value, datetime.datetime):
+        return FIELD_TYPE.DATETIME, 0, struct.pack(
+            "<BHBBBBBI",
+            11,
+            value.year,
+            value.month,
+            value.day,
+            value.hour,
+            value.minute,
+            value.second,
+            value.microsecond,
+        )
+    if isinstance(value, datetime.date):
+        return FIELD_TYPE.DATE, 0, struct.pack(
+            "<BHBB", 4, value.year, value.month, value.day
+        )
+    if isinstance(value, datetime.timedelta):
+        negative = value < datetime.timedelta(0)
+        if negative:
+            value = -value
+        hours, rest = divmod(value.seconds, 3600)
+        minutes, seconds = divmod(rest, 60)
+        return FIELD_TYPE.TIME, 0, struct.pack(
+            "<BBIBBBI",
+            12,
+            negative,
+            value.days,
+            hours,
+            minutes,
+            seconds,
+            value.microseconds,
+        )
+    if isinstance(value, datetime.time):
+        return FIELD_TYPE.TIME, 0, struct.pack(
+            "<BBIBBBI",
+            12,
+            0,
+            0,
+            value.hour,
+            value.minute,
+            value.second,
+            value.microsecond,
+        )
+    if isinstance(value, (tuple, list, set, frozenset, dict)):
+        raise err.ProgrammingError(
+            f"{type(value).__name__} can not be used as a prepared statement parameter"
+        )
+    return (
+        FIELD_TYPE.VAR_STRING,
+        0,
+        _lenenc_bytes(str(value).encode(encoding, "surrogateescape")),
+    )
+
+
+_TEMPORAL_TYPES = frozenset(
+    (FIELD_TYPE.DATE, FIELD_TYPE.DATETIME, FIELD_TYPE.TIMESTAMP, FIELD_TYPE.TIME)
+)
+
+#: Distinct values remembered per converter in one text result set
+_INTERN_MAX = 4096
+
+
+def _interning(converter, cache):
+    """Wrap *converter* so equal raw values share one converted object.
+
+    Used for temporal columns of a text result set, where many rows (and the
+    created/updated pair of one row) carry the same timestamp. The converted
+    objects are immutable, so sharing them is safe.
+    """
+
+    def convert(value):
+        try:
+            return cache[value]
+        except KeyError:
+            pass
+        result = converter(value)
+        if len(cache) < _INTERN_MAX:
+            cache[value] = result
+        return result
+
+    return convert
+
+
+#: (signed, unsigned) structs for binary protocol integer columns
+_BINARY_INT_STRUCTS = {
+    FIELD_TYPE.TINY: (struct.Struct("<b"), struct.Struct("<B")),
+    FIELD_TYPE.SHORT: (struct.Struct("<h"), struct.Struct("<H")),
+    FIELD_TYPE.YEAR: (struct.Struct("<H"), struct.Struct("<H")),
+    FIELD_TYPE.INT24: (struct.Struct("<i"), struct.Struct("<I")),
+    FIELD_TYPE.LONG: (struct.Struct("<i"), struct.Struct("<I")),
+    FIELD_TYPE.LONGLONG: (struct.Struct("<q"), struct.Struct("<Q")),
+    FIELD_TYPE.DOUBLE: (struct.Struct("<d"), struct.Struct("<d")),
+}
+_FLOAT_STRUCT = struct.Struct("<f")
+
+
+def _read_lenenc_bytes(data, pos):
+    c = data[pos]
+    if c < 0xFB:
+        return data[pos + 1 : pos + 1 + c], pos + 1 + c
+    if c == 0xFC:
+        length = data[pos + 1] | data[pos + 2] << 8
+        pos += 3
+    elif c == 0xFD:
+        length = int.from_bytes(data[pos + 1 : pos + 4], "little")
+        pos += 4
+    else:
+        length = int.from_bytes(data[pos + 1 : pos + 9], "little")
+        pos += 9
+    return data[pos : pos + length], pos + length
+
+
+def _decode_binary_float(data, pos):
+    # Use the shortest decimal that round-trips to the same FLOAT, which is
+    # what the text protocol would have returned.
+    raw = data[pos : pos + 4]
+    value = _FLOAT_STRUCT.unpack(raw)[0]
+    for digits in range(6, 10):
+        short = float("%.*g" % (digits, value))
+        if _FLOAT_STRUCT.pack(short) == raw:
+            return short, pos + 4
+    return value, pos + 4
+
+
+def _decode_binary_datetime(data, pos):
+    length = data[pos]
+    pos += 1
+    if length == 0:
+        return "0000-00-00 00:00:00", pos
+    year = data[pos] | data[pos + 1] << 8
+    month, day = data[pos + 2], data[pos + 3]
+    hour = minute = second = microsecond = 0
+    if length >= 7:
+        hour, minute, second = data[pos + 4], data[pos + 5], data[pos + 6]
+    if length == 11:
+        microsecond = int.from_bytes(data[pos + 7 : pos + 11], "little")
+    try:
+        value = datetime.datetime(year, month, day, hour, minute, second, microsecond)
+    except ValueError:
+        value = "%04d-%02d-%02d %02d:%02d:%02d" % (
+            year,
+            month,
+            day,
+            hour,
+            minute,
+            second,
+        )
+    return value, pos + length
+
+
+def _decode_binary_date(data, pos):
+    length = data[pos]
+    pos += 1
+    if length == 0:
+        return "0000-00-00", pos
+    year = data[pos] | data[pos + 1] << 8
+    month, day = data[pos + 2], data[pos + 3]
+    try:
+        value = datetime.date(year, month, day)
+    except ValueError:
+        value = "%04d-%02d-%02d" % (year, month, day)
+    return value, pos + length
+
+
+def _decode_binary_time(data, pos):
+    length = data[pos]
+    pos += 1
+    if length == 0:
+        return datetime.timedelta(0), pos
+    negative, days, hour, minute, second = struct.unpack_from("<BIBBB", data, pos)
+    microsecond = 0
+    if length == 12:
+        microsecond = int.from_bytes(data[pos + 8 : pos + 12], "little")
+    value = datetime.timedelta(
+        days=days,
+        hours=hour,
+        minutes=minute,
+        seconds=second,
+        microseconds=microsecond,
+    )
+    return (-value if negative else value), pos + length
+
+
+def _binary_temporal_text_decoder(type_code, decimals):
+    """Decode binary DATE/DATETIME/TIMESTAMP/TIME values to the strings the text
+    protocol would have returned for the column (``decimals`` fractional digits).
+    """
+    frac = decimals if 0 < decimals <= 6 else 0
+
+    if type_code == FIELD_TYPE.DATE:
+
+        def decode(data, pos):
+            length = data[pos]
+            pos += 1
+            if length == 0:
+                return "0000-00-00", pos
+            year = data[pos] | data[pos + 1] << 8
+            value = "%04d-%02d-%02d" % (year, data[pos + 2], data[pos + 3])
+            return value, pos + length
+
+        return decode
+
+    if type_code == FIELD_TYPE.TIME:
+
+        def decode(data, pos):
+            length = data[pos]
+            pos += 1
+            negative = days = hour = minute = second = microsecond = 0
+            if length:
+                negative, days, hour, minute, second = struct.unpack_from(
+                    "<BIBBB", data, pos
+                )
+            if length == 12:
+                microsecond = int.from_bytes(data[pos + 8 : pos + 12], "little")
+            value = "%s%02d:%02d:%02d" % (
+                "-" if negative else "",
+                days * 24 + hour,
+                minute,
+                second,
+            )
+            if frac:
+                value += (".%06d" % microsecond)[: frac + 1]
+            return value, pos + length
+
+        return decode
+
+    def decode(data, pos):
+        length = data[pos]
+        pos += 1
+        year = month = day = hour = minute = second = microsecond = 0
+        if length:
+            year = data[pos] | data[pos + 1] << 8
+            month, day = data[pos + 2], data[pos + 3]
+        if length >= 7:
+            hour, minute, second = data[pos + 4], data[pos + 5], data[pos + 6]
+        if length == 11:
+            microsecond = int.from_bytes(data[pos + 7 : pos + 11], "little")
+        value = "%04d-%02d-%02d %02d:%02d:%02d" % (
+            year,
+            month,
+            day,
+            hour,
+            minute,
+            second,
+        )
+        if frac:
+            value += (".%06d" % microsecond)[: frac + 1]
+        return value, pos + length
+
+    return decode
+
+
+def _binary_decoder(field, encoding, converter):
+    """Return ``decode(data, pos) -> (value, new_pos)`` for a binary result column."""
+    type_code = field.type_code
+    structs = _BINARY_INT_STRUCTS.get(type_code)
+    if structs is not None:
+        st = structs[1] if field.flags & FLAG.UNSIGNED else structs[0]
+        unpack_from = st.unpack_from
+        size = st.size
+
+        def decode(data, pos):
+            return unpack_from(data, pos)[0], pos + size
+
+        return decode
+    if type_code == FIELD_TYPE.FLOAT:
+        return _decode_binary_float
+    if type_code in _TEMPORAL_TYPES and converter is None:
+        # The conversions map this type to ``through`` (e.g.
+        # converters.raw_temporal_conversions): return the text form.
+        return _binary_temporal_text_decoder(type_code, field.scale)
+    if type_code in (FIELD_TYPE.DATETIME, FIELD_TYPE.TIMESTAMP):
+        return _decode_binary_datetime
+    if type_code == FIELD_TYPE.DATE:
+        return _decode_binary_date
+    if type_code == FIELD_TYPE.TIME:
+        return _decode_binary_time
+
+    # everything else is a length coded string, same as the text protocol
+    def decode(data, pos):
+        value, pos = _read_lenenc_bytes(data, pos)
+        if encoding is not None:
+            value = str(value, encoding)
+        else:
+            value = bytes(value)
+        if converter is not None:
+            value = converter(value)
+        return value, pos
+
+    return decode
+
+
+_JSON_ESCAPE_RE = re.compile(rb'[\x00-\x1f"\\]')
+# Same escapes as json.dumps(..., ensure_ascii=False)
+_JSON_ESCAPES = {bytes([i]): b"\\u%04x" % i for i in range(0x20)}
+_JSON_ESCAPES.update(
+    {
+        b'"': b'\\"',
+        b"\\": b"\\\\",
+        b"\n": b"\\n",
+        b"\r": b"\\r",
+        b"\t": b"\\t",
+        b"\b": b"\\b",
+        b"\f": b"\\f",
+    }
+)
+
+#: Column types whose text protocol value is already a JSON number
+_JSON_NUMBER_TYPES = frozenset(
+    (
+        FIELD_TYPE.TINY,
+        FIELD_TYPE.SHORT,
+        FIELD_TYPE.INT24,
+        FIELD_TYPE.LONG,
+        FIELD_TYPE.LONGLONG,
+        FIELD_TYPE.YEAR,
+        FIELD_TYPE.FLOAT,
+        FIELD_TYPE.DOUBLE,
+        FIELD_TYPE.DECIMAL,
+        FIELD_TYPE.NEWDECIMAL,
+    )
+)
+
+
+def _json_escape(m):
+    return _JSON_ESCAPES[m.group()]
+
+
+def _json_string(raw):
+    """Quote UTF-8 bytes as a JSON string."""
+    if _JSON_ESCAPE_RE.search(raw) is None:
+        return b'"' + raw + b'"'
+    return b'"' + _JSON_ESCAPE_RE.sub(_json_escape, raw) + b'"'
+
+
+def _json_quote(raw):
+    """Quote bytes known not to need escaping (digits, dashes, colons)."""
+    return b'"' + raw + b'"'
+
+
+def _json_datetime(raw):
+    # "YYYY-MM-DD HH:MM:SS[.ffffff]" -> whole seconds, the way
+    # isoformat(sep=" ", timespec="seconds") writes datetimes
+    return b'"' + raw[:19] + b'"'
+
+
+def _json_value(name, encoding, converter):
+    """Return ``emit(raw) -> bytes`` that converts a column value the regular way
+    and serializes it with :func:`json.dumps` (for types with no fast path).
+
+    Binary values (BINARY, VARBINARY, BLOB, BIT, ...) are written as base64
+    strings; any other value json.dumps can't serialize raises ProgrammingError
+    naming column *name*.
+    """
+
+    def emit(raw):
+        value = raw if encoding is None else str(raw, encoding)
+        if converter is not None:
+            value = converter(value)
+        if isinstance(value, (bytes, bytearray)):
+            return b'"' + base64.b64encode(value) + b'"'
+        try:
+            return json.dumps(value, ensure_ascii=False).encode("utf-8")
+        except (TypeError, ValueError) as e:
+            raise err.ProgrammingError(
+                f"Can't encode column {name!r} as JSON: {e}"
+            ) from None
+
+    return emit
+
+
+def _text_json_encoder(field, encoding, converter):
+    """Return ``emit(raw) -> bytes`` turning a text protocol column value into
+    JSON, or None when the value bytes are valid JSON as they are."""
+    type_code = field.type_code
+    if type_code in _JSON_NUMBER_TYPES:
+        return None
+    if type_code in (FIELD_TYPE.DATETIME, FIELD_TYPE.TIMESTAMP):
+        return _json_datetime
+    if type_code in (FIELD_TYPE.DATE, FIELD_TYPE.TIME):
+        return _json_quote
+    if encoding is None or type_code == FIELD_TYPE.BIT:
+        return _json_value(field.name, encoding, converter)
+    if codecs.lookup(encoding).name in ("utf-8", "ascii"):
+        return _json_string
+    return lambda raw: _json_string(str(raw, encoding).encode("utf-8"))
+
+
+def _binary_json_encoder(field, encoding, converter):
+    """Return ``encode(data, pos) -> (bytes, new_pos)`` turning a binary protocol
+    column value into JSON."""
+    type_code = field.type_code
+    if type_code in _TEMPORAL_TYPES:
+        scale = field.scale if type_code == FIELD_TYPE.TIME else 0
+        decode = _binary_temporal_text_decoder(type_code, scale)
+
+        def encode(data, pos):
+            value, pos = decode(data, pos)
+            return b'"' + value.encode("ascii") + b'"', pos
+
+        return encode
+
+    if type_code in _BINARY_INT_STRUCTS or type_code == FIELD_TYPE.FLOAT:
+        decode = _binary_decoder(field, encoding, None)
+
+        def encode(data, pos):
+            value, pos = decode(data, pos)
+            return repr(value).encode("ascii"), pos
+
+        return encode
+
+    if type_code in _JSON_NUMBER_TYPES:
+        emit = None
+    else:
+        emit = _text_json_encoder(field, encoding, converter)
+
+    def encode(data, pos):
+        raw, pos = _read_lenenc_bytes(data, pos)
+        raw = bytes(raw)
+        return (raw if emit is None else emit(raw)), pos
+
+    return encode
+
+
 class MySQLResult:
-    def __init__(self, connection):
+    def __init__(self, connection, binary=False, json_keys=None):
         """
         :type connection: Connection
+        :param binary: Rows use the binary protocol (COM_STMT_EXECUTE results).
+        :param json_keys: If not None, read each row as the UTF-8 bytes of a JSON
+            object instead of a tuple (see :class:`~pymysql.cursors.JSONCursor`).
         """
         self.connection = connection
+        self.binary = binary
+        self.json_keys = json_keys
+        self._json_columns = None
         self.affected_rows = None
         self.insert_id = None
         self.server_status = None
@@ -1286,20 +2329,29 @@ class MySQLResult:
         self._get_descriptions()
         self._read_rowdata_packet()
 
+    def _read_row_view(self):
+        """Read the next row packet as a memoryview, or None at EOF."""
+        data = self.connection._read_packet_view()
+        if data[0] == 0xFE and len(data) < 9:
+            self._check_packet_is_eof(
+                MysqlPacket(bytes(data), self.connection.encoding)
+            )
+            return None
+        return data
+
     def _read_rowdata_packet_unbuffered(self):
         # Check if in an active query
         if not self.unbuffered_active:
             return
 
-        # EOF
-        packet = self.connection._read_packet()
-        if self._check_packet_is_eof(packet):
+        data = self._read_row_view()
+        if data is None:  # EOF
             self.unbuffered_active = False
             self.connection = None
             self.rows = None
             return
 
-        row = self._read_row_from_packet(packet)
+        row = self._read_row_from_view(data)
         self.affected_rows = 1
         self.rows = (row,)  # rows should tuple of row for MySQL-python compatibility.
         return row
@@ -1310,7 +2362,7 @@ class MySQLResult:
         # executing a query, so we just spin, and wait for an EOF packet.
         while self.unbuffered_active:
             try:
-                packet = self.connection._read_packet()
+                data = self._read_row_view()
             except err.OperationalError as e:
                 if e.args[0] in (
                     ER.QUERY_TIMEOUT,
@@ -1323,52 +2375,126 @@ class MySQLResult:
 
                 raise
 
-            if self._check_packet_is_eof(packet):
+            if data is None:
                 self.unbuffered_active = False
                 self.connection = None  # release reference to kill cyclic reference.
 
     def _read_rowdata_packet(self):
         """Read a rowdata packet for each data row in the result set."""
         rows = []
+        read_row_view = self._read_row_view
+        read_row = self._read_row_from_view
         while True:
-            packet = self.connection._read_packet()
-            if self._check_packet_is_eof(packet):
+            data = read_row_view()
+            if data is None:
                 self.connection = None  # release reference to kill cyclic reference.
                 break
-            rows.append(self._read_row_from_packet(packet))
+            rows.append(read_row(data))
 
         self.affected_rows = len(rows)
         self.rows = tuple(rows)
 
-    def _read_row_from_packet(self, packet):
+    def _read_row_from_view(self, data):
+        """Decode a text protocol row straight from the packet's memoryview."""
+        if self._json_columns is not None:
+            return self._read_json_row_from_view(data)
+        if self.binary:
+            return self._read_binary_row_from_view(data)
         row = []
+        pos = 0
+        end = len(data)
         for encoding, converter in self.converters:
-            try:
-                data = packet.read_length_coded_string()
-            except IndexError:
+            if pos >= end:
                 # No more columns in this row
                 # See https://github.com/PyMySQL/PyMySQL/pull/434
                 break
-            if data is not None:
-                if encoding is not None:
-                    data = data.decode(encoding)
-                if DEBUG:
-                    print("DEBUG: DATA = ", data)
-                if converter is not None:
-                    data = converter(data)
-            row.append(data)
+            length = data[pos]
+            if length < 0xFB:
+                pos += 1
+            elif length == 0xFB:  # NULL
+                row.append(None)
+                pos += 1
+                continue
+            elif length == 0xFC:
+                length = data[pos + 1] | data[pos + 2] << 8
+                pos += 3
+            elif length == 0xFD:
+                length = data[pos + 1] | data[pos + 2] << 8 | data[pos + 3] << 16
+                pos += 4
+            else:
+                length = int.from_bytes(data[pos + 1 : pos + 9], "little")
+                pos += 9
+            if encoding is not None:
+                value = str(data[pos : pos + length], encoding)
+            else:
+                value = bytes(data[pos : pos + length])
+            pos += length
+            if DEBUG:
+                print("DEBUG: DATA = ", value)
+            if converter is not None:
+                value = converter(value)
+            row.append(value)
         return tuple(row)
 
+    def _read_binary_row_from_view(self, data):
+        # https://dev.mysql.com/doc/dev/mysql-server/latest/page_protocol_binary_resultset.html
+        # 0x00 header, NULL bitmap with an offset of 2 bits, then the values.
+        pos = 1 + (self.field_count + 9) // 8
+        row = []
+        for i, decode in enumerate(self._binary_decoders, 2):
+            if data[1 + (i >> 3)] & (1 << (i & 7)):
+                row.append(None)
+            else:
+                value, pos = decode(data, pos)
+                row.append(value)
+        return tuple(row)
+
+    def _read_json_row_from_view(self, data):
+        """Encode a row as a JSON object straight from the column bytes."""
+        items = []
+        if self.binary:
+            pos = 1 + (self.field_count + 9) // 8
+            for i, (key, encode) in enumerate(self._json_columns, 2):
+                if data[1 + (i >> 3)] & (1 << (i & 7)):
+                    value = b"null"
+                else:
+                    value, pos = encode(data, pos)
+                if key is not None:
+                    items.append(key + value)
+        else:
+            pos = 0
+            for key, emit in self._json_columns:
+                if data[pos] == 0xFB:  # NULL
+                    value = b"null"
+                    pos += 1
+                else:
+                    raw, pos = _read_lenenc_bytes(data, pos)
+                    value = bytes(raw) if emit is None else emit(bytes(raw))
+                if key is not None:
+                    items.append(key + value)
+        return b"{" + b", ".join(items) + b"}"
+
     def _get_descriptions(self):
         """Read a column descriptor packet for each column in the result."""
+        fields = [
+            self.connection._read_packet(FieldDescriptorPacket)
+            for _ in range(self.field_count)
+        ]
+        eof_packet = self.connection._read_packet()
+        assert eof_packet.is_eof_packet(), "Protocol error, expecting EOF"
+        self._set_descriptions(fields)
+
+    def _set_descriptions(self, fields):
+        """Set up description and per-column decoders from the field packets."""
         self.fields = []
         self.converters = []
+        self._binary_decoders = []
         use_unicode = self.connection.use_unicode
         conn_encoding = self.connection.encoding
         description = []
+        interned = {}  # converter -> interning wrapper shared by its columns
 
-        for i in range(self.field_count):
-            field = self.connection._read_packet(FieldDescriptorPacket)
+        for field in fields:
             self.fields.append(field)
             description.append(field.description())
             field_type = field.type_code
@@ -1396,11 +2522,38 @@ class MySQLResult:
                 converter = None
             if DEBUG:
                 print(f"DEBUG: field={field}, converter={converter}")
+            if self.binary:
+                self._binary_decoders.append(
+                    _binary_decoder(field, encoding, converter)
+                )
+            elif converter is not None and field_type in _TEMPORAL_TYPES:
+                wrapper = interned.get(converter)
+                if wrapper is None:
+                    wrapper = interned[converter] = _interning(converter, {})
+                converter = wrapper
             self.converters.append((encoding, converter))
-
-        eof_packet = self.connection._read_packet()
-        assert eof_packet.is_eof_packet(), "Protocol error, expecting EOF"
         self.description = tuple(description)
+        if self.json_keys is not None:
+            self._set_json_columns(fields)
+
+    def _set_json_columns(self, fields):
+        """Set up the per-column JSON encoders for :attr:`json_keys`."""
+        json_keys = self.json_keys
+        names = set()
+        self._json_columns = []
+        for field, (encoding, converter) in zip(fields, self.converters):
+            name = field.name
+            if name in names:  # same as DictCursor
+                name = field.table_name + "." + name
+            names.add(name)
+            key = json_keys.get(name, name)
+            if key is not None:
+                key = json.dumps(key, ensure_ascii=False).encode("utf-8") + b": "
+            if self.binary:
+                encode = _binary_json_encoder(field, encoding, converter)
+            else:
+                encode = _text_json_encoder(field, encoding, converter)
+            self._json_columns.append((key, encode))
 
 
 class LoadLocalFile:
@@ -1414,8 +2567,14 @@ class LoadLocalFile:
             raise err.InterfaceError(0, "")
         conn: Connection = self.connection
 
+        stream = conn._local_infile_streams.pop(self.filename, None)
         try:
-            with open(self.filename, "rb") as open_file:
+            if stream is None:
+                stream = open(self.filename, "rb")
+            else:
+                # registered in-memory source; the caller owns it
+                stream = contextlib.nullcontext(stream)
+            with stream as open_file:
                 packet_size = min(
                     conn.max_allowed_packet, 16 * 1024
                 )  # 16KB is efficient enough
@@ -1,6 +1,9 @@
+import functools
 import re
 import warnings
+from collections import namedtuple
 from . import err
+from .constants import COMMAND
 
 
 #: Regular expression for :meth:`Cursor.executemany`.
@@ -14,6 +17,57 @@ RE_INSERT_VALUES = re.compile(
 )
 
 
+#: Regular expression for the UPDATE rewrite of :meth:`Cursor.executemany`:
+#: ``UPDATE ... SET ... WHERE key = %s [AND ...]``.
+RE_UPDATE_BY_KEY = re.compile(
+    r"\s*(UPDATE\b.+?\bSET\s)(.+?)\s+WHERE\s+([\w.`]+)\s*=\s*(%s|%\(\w+\)s)"
+    r"((?:\s+AND\s.*)?);?\s*\Z",
+    re.IGNORECASE | re.DOTALL,
+)
+_RE_PLACEHOLDER = re.compile(r"%(?:s|\((\w+)\)s)")
+_RE_ASSIGNMENT = re.compile(r"\s*([\w.`]+)\s*=\s*(.+?)\s*\Z", re.DOTALL)
+# WHERE tails that change meaning once the key test becomes IN (...)
+_RE_UNSAFE_TAIL = re.compile(r"\b(?:OR|XOR|LIMIT|ORDER\s+BY)\b|\|\|", re.IGNORECASE)
+
+
+def _split_assignments(text):
+    """Split a SET clause on top-level commas. Returns None if unbalanced."""
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    escaped = False
+    for i, c in enumerate(text):
+        if quote:
+            if escaped:
+                escaped = False
+            elif c == "\\" and quote != "`":
+                escaped = True
+            elif c == quote:
+                quote = None
+        elif c in "'\"`":
+            quote = c
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "," and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    if quote or depth:
+        return None
+    parts.append(text[start:])
+    return parts
+
+
+def _column_name(ref):
+    return ref.replace("`", "").rsplit(".", 1)[-1].lower()
+
+
+#: Result of one statement of :meth:`Cursor.execute_batch`.
+BatchResult = namedtuple("BatchResult", "rowcount lastrowid rows")
+
+
 class Cursor:
     """
     This is the object used to interact with the database.
@@ -31,6 +85,10 @@ class Cursor:
     #: Default value of max_allowed_packet is 1048576.
     max_stmt_length = 1024000
 
+    #: Passed to the connection as ``json_keys``; not None reads rows as JSON
+    #: objects (see :class:`JSONCursorMixin`).
+    _json_keys = None
+
     def __init__(self, connection):
         self.connection = connection
         self.warning_count = 0
@@ -90,7 +148,7 @@ class Cursor:
             return None
         self._result = None
         self._clear_result()
-        conn.next_result(unbuffered=unbuffered)
+        conn.next_result(unbuffered=unbuffered, json_keys=self._json_keys)
         self._do_get_result()
         return True
 
@@ -167,8 +225,14 @@ class Cursor:
         :rtype: int or None
 
         This method improves performance on multiple-row INSERT and
-        REPLACE. Otherwise it is equivalent to looping over args with
-        execute().
+        REPLACE, and on UPDATEs of the form
+        ``UPDATE ... SET col = %s, ... WHERE key = %s [AND ...]``, which are
+        sent as ``SET col = CASE key WHEN ... END WHERE key IN (...)``
+        statements of up to :attr:`max_stmt_length` bytes. The UPDATE rewrite
+        is used when every SET value is a lone placeholder or has none, the
+        keys are distinct and the rest of the WHERE clause, a chain of AND
+        conditions, gets the same arguments on every row. Otherwise it is
+        equivalent to looping over args with execute().
         """
         if not args:
             return
@@ -188,6 +252,15 @@ class Cursor:
                 self._get_db().encoding,
             )
 
+        m = RE_UPDATE_BY_KEY.match(query)
+        if m:
+            args = list(args)
+            statements = self._update_many_statements(m, args)
+            if statements is not None:
+                # Generated once, so not worth preparing on PreparedCursor
+                self.rowcount = sum(Cursor.execute(self, sql) for sql in statements)
+                return self.rowcount
+
         self.rowcount = sum(self.execute(query, arg) for arg in args)
         return self.rowcount
 
@@ -212,15 +285,215 @@ class Cursor:
             if isinstance(v, str):
                 v = v.encode(encoding, "surrogateescape")
             if len(sql) + len(v) + len(postfix) + 1 > max_stmt_length:
-                rows += self.execute(sql + postfix)
+                rows += Cursor.execute(self, bytes(sql + postfix))
                 sql = bytearray(prefix)
             else:
                 sql += b","
             sql += v
-        rows += self.execute(sql + postfix)
+        rows += Cursor.execute(self, bytes(sql + postfix))
         self.rowcount = rows
         return rows
 
+    def _update_many_statements(self, match, args):
+        """
+        Rewrite the UPDATE matched by :data:`RE_UPDATE_BY_KEY` for all of
+        *args* into CASE statements of at most :attr:`max_stmt_length` bytes.
+        Returns the statements as bytes, or None when the rewrite wouldn't do
+        the same as running the UPDATE once per row.
+        """
+        head, set_clause, key, key_holder, tail = match.groups()
+        if _RE_UNSAFE_TAIL.search(tail) or _RE_PLACEHOLDER.search(head):
+            return None
+        assignments = _split_assignments(set_clause)
+        if assignments is None:
+            return None
+
+        # (column, constant SQL or None, placeholder name or None)
+        columns = []
+        holders = []
+        for assignment in assignments:
+            m = _RE_ASSIGNMENT.match(assignment)
+            if m is None:
+                return None
+            column, value = m.groups()
+            if _column_name(column) == _column_name(key):
+                return None
+            holder = _RE_PLACEHOLDER.fullmatch(value)
+            if holder:
+                columns.append((column, None))
+                holders.append(holder.group(1))
+            elif _RE_PLACEHOLDER.search(value):
+                return None
+            else:
+                columns.append((column, value % ()))
+        holders.append(_RE_PLACEHOLDER.fullmatch(key_holder).group(1))
+        tail_names = [m.group(1) for m in _RE_PLACEHOLDER.finditer(tail)]
+        named = holders[0] is not None
+        if any((name is not None) != named for name in holders + tail_names):
+            return None
+        n_set = len(holders) - 1
+
+        conn = self._get_db()
+        encoding = conn.encoding
+        keys = []
+        values = [[] for _ in range(n_set)]
+        where_tail = None
+        for arg in args:
+            if not isinstance(arg, (tuple, list, dict)):
+                arg = (arg,)
+            if named != isinstance(arg, dict):
+                return None
+            escaped = self._escape_args(arg, conn)
+            if named:
+                try:
+                    row = [escaped[name] for name in holders]
+                except KeyError:
+                    return None
+                row_tail = tail % escaped
+            else:
+                if len(escaped) != len(holders) + len(tail_names):
+                    return None
+                row = escaped[: n_set + 1]
+                row_tail = tail % escaped[n_set + 1 :]
+            if where_tail is None:
+                where_tail = row_tail
+            elif row_tail != where_tail:
+                return None
+            keys.append(row[n_set].encode(encoding, "surrogateescape"))
+            for column_values, value in zip(values, row):
+                column_values.append(value.encode(encoding, "surrogateescape"))
+        if len(set(keys)) != len(keys):
+            return None
+
+        key = key.encode(encoding)
+        # SET items; varying ones are filled in per chunk
+        set_items = []
+        varying = []
+        holder_values = iter(values)
+        for column, constant in columns:
+            column = column.encode(encoding)
+            if constant is not None:
+                set_items.append(column + b" = " + constant.encode(encoding))
+                continue
+            column_values = next(holder_values)
+            if all(v == column_values[0] for v in column_values):
+                set_items.append(column + b" = " + column_values[0])
+            else:
+                varying.append((len(set_items), column, column_values))
+                set_items.append(None)
+
+        head = (head % ()).encode(encoding)
+        where = b" WHERE " + key + b" IN ("
+        tail = b")" + where_tail.encode(encoding, "surrogateescape")
+        fixed = len(head) + len(where) + len(tail) + 2 * len(set_items)
+        fixed += sum(len(item) for item in set_items if item is not None)
+        fixed += sum(
+            len(b" = CASE  ELSE  END") + len(key) + 2 * len(column)
+            for _, column, _ in varying
+        )
+
+        statements = []
+        start = 0
+        size = fixed
+        for i, k in enumerate(keys):
+            row_size = len(k) + 2
+            row_size += sum(len(k) + len(v[i]) + 12 for _, _, v in varying)
+            if i > start and size + row_size > self.max_stmt_length:
+                statements.append(
+                    self._case_update(head, set_items, varying, key, keys, start, i)
+                    + where
+                    + b", ".join(keys[start:i])
+                    + tail
+                )
+                start, size = i, fixed
+            size += row_size
+        statements.append(
+            self._case_update(head, set_items, varying, key, keys, start, len(keys))
+            + where
+            + b", ".join(keys[start:])
+            + tail
+        )
+        return statements
+
+    @staticmethod
+    def _case_update(head, set_items, varying, key, keys, start, stop):
+        """``UPDATE ... SET ...`` for rows ``start:stop``."""
+        set_items = list(set_items)
+        for index, column, column_values in varying:
+            whens = b"".join(
+                b" WHEN " + keys[i] + b" THEN " + column_values[i]
+                for i in range(start, stop)
+            )
+            set_items[index] = (
+                column + b" = CASE " + key + whens + b" ELSE " + column + b" END"
+            )
+        return head + b", ".join(set_items)
+
+    def execute_batch(self, statements):
+        """
+        Execute several statements with one round trip to the server.
+
+        Every statement is sent before any response is read (pipelined
+        commands, so ``CLIENT.MULTI_STATEMENTS`` is not needed); use it for
+        statements that don't depend on each other's results. The server runs
+        them in order, and a failing statement does not stop the ones after
+        it. Wrap the batch in a transaction to undo it on error.
+
+        :param statements: Sequence of ``(query, args)`` pairs, *args* as for
+            :meth:`execute` (None for no parameters).
+
+        :return: One :class:`BatchResult` ``(rowcount, lastrowid, rows)`` per
+            statement, with rows as :meth:`fetchall` returns them (None if the
+            statement has no result set). The cursor is left on the last
+            statement's result.
+        :rtype: list
+
+        :raise Error: The error of the first failing statement, after all the
+            results were read. Its ``batch_index`` is the statement's position
+            and ``batch_results`` the list of results, holding the exception
+            for each failed statement.
+        """
+        while self.nextset():
+            pass
+
+        conn = self._get_db()
+        statements = list(statements)
+        commands = self._batch_commands(conn, statements)
+        return self._batch_results(
+            statements, conn.execute_pipelined(commands, json_keys=self._json_keys)
+        )
+
+    def _batch_commands(self, conn, statements):
+        return [self._batch_command(conn, q, args) for q, args in statements]
+
+    def _batch_command(self, conn, query, args):
+        """Return the ``(command, payload, binary)`` that executes *query*."""
+        sql = self.mogrify(query, args).encode(conn.encoding, "surrogateescape")
+        return COMMAND.COM_QUERY, sql, False
+
+    def _batch_results(self, statements, pipelined):
+        """Turn the connection's pipelined results into :class:`BatchResult`."""
+        conn = self._get_db()
+        results = []
+        error = None
+        for index, result in enumerate(pipelined):
+            if isinstance(result, err.MySQLError):
+                if error is None:
+                    error = result
+                    error.batch_index = index
+                results.append(result)
+                continue
+            self._clear_result()
+            conn._result = result
+            self._do_get_result()
+            results.append(BatchResult(self.rowcount, self.lastrowid, self._rows))
+        if statements:
+            self._executed = statements[-1][0]
+        if error is not None:
+            error.batch_results = results
+            raise error
+        return results
+
     def callproc(self, procname, args=()):
         """Execute stored procedure procname with args.
 
@@ -319,7 +592,7 @@ class Cursor:
     def _query(self, q):
         conn = self._get_db()
         self._clear_result()
-        conn.query(q)
+        conn.query(q, json_keys=self._json_keys)
         self._do_get_result()
         return self.rowcount
 
@@ -406,6 +679,70 @@ class DictCursor(DictCursorMixin, Cursor):
     """A cursor which returns results as a dictionary"""
 
 
+@functools.lru_cache(maxsize=128)
+def _record_type(names):
+    # Invalid identifiers (e.g. "COUNT(*)") and duplicates become _0, _1, ...
+    return namedtuple("Record", names, rename=True)
+
+
+class RecordCursorMixin:
+    """
+    Returns rows as records: a namedtuple type generated once per result
+    description. Records are plain tuples (``__slots__ = ()``), so there is no
+    per-row dict, and columns can be read by index or by name.
+    """
+
+    def _do_get_result(self):
+        super()._do_get_result()
+        self.record_type = None
+        if self.description:
+            self.record_type = _record_type(tuple(d[0] for d in self.description))
+            if self._rows:
+                make = self.record_type._make
+                self._rows = [make(r) for r in self._rows]
+
+    def _conv_row(self, row):
+        if row is None:
+            return None
+        return self.record_type._make(row)
+
+
+class RecordCursor(RecordCursorMixin, Cursor):
+    """A cursor which returns results as namedtuple records"""
+
+
+class JSONCursorMixin:
+    """
+    Returns each row as the UTF-8 bytes of a JSON object, encoded straight from
+    the column bytes of the row packet without creating a Python object per
+    value. Strings are escaped like ``json.dumps(..., ensure_ascii=False)``,
+    numbers and DECIMAL are written as the server sent them, DATETIME and
+    TIMESTAMP as ``"YYYY-MM-DD HH:MM:SS"`` (fraction dropped), DATE and TIME as
+    strings, binary strings and BIT as base64 strings and NULL as ``null``.
+    Other types are converted as usual and passed to :func:`json.dumps`; a
+    value it can't serialize raises :exc:`~pymysql.err.ProgrammingError`.
+
+    Set :attr:`json_keys` before executing to rename or drop columns.
+    """
+
+    #: ``{column name: JSON key}``. Columns not in the mapping keep their name
+    #: (``table.name`` for duplicates, as DictCursor); columns mapped to None
+    #: are left out.
+    json_keys = None
+
+    @property
+    def _json_keys(self):
+        return {} if self.json_keys is None else self.json_keys
+
+    def fetchall_json(self):
+        """Return the remaining rows as the text of one JSON array."""
+        return str(b"[" + b", ".join(self.fetchall()) + b"]", "utf-8")
+
+
+class JSONCursor(JSONCursorMixin, Cursor):
+    """A cursor which returns rows as JSON object bytes"""
+
+
 class SSCursor(Cursor):
     """
     Unbuffered Cursor, mainly useful for queries that return a lot of data,
@@ -444,7 +781,7 @@ class SSCursor(Cursor):
     def _query(self, q):
         conn = self._get_db()
         self._clear_result()
-        conn.query(q, unbuffered=True)
+        conn.query(q, unbuffered=True, json_keys=self._json_keys)
         self._do_get_result()
         return self.rowcount
 
@@ -529,3 +866,143 @@ class SSCursor(Cursor):
 
 class SSDictCursor(DictCursorMixin, SSCursor):
     """An unbuffered cursor, which returns results as a dictionary"""
+
+
+class SSRecordCursor(RecordCursorMixin, SSCursor):
+    """An unbuffered cursor, which returns results as namedtuple records"""
+
+
+class SSJSONCursor(JSONCursorMixin, SSCursor):
+    """An unbuffered cursor, which returns rows as JSON object bytes"""
+
+
+#: Placeholders of the ``pyformat`` paramstyle, rewritten to ``?`` for prepare.
+RE_PYFORMAT_PARAM = re.compile(r"%(?:\((\w+)\))?s|%%")
+# Transaction control and LOAD DATA take no parameters and MySQL refuses to
+# prepare most of them (ER_UNSUPPORTED_PS), so PreparedCursor sends them as text
+# rather than spending a round trip on a COM_STMT_PREPARE that fails.
+_RE_TEXT_ONLY = re.compile(
+    r"\s*(?:BEGIN|START\s+TRANSACTION|COMMIT|ROLLBACK|SAVEPOINT|RELEASE\s+SAVEPOINT"
+    r"|LOAD\s+DATA)\b",
+    re.IGNORECASE,
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _qmark_query(query):
+    """Rewrite ``%s`` / ``%(name)s`` to ``?``; return (sql, names or None)."""
+    names = []
+
+    def repl(m):
+        if m.group(0) == "%%":
+            return "%"
+        names.append(m.group(1))
+        return "?"
+
+    sql = RE_PYFORMAT_PARAM.sub(repl, query)
+    if any(names):
+        if not all(names):
+            raise err.ProgrammingError("Can't mix %s and %(name)s placeholders")
+        return sql, tuple(names)
+    return sql, None
+
+
+class PreparedCursor(Cursor):
+    """
+    A cursor which executes statements with server-side prepared statements
+    (COM_STMT_PREPARE / COM_STMT_EXECUTE) and reads rows with the binary protocol.
+
+    Placeholders are the same as :class:`Cursor` (``%s`` or ``%(name)s``), but
+    arguments are sent as typed values instead of being escaped into the SQL
+    text. Statements are cached on the connection
+    (see ``max_prepared_statements``), so a statement is parsed by the server
+    once per connection.
+
+    Statements the server can't prepare fall back to :class:`Cursor`
+    behaviour, as does the bulk INSERT path of :meth:`executemany`, which is
+    already a single round trip. Transaction control (``BEGIN``, ``COMMIT``,
+    ...) and ``LOAD DATA`` are sent as text without trying to prepare them.
+    Sequence arguments such as ``IN %s`` are not supported.
+
+    :meth:`execute_batch` prepares the statements it hasn't seen yet in one
+    pipelined round trip before sending the batch, so a batch with new
+    statements takes two round trips and one with cached statements takes one.
+    A batch can't use more distinct statements than ``max_prepared_statements``.
+    """
+
+    def execute(self, query, args=None):
+        """Execute a query as a prepared statement.
+
+        :param query: Query to execute.
+        :type query: str
+
+        :param args: Parameters used with query. (optional)
+        :type args: tuple, list or dict
+
+        :return: Number of affected rows.
+        :rtype: int
+        """
+        while self.nextset():
+            pass
+
+        conn = self._get_db()
+        stmt, params = self._prepare(conn, query, args)
+        if stmt is None:
+            return super().execute(query, args)
+
+        self._clear_result()
+        conn.execute_prepared(stmt, params, json_keys=self._json_keys)
+        self._do_get_result()
+        self._executed = query
+        return self.rowcount
+
+    def _prepare(self, conn, query, args):
+        """Return ``(statement, params)``, or ``(None, None)`` if *query* is
+        sent as text."""
+        sql, names = self._statement_sql(query, args)
+        if sql is None:
+            return None, None
+        stmt = conn.prepare(sql)
+        if stmt is None:
+            return None, None
+
+        if names is not None:
+            args = tuple(args[name] for name in names)
+        elif isinstance(args, dict):
+            raise err.ProgrammingError("dict args need %(name)s placeholders")
+        elif args is not None and not isinstance(args, (tuple, list)):
+            args = (args,)
+        return stmt, args
+
+    @staticmethod
+    def _statement_sql(query, args):
+        """Return ``(sql, names)`` to prepare for *query*, or ``(None, None)``
+        for statements sent as text without trying to prepare them."""
+        if _RE_TEXT_ONLY.match(query):
+            return None, None
+        if args is None:
+            return query, None
+        return _qmark_query(query)
+
+    def _batch_commands(self, conn, statements):
+        sqls = [self._statement_sql(q, args)[0] for q, args in statements]
+        conn.prepare_pipelined(sql for sql in sqls if sql is not None)
+        return super()._batch_commands(conn, statements)
+
+    def _batch_command(self, conn, query, args):
+        stmt, params = self._prepare(conn, query, args)
+        if stmt is None:
+            return super()._batch_command(conn, query, args)
+        return COMMAND.COM_STMT_EXECUTE, stmt.execute_payload(params), True
+
+
+class PreparedDictCursor(DictCursorMixin, PreparedCursor):
+    """A prepared statement cursor which returns results as a dictionary"""
+
+
+class PreparedRecordCursor(RecordCursorMixin, PreparedCursor):
+    """A prepared statement cursor which returns results as namedtuple records"""
+
+
+class PreparedJSONCursor(JSONCursorMixin, PreparedCursor):
+    """A prepared statement cursor which returns rows as JSON object bytes"""
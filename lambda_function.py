@@ -1,6 +1,17 @@
-import os, json, pymysql, jwt
+import os, io, re, csv, gzip, json, time, random, logging, tempfile, zipfile, functools, pymysql, jwt
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
+from urllib.parse import quote
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape as xml_escape
+from pymysql.constants import CLIENT, CR, SERVER_STATUS
+from pymysql.observers import ConnectionObserver, fingerprint
+try:
+    import brotli  # 선택 사항: 레이어에 포함되어 있으면 br 응답 압축에 사용
+except ImportError:
+    brotli = None
 
 # ----------------------------------------
 # [암호화모듈 사용을 위한 추가 시작]
@@ -21,9 +32,80 @@ DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_NAME = os.getenv("DB_NAME")
 DB_PORT = int(os.getenv("DB_PORT", "3306"))
+# LOAD DATA LOCAL INFILE 사용 여부 (대량 일괄 등록용, 서버 local_infile=ON 필요)
+DB_LOCAL_INFILE = os.getenv("DB_LOCAL_INFILE", "0") == "1"
+# MySQL 압축 프로토콜(zlib) 사용 여부 (DB가 다른 AZ에 있어 전송량이 병목일 때)
+DB_COMPRESS = os.getenv("DB_COMPRESS", "0") == "1"
+# DATE/DATETIME/TIMESTAMP/TIME 컬럼을 datetime 객체 대신 ISO 문자열 그대로 받기
+# (응답에서 다시 문자열로 바꾸는 경우가 대부분이라 변환 비용을 생략)
+DB_RAW_TEMPORALS = os.getenv("DB_RAW_TEMPORALS", "0") == "1"
 
 JWT_SECRET  = os.getenv("JWT_SECRET", "change-me")
 JWT_EXP_MIN = int(os.getenv("JWT_EXP_MIN", "60"))
+# 검증된 토큰 캐시 크기(0이면 사용 안 함)와 항목 최대 유지 시간(초). 항목은 토큰 exp에 먼저 만료될 수 있습니다.
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "1024"))
+AUTH_CACHE_TTL_SEC = int(os.getenv("AUTH_CACHE_TTL_SEC", "300"))
+
+# ----------------------------------------
+# 로깅
+# LOG_LEVEL: DEBUG / INFO / WARNING / ERROR (기본 INFO)
+# LOG_ROW_SAMPLE_RATE: DEBUG 레벨에서 행 단위 로그를 남길 요청 비율 (기본 0 = 행 로그 없음)
+# LOG_ROW_SAMPLE_MAX: 샘플링된 요청에서 남길 최대 행 수
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_ROW_SAMPLE_RATE = float(os.getenv("LOG_ROW_SAMPLE_RATE", "0"))
+LOG_ROW_SAMPLE_MAX = int(os.getenv("LOG_ROW_SAMPLE_MAX", "20"))
+# LOG_DB_STATS: 호출마다 DB 사용 통계(쿼리 수, 송수신 바이트, 대기/전송/디코딩 시간)를 INFO 한 줄로 남김 (기본 1)
+# LOG_DB_STATS_TOP: 통계 줄에 남길 쿼리 지문 수 (소요 시간 순)
+LOG_DB_STATS = os.getenv("LOG_DB_STATS", "1") == "1"
+LOG_DB_STATS_TOP = int(os.getenv("LOG_DB_STATS_TOP", "5"))
+
+_logger = logging.getLogger("nanum")
+_logger.setLevel(LOG_LEVEL)
+if not logging.getLogger().handlers:
+    # Lambda 런타임 밖(로컬 실행)에서는 루트 핸들러가 없으므로 추가
+    logging.basicConfig(format="%(message)s")
+
+
+class _StructuredLog:
+    """JSON 한 줄 단위의 레벨 로그. 꺼진 레벨은 메시지 문자열도 만들지 않습니다."""
+
+    def _emit(self, level, message, fields):
+        if not _logger.isEnabledFor(level):
+            return
+        record = {"level": logging.getLevelName(level), "msg": message}
+        record.update(fields)
+        _logger.log(level, json.dumps(record, ensure_ascii=False, default=str))
+
+    def debug(self, message, **fields):
+        self._emit(logging.DEBUG, message, fields)
+
+    def info(self, message, **fields):
+        self._emit(logging.INFO, message, fields)
+
+    def warning(self, message, **fields):
+        self._emit(logging.WARNING, message, fields)
+
+    def error(self, message, **fields):
+        self._emit(logging.ERROR, message, fields)
+
+    def rows(self, message, rows, **fields):
+        """행 단위 디버그 로그. DEBUG 레벨이면서 샘플링에 걸린 요청에서만 앞쪽 일부 행을 남깁니다.
+
+        rows 는 행 목록 또는 JSON 배열 문자열(fetchall_json 결과)입니다.
+        """
+        if LOG_ROW_SAMPLE_RATE <= 0 or not _logger.isEnabledFor(logging.DEBUG):
+            return
+        if random.random() >= LOG_ROW_SAMPLE_RATE:
+            return
+        if isinstance(rows, str):
+            rows = json.loads(rows)
+        sample = [row._asdict() if hasattr(row, "_asdict") else json.loads(row) if isinstance(row, bytes) else row
+                  for row in rows[:LOG_ROW_SAMPLE_MAX]]
+        self._emit(logging.DEBUG, message, dict(fields, count=len(rows), rows=sample))
+
+
+log = _StructuredLog()
+# ----------------------------------------
 
 # 암호화에 사용할 Key와 Salt는 환경변수에서 가져옵니다.
 # [암호화모듈 사용을 위한 추가 시작]
@@ -93,22 +175,77 @@ def issue_jwt(org_id: str) -> str:
     }
     return jwt.encode(payload, JWT_SECRET, algorithm="HS256")
 
+class _VerifiedTokenCache:
+    """검증을 통과한 토큰의 digest -> (sub, 만료 시각) LRU 캐시.
+
+    SPA는 세션 동안 같은 Bearer 토큰을 보내므로, 웜 컨테이너에서는 두 번째 요청부터
+    토큰 검증(분리, base64 디코딩, JSON 파싱, HMAC 계산, 클레임 검증)를 건너뜁니다.
+    항목은 토큰 exp 또는 AUTH_CACHE_TTL_SEC 중 이른 시각에 만료되고, 검증 실패한 토큰은 저장하지 않습니다.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(token):
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, key, now):
+        entry = self._entries.get(key)
+        if entry is not None:
+            sub, expires_at = entry
+            if now < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return sub
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, sub, exp, now):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (sub, min(exp, now + self.ttl))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+_auth_cache = _VerifiedTokenCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL_SEC)
+# 키/알고리즘/옵션이 고정이므로 HMAC 키 준비와 옵션 병합은 콜드 스타트 때 한 번만 합니다.
+_token_verifier = jwt.Verifier(JWT_SECRET, ["HS256"], {"require": ["exp", "iat", "sub"]})
+
+
 def require_auth(event) -> str:
-    print(f"인증 검사 시작: {event.get('headers', {}).get('Authorization', 'No Authorization header')}")
-    auth = (event.get("headers") or {}).get("Authorization") or ""
+    auth = _header(event, "Authorization") or ""
     if not auth.startswith("Bearer "):
-        print("Bearer 토큰이 없습니다.")
+        log.info("Bearer 토큰이 없습니다.")
         raise PermissionError("missing bearer token")
     token = auth.split(" ", 1)[1].strip()
+
+    now = time.time()
+    cache_key = _auth_cache.key(token)
+    org_id = _auth_cache.get(cache_key, now)
+    if org_id is not None:
+        return org_id
+
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"], options={"require":["exp","iat","sub"]})
-        print(f"인증 성공: org_id = {payload['sub']}")
+        payload = _token_verifier.verify(token)
+        log.debug("인증 성공", org_id=payload["sub"], auth_cache=_auth_cache.stats())
+        _auth_cache.put(cache_key, payload["sub"], payload["exp"], now)
         return payload["sub"]  # org_id
     except jwt.ExpiredSignatureError:
-        print("토큰 만료")
+        log.info("토큰 만료")
         raise PermissionError("token expired")
     except jwt.InvalidTokenError as e:
-        print(f"유효하지 않은 토큰: {str(e)}")
+        log.info("유효하지 않은 토큰", error=str(e))
         raise PermissionError("invalid token")
 
 # 작은따옴표 이스케이프 함수
@@ -118,57 +255,593 @@ def escape_single_quotes(text):
         return None
     return str(text).replace("'", "''")
 
-# ★ 누락된 함수 추가 ★
+# ----------------------------------------
+# 웜 컨테이너 DB 연결 재사용
+# Lambda 컨테이너가 살아있는 동안 하나의 연결을 모듈 전역에 보관하고 재사용합니다.
+# 매 요청마다 TCP 연결 + 인증(caching_sha2_password) 왕복을 하지 않기 위함입니다.
+# 마지막 사용 후 DB_IDLE_PING_SEC 안에는 ping 없이 재사용하므로, 그 사이 끊긴 연결은
+# 요청 처리 중에 드러납니다. 이때 조회(GET) 요청은 새 연결로 한 번 다시 실행합니다. (_dispatch)
+DB_IDLE_PING_SEC = int(os.getenv("DB_IDLE_PING_SEC", "30"))
+
+# 재연결 대상 오류 코드 (서버 연결 끊김)
+_CONN_LOST_ERRORS = (CR.CR_SERVER_GONE_ERROR, CR.CR_SERVER_LOST, CR.CR_CONN_HOST_ERROR)
+
+_conn = None
+_conn_last_used = 0.0
+# get_conn 이 끊긴 연결을 버린 횟수 (요청 처리 중 연결이 끊겼는지 _dispatch 에서 확인)
+_conn_drops = 0
+
+
+class _DbStats(ConnectionObserver):
+    """호출 하나 동안의 DB 사용량을 모아 flush()에서 로그 한 줄로 남기는 연결 옵저버.
+
+    시간은 서버 대기(첫 응답까지), 전송(나머지 수신), 디코딩(행 변환)으로 나눕니다.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.connects = 0
+        self.connect_time = 0.0
+        self.commands = 0
+        self.results = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.packets = 0
+        self.rows = 0
+        self.send_time = 0.0
+        self.wait_time = 0.0
+        self.transfer_time = 0.0
+        self.decode_time = 0.0
+        self.by_sql = {}  # 지문 -> [횟수, 행 수, 소요 시간]
+
+    def after_connect(self, conn, elapsed, error):
+        self.connects += 1
+        self.connect_time += elapsed
+        if error is not None:
+            self.errors += 1
+
+    def after_command(self, conn, command, sql, bytes_sent, elapsed, error):
+        self.commands += 1
+        self.bytes_sent += bytes_sent
+        self.send_time += elapsed
+        if error is not None:
+            self.errors += 1
+
+    def after_result(self, conn, sql, stats, error):
+        self.results += 1
+        self.bytes_received += stats.bytes_received
+        self.packets += stats.packets
+        self.rows += stats.rows
+        self.wait_time += stats.wait
+        self.transfer_time += stats.transfer
+        self.decode_time += stats.decode
+        if error is not None:
+            self.errors += 1
+        entry = self.by_sql.get(sql)
+        if entry is None:
+            entry = self.by_sql[sql] = [0, 0, 0.0]
+        entry[0] += 1
+        entry[1] += stats.rows
+        entry[2] += stats.elapsed
+
+    def flush(self, **fields):
+        """모은 통계를 로그로 남기고 초기화합니다. DB를 쓰지 않은 호출은 남기지 않습니다."""
+        if not (self.commands or self.connects):
+            return
+        # 같은 지문의 쿼리(리터럴만 다른 경우)를 합친 뒤 소요 시간 순으로 상위 몇 개만 남김
+        queries = {}
+        for sql, (count, rows, elapsed) in self.by_sql.items():
+            entry = queries.setdefault(fingerprint(sql) or "-", [0, 0, 0.0])
+            entry[0] += count
+            entry[1] += rows
+            entry[2] += elapsed
+        top = sorted(queries.items(), key=lambda item: item[1][2], reverse=True)
+
+        def ms(seconds):
+            return round(seconds * 1000, 2)
+
+        log.info(
+            "DB 통계",
+            **{k: v for k, v in fields.items() if v is not None},
+            db=dict(
+                connects=self.connects,
+                connect_ms=ms(self.connect_time),
+                commands=self.commands,
+                results=self.results,
+                errors=self.errors,
+                bytes_sent=self.bytes_sent,
+                bytes_received=self.bytes_received,
+                packets=self.packets,
+                rows=self.rows,
+                send_ms=ms(self.send_time),
+                wait_ms=ms(self.wait_time),
+                transfer_ms=ms(self.transfer_time),
+                decode_ms=ms(self.decode_time),
+                queries=[
+                    {"sql": fp[:300], "count": count, "rows": rows, "ms": ms(elapsed)}
+                    for fp, (count, rows, elapsed) in top[:LOG_DB_STATS_TOP]
+                ],
+            ),
+        )
+        self.reset()
+
+
+_db_stats = _DbStats() if LOG_DB_STATS else None
+
+
+def _new_conn():
+    log.info("데이터베이스 연결 시도", host=DB_HOST, user=DB_USER, database=DB_NAME)
+    conn = pymysql.connect(
+        host=DB_HOST,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        db=DB_NAME,
+        port=DB_PORT,
+        # 서버 측 prepared statement(바이너리 프로토콜) 사용. 같은 모양의 쿼리는
+        # 연결당 한 번만 파싱되고 인자 이스케이프 없이 전송됩니다.
+        cursorclass=pymysql.cursors.PreparedDictCursor,
+        # UPDATE 결과를 "변경된 행"이 아닌 "조건에 맞은 행" 수로 받기 위해 사용
+        client_flag=CLIENT.FOUND_ROWS,
+        local_infile=DB_LOCAL_INFILE,
+        compress=DB_COMPRESS,
+        conv=pymysql.converters.raw_temporal_conversions if DB_RAW_TEMPORALS else None,
+        # 호출 단위 DB 통계 (LOG_DB_STATS=0 이면 옵저버 없이 연결)
+        observers=[_db_stats] if _db_stats is not None else None,
+        autocommit=True,
+        connect_timeout=5,
+        read_timeout=10,
+        write_timeout=10,
+    )
+    log.info("데이터베이스 연결 성공")
+    return conn
+
+
+def _discard_conn():
+    """보관 중인 연결을 버립니다. 다음 요청에서 새로 연결합니다."""
+    global _conn
+    conn, _conn = _conn, None
+    if conn is not None:
+        try:
+            conn._force_close()
+        except Exception:
+            pass
+
+
+def _acquire_conn():
+    """보관 중인 연결을 검증해서 반환하고, 없거나 끊겼으면 한 번만 재연결합니다."""
+    global _conn
+    conn = _conn
+    if conn is not None and conn.open:
+        # 최근에 사용한 연결은 ping 왕복 없이 바로 사용
+        if time.monotonic() - _conn_last_used < DB_IDLE_PING_SEC:
+            return conn
+        try:
+            conn.ping(reconnect=False)
+            return conn
+        except pymysql.err.OperationalError as e:
+            log.warning("유휴 연결 끊김 감지, 재연결합니다", error=str(e))
+        except pymysql.err.Error as e:
+            log.warning("연결 상태 확인 실패, 재연결합니다", error=str(e))
+    _discard_conn()
+    _conn = _new_conn()
+    return _conn
+
+
+def _reset_session(conn):
+    """다음 호출에 세션 상태가 넘어가지 않도록 정리합니다."""
+    if conn.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+        conn.rollback()
+    if not conn.get_autocommit():
+        conn.autocommit(True)
+
+
+@contextmanager
 def get_conn():
+    """요청 단위로 웜 연결을 빌려줍니다. with 블록이 끝나도 연결을 닫지 않습니다.
+
+    블록 안에서 연결이 끊기면(_CONN_LOST_ERRORS) 연결을 버리고 오류를 그대로 올립니다.
+    재연결은 다음 get_conn 에서 합니다.
+    """
+    global _conn_last_used, _conn_drops
     try:
-        print(f"데이터베이스 연결 시도 - host: {DB_HOST}, user: {DB_USER}, database: {DB_NAME}")
-        conn = pymysql.connect(
-            host=DB_HOST,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            db=DB_NAME,
-            port=DB_PORT,
-            cursorclass=pymysql.cursors.DictCursor,
-            autocommit=True,
-            connect_timeout=5,
-            read_timeout=10,
-            write_timeout=10,
-        )
-        print("데이터베이스 연결 성공")
-        return conn
+        conn = _acquire_conn()
     except Exception as e:
-        print(f"데이터베이스 연결 실패: {str(e)}")
-        raise e
+        log.error("데이터베이스 연결 실패", error=str(e))
+        raise
+    try:
+        yield conn
+    except pymysql.err.OperationalError as e:
+        if e.args and e.args[0] in _CONN_LOST_ERRORS:
+            _discard_conn()
+            _conn_drops += 1
+        raise
+    finally:
+        if conn is _conn and conn.open:
+            try:
+                _reset_session(conn)
+                _conn_last_used = time.monotonic()
+            except pymysql.err.Error as e:
+                log.warning("세션 정리 실패, 연결을 버립니다", error=str(e))
+                _discard_conn()
+
+
+@contextmanager
+def _transaction(conn, begin=True):
+    """with 블록을 하나의 트랜잭션으로 실행합니다. 예외가 나면 롤백합니다.
+
+    begin=False 이면 블록의 첫 execute_batch 에 ("BEGIN", None)을 넣어 왕복 한 번을 줄입니다.
+    BEGIN/COMMIT은 prepare 없이 텍스트로 배치에 실리고, 배치의 나머지 문장은 캐시되어 있으면
+    왕복 한 번, 연결에서 처음 보는 문장이면 prepare를 모아 보내는 왕복이 한 번 더 듭니다.
+    """
+    if begin:
+        conn.begin()
+    try:
+        yield
+    except BaseException:
+        # 롤백 실패(연결 끊김 등)가 원래 예외를 가리지 않게 기록만 하고 원래 예외를 다시 던짐
+        try:
+            conn.rollback()
+        except Exception as e:
+            log.warning("롤백 실패", error=str(e))
+        raise
+    conn.commit()
+# ----------------------------------------
 
 def _json_default(o):
     if isinstance(o, (datetime, date)):
         return o.isoformat(sep=" ", timespec="seconds")
     if isinstance(o, Decimal):
         return float(o)
+    if isinstance(o, (bytes, bytearray)):
+        # PreparedJSONCursor와 같이 BINARY/BLOB/BIT 값은 base64 문자열로 내보냅니다.
+        return base64.b64encode(o).decode("ascii")
     raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
 
-def _resp(status, body):
+_CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type,Authorization,If-None-Match,X-Amz-Date,X-Api-Key,X-Amz-Security-Token",
+    "Access-Control-Allow-Methods": "GET,POST,PUT,DELETE,OPTIONS",
+    "Access-Control-Max-Age": "86400",
+    "Access-Control-Allow-Credentials": "false",
+    "Access-Control-Expose-Headers": "ETag"
+}
+
+def _resp(status, body, headers=None):
+    return _resp_text(status, json.dumps(body, ensure_ascii=False, default=_json_default), headers)
+
+def _resp_text(status, text, headers=None):
+    """이미 JSON 문자열로 만든 본문으로 응답합니다."""
+    response_headers = {"Content-Type": "application/json; charset=utf-8"}
+    response_headers.update(_CORS_HEADERS)
+    if headers:
+        response_headers.update(headers)
     return {
         "statusCode": status,
-        "headers": {
-            "Content-Type": "application/json; charset=utf-8",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Content-Type,Authorization,X-Amz-Date,X-Api-Key,X-Amz-Security-Token",
-            "Access-Control-Allow-Methods": "GET,POST,PUT,DELETE,OPTIONS",
-            "Access-Control-Max-Age": "86400",
-            "Access-Control-Allow-Credentials": "false"
-        },
-        "body": json.dumps(body, ensure_ascii=False, default=_json_default),
+        "headers": response_headers,
+        "body": text,
     }
 
+# ----------------------------------------
+# 응답 압축 / 조건부 GET
+# RESP_COMPRESS_MIN_BYTES 이상인 응답 본문은 Accept-Encoding 에 따라 br(brotli 모듈이 있을 때)
+# 또는 gzip 으로 압축해 base64(isBase64Encoded)로 반환합니다.
+# 목록 응답(GET /businesses, GET /businesses/{id}/targets)은 (행 수, 최대 updated_at, 행 체크섬)
+# 버전 쿼리로 강한 ETag를 만들고, If-None-Match 가 같으면 목록 쿼리 없이 304를 반환합니다.
+RESP_COMPRESS_MIN_BYTES = int(os.getenv("RESP_COMPRESS_MIN_BYTES", "1024"))
+_GZIP_LEVEL = 6
+_BROTLI_QUALITY = 5
+# 브라우저가 매번 ETag로 재검증하도록 합니다. (변경 후 목록 재조회가 304로 끝남)
+_LIST_CACHE_CONTROL = "private, no-cache"
+
+
+def _header(event, name):
+    """대소문자 구분 없이 요청 헤더 값을 찾습니다. (REST API는 원래 대소문자, HTTP API는 소문자)"""
+    headers = event.get("headers") or {}
+    value = headers.get(name)
+    if value is None:
+        name = name.lower()
+        for key, candidate in headers.items():
+            if key.lower() == name:
+                return candidate
+    return value
+
+
+def _accept_encoding(event):
+    """클라이언트가 받는 인코딩 중 br > gzip 순서로 하나를 고릅니다. 없으면 None."""
+    accepted = {}
+    for part in (_header(event, "Accept-Encoding") or "").split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def _encode_response(event, response):
+    """JSON 응답 본문을 협상된 인코딩으로 압축합니다. 압축한 표현의 ETag에는 -gzip/-br을 붙입니다."""
+    body = response.get("body")
+    if not isinstance(body, str) or response.get("isBase64Encoded") or response.get("statusCode") == 304:
+        return response
+    raw = body.encode("utf-8")
+    if len(raw) < RESP_COMPRESS_MIN_BYTES:
+        return response
+    headers = response.setdefault("headers", {})
+    headers["Vary"] = "Accept-Encoding"
+    encoding = _accept_encoding(event)
+    if encoding is None:
+        return response
+    if encoding == "br":
+        data = brotli.compress(raw, quality=_BROTLI_QUALITY)
+    else:
+        data = gzip.compress(raw, compresslevel=_GZIP_LEVEL, mtime=0)
+    if len(data) >= len(raw):
+        return response
+    headers["Content-Encoding"] = encoding
+    etag = headers.get("ETag")
+    if etag:
+        headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+    response["body"] = base64.b64encode(data).decode("ascii")
+    response["isBase64Encoded"] = True
+    return response
+
+
+def _list_etag(*parts):
+    """목록 버전과 요청 범위(기관/사업/쿼리 파라미터)로 강한 ETag를 만듭니다."""
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return '"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _etag_matches(event, etag):
+    """If-None-Match 가 etag와 같은 표현(압축 접미사 무시)을 가리키는지 확인합니다."""
+    value = _header(event, "If-None-Match")
+    if not value:
+        return False
+    if value.strip() == "*":
+        return True
+    tag = etag.strip('"')
+    for candidate in value.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        candidate = candidate.strip('"')
+        for suffix in ("-br", "-gzip"):
+            if candidate.endswith(suffix):
+                candidate = candidate[:-len(suffix)]
+                break
+        if candidate == tag:
+            return True
+    return False
+
+
+def _not_modified(etag):
+    headers = dict(_CORS_HEADERS)
+    headers["ETag"] = etag
+    headers["Cache-Control"] = _LIST_CACHE_CONTROL
+    return {"statusCode": 304, "headers": headers, "body": ""}
+
+# ----------------------------------------
+# 데이터 접근 계층
+# 그룹 소유권(org_id) 확인을 별도 SELECT 없이 조회/변경 쿼리 안에 JOIN 조건으로 넣어
+# 요청당 DB 왕복을 한 번으로 줄입니다.
+# 변경 쿼리는 affected rows(FOUND_ROWS)로 성공/404를 구분합니다.
+
+_TARGET_COLUMNS = """
+    t.target_id, t.target_name, t.target_type, t.target_gubun,
+    t.zipcode, t.address1, t.address2, t.mobile_phone, t.office_phone,
+    t.apply_reason, t.directions, t.created_at, t.updated_at
+"""
+
+
+def _group_stmt(org_id, business_id, lock=False):
+    """기관 소유의 사업(그룹) 행을 찾는 문장 (sql, args). lock=True 이면 FOR UPDATE 로 잠급니다."""
+    return f"""
+        SELECT group_id FROM nm_groups
+        WHERE group_id = %s AND org_id = %s AND is_deleted = 0{" FOR UPDATE" if lock else ""}
+    """, (business_id, org_id)
+
+
+def _group_exists(cur, org_id, business_id, lock=False):
+    """사업 존재(소유) 여부. 변경 쿼리가 0건일 때 404 메시지(사업/대상자)를 구분하는 데도 씁니다.
+
+    target_count 를 바꾸는 트랜잭션은 lock=True 로 대상자 행보다 먼저 사업 행을 잠급니다.
+    (_adjust_target_count 참고)
+    """
+    cur.execute(*_group_stmt(org_id, business_id, lock))
+    return cur.fetchone() is not None
+
+
+def _businesses_version(cur, org_id):
+    """기관의 사업 목록 버전: (행 수, 최대 updated_at, 행 체크섬).
+
+    target_count 증감은 updated_at 을 바꾸지 않으므로 체크섬에 포함합니다.
+    """
+    cur.execute("""
+        SELECT COUNT(*) AS cnt, MAX(updated_at) AS max_updated_at,
+               BIT_XOR(CRC32(CONCAT_WS(':', group_id, updated_at, target_count))) AS checksum
+        FROM nm_groups
+        WHERE org_id = %s AND is_deleted = 0
+    """, (org_id,))
+    row = cur.fetchone()
+    return (row["cnt"], row["max_updated_at"], row["checksum"])
+
+
+def _targets_version(cur, org_id, business_id):
+    """사업의 대상자 목록 버전: (행 수, 최대 updated_at, 행 체크섬). 그룹이 없으면 None.
+
+    (group_id, is_deleted, updated_at) 인덱스만 읽습니다. 같은 초 안의 추가+삭제처럼
+    행 수와 최대 updated_at 이 그대로인 변경은 (target_id, updated_at) 체크섬으로 구분합니다.
+    """
+    cur.execute("""
+        SELECT COUNT(t.target_id) AS cnt, MAX(t.updated_at) AS max_updated_at,
+               BIT_XOR(CRC32(CONCAT_WS(':', t.target_id, t.updated_at))) AS checksum
+        FROM nm_groups g
+        LEFT JOIN nm_targets t ON t.group_id = g.group_id AND t.is_deleted = 0
+        WHERE g.group_id = %s AND g.org_id = %s AND g.is_deleted = 0
+        GROUP BY g.group_id
+    """, (business_id, org_id))
+    row = cur.fetchone()
+    if row is None:
+        return None
+    return (row["cnt"], row["max_updated_at"], row["checksum"])
+
+
+def _select_targets(conn, org_id, business_id, columns=None, after=None, limit=None):
+    """그룹 소유권 확인과 대상자 목록 조회를 한 쿼리로 수행합니다.
+
+    그룹이 없거나 다른 기관의 그룹이면 None, 대상자가 없으면 빈 리스트를 반환합니다.
+    행은 dict 대신 namedtuple 레코드(PreparedRecordCursor)로 반환합니다.
+    columns를 주면 해당 nm_targets 컬럼만 조회하고, after=(created_at, target_id)와
+    limit을 주면 (created_at DESC, target_id DESC) 순서의 키셋 페이지를 조회합니다.
+    """
+    select_sql = _TARGET_COLUMNS if columns is None else ", ".join(f"t.{c}" for c in columns)
+    join_params = []
+    join_sql = ""
+    if after is not None:
+        join_sql += " AND (t.created_at < %s OR (t.created_at = %s AND t.target_id < %s))"
+        join_params += [after[0], after[0], after[1]]
+    limit_sql = ""
+    limit_params = []
+    if limit is not None:
+        limit_sql = "LIMIT %s"
+        limit_params.append(int(limit))
+    with conn.cursor(pymysql.cursors.PreparedRecordCursor) as cur:
+        cur.execute(f"""
+            SELECT {select_sql}
+            FROM nm_groups g
+            LEFT JOIN nm_targets t
+                   ON t.group_id = g.group_id AND t.is_deleted = 0{join_sql}
+            WHERE g.group_id = %s AND g.org_id = %s AND g.is_deleted = 0
+            ORDER BY t.created_at DESC, t.target_id DESC
+            {limit_sql}
+        """, (*join_params, business_id, org_id, *limit_params))
+        rows = cur.fetchall()
+    if not rows:
+        return None
+    # LEFT JOIN 결과가 NULL 한 줄이면 그룹은 있지만 대상자가 없는 경우
+    return [row for row in rows if row.target_id is not None]
+
+
+def _select_target(conn, org_id, business_id, target_id):
+    """(그룹 존재 여부, 대상자 레코드)를 한 쿼리로 조회합니다."""
+    with conn.cursor(pymysql.cursors.PreparedRecordCursor) as cur:
+        cur.execute(f"""
+            SELECT {_TARGET_COLUMNS}
+            FROM nm_groups g
+            LEFT JOIN nm_targets t
+                   ON t.group_id = g.group_id AND t.target_id = %s AND t.is_deleted = 0
+            WHERE g.group_id = %s AND g.org_id = %s AND g.is_deleted = 0
+        """, (target_id, business_id, org_id))
+        row = cur.fetchone()
+    if row is None:
+        return False, None
+    if row.target_id is None:
+        return True, None
+    return True, row
+
+
+def _insert_target_stmt(org_id, business_id, values):
+    """소유한 그룹일 때만 대상자를 추가하는 INSERT ... SELECT 문장 (sql, args)."""
+    return """
+        INSERT INTO nm_targets (group_id, target_name, target_type, target_gubun, zipcode, address1, address2, mobile_phone, office_phone, apply_reason, directions, is_deleted)
+        SELECT g.group_id, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 0
+        FROM nm_groups g
+        WHERE g.group_id = %s AND g.org_id = %s AND g.is_deleted = 0
+    """, (*values, business_id, org_id)
+
+
+def _update_target_stmt(org_id, business_id, target_id, set_sql, params, deleted=False):
+    """UPDATE ... JOIN nm_groups 로 소유권 확인과 수정을 한 번에 하는 문장 (sql, args).
+
+    STRAIGHT_JOIN 으로 사업 행을 대상자 행보다 먼저 읽어, 잠금 순서가 다른 쓰기 경로
+    (사업 행 → 대상자 행)와 같게 합니다.
+
+    deleted=True 이면 삭제된 대상자를 대상으로 합니다. (복원용)
+    """
+    return f"""
+        UPDATE nm_groups g
+        STRAIGHT_JOIN nm_targets t ON t.group_id = g.group_id
+        SET {set_sql}
+        WHERE t.target_id = %s AND t.group_id = %s AND t.is_deleted = {int(deleted)}
+          AND g.org_id = %s AND g.is_deleted = 0
+    """, (*params, target_id, business_id, org_id)
+
+
+def _update_target(cur, org_id, business_id, target_id, set_sql, params):
+    return cur.execute(*_update_target_stmt(org_id, business_id, target_id, set_sql, params))
+
+
+def _update_targets(cur, org_id, business_id, set_sql, rows, deleted=False):
+    """대상자 여러 명을 같은 SET 으로 수정하고 수정된 행 수를 반환합니다.
+
+    rows 는 (SET 파라미터..., target_id) 튜플 목록이며 target_id 가 겹치면 안 됩니다.
+    executemany 가 CASE ... WHERE t.target_id IN (...) 문장 몇 개로 묶어서 보냅니다.
+    """
+    sql, _ = _update_target_stmt(org_id, business_id, None, set_sql, (), deleted)
+    return cur.executemany(sql, [(*row, business_id, org_id) for row in rows])
+
+
+def _update_group(cur, org_id, business_id, set_sql, params):
+    return cur.execute(f"""
+        UPDATE nm_groups
+        SET {set_sql}
+        WHERE group_id = %s AND org_id = %s AND is_deleted = 0
+    """, (*params, business_id, org_id))
+
+
+def _adjust_target_count(cur, business_id, delta):
+    """nm_groups.target_count 를 delta 만큼 증감합니다.
+
+    대상자 행을 바꾼 문장과 같은 트랜잭션에서 호출해야 합니다. 소유권은 호출한 쪽의
+    변경 쿼리에서 이미 확인된 상태입니다. updated_at = updated_at 은 카운터 변경으로
+    사업 수정일이 바뀌지 않게 합니다.
+
+    호출하는 트랜잭션은 nm_targets 를 바꾸기 전에 사업 행을 잠가야 합니다
+    (_group_exists(lock=True) 등). 대상자 INSERT/UPDATE 가 먼저 사업 행에 공유 잠금
+    (외래 키 확인, JOIN)을 걸면, 같은 사업에 동시에 쓰는 두 트랜잭션이 모두 공유 잠금을
+    쥔 채 이 UPDATE 의 배타 잠금을 기다려 교착 상태가 됩니다.
+    """
+    if delta:
+        cur.execute("""
+            UPDATE nm_groups
+            SET target_count = target_count + %s, updated_at = updated_at
+            WHERE group_id = %s
+        """, (delta, business_id))
+
+
+def _owned_target_count_stmt(org_id, business_id, delta):
+    """소유권 조건을 직접 걸고 target_count 를 delta 만큼 증감하는 문장 (sql, args).
+
+    _insert_target_stmt 와 같은 조건이라 INSERT 결과와 상관없이 같은 배치로 보낼 수
+    있습니다. (이 UPDATE가 0건이면 INSERT도 0건) INSERT 보다 먼저 보내 사업 행의 배타
+    잠금을 먼저 잡아야 합니다. (_adjust_target_count 참고)
+    """
+    return """
+        UPDATE nm_groups
+        SET target_count = target_count + %s, updated_at = updated_at
+        WHERE group_id = %s AND org_id = %s AND is_deleted = 0
+    """, (delta, business_id, org_id)
+# ----------------------------------------
+
 # 로그인 함수
 def login(event):
     try:
         body = json.loads(event.get("body") or "{}")
         business_number = body.get("businessNumber")
         password = body.get("password")
-        print(f"business_number: {business_number}")
-        print(f"password: {password}")
+        log.debug("로그인 요청", business_number=business_number)
 
 
         if not business_number or not password:
@@ -202,7 +875,7 @@ def login(event):
                     encrypted_input_password = cipher.encrypt(f'{BCM_AES_SALT}|{password}') 
                     
                 except Exception as e:
-                    print(f"암호화 처리 중 오류 발생: {str(e)}")
+                    log.error("암호화 처리 중 오류 발생", error=str(e))
                     # 암호화 실패 시, 보안상 비밀번호 불일치로 처리
                     return _resp(401, {"ok": False, "message": "비밀번호가 일치하지 않습니다."})
 
@@ -259,35 +932,31 @@ def verify_token(event):
 # 사업 목록 조회
 def get_businesses(event):
     try:
-        print("get_businesses 시작")
         org_id = require_auth(event)
-        print(f"get_businesses 인증 성공 - org_id: {org_id}")
-        print("데이터베이스 연결 시도")
         with get_conn() as conn:
-            print("데이터베이스 연결 성공")
             with conn.cursor() as cur:
-                print(f"사업 목록 조회 쿼리 실행 - org_id: {org_id}")
+                # 목록이 바뀌지 않았으면 버전 쿼리 한 번으로 304 응답
+                etag = _list_etag("businesses", org_id, _businesses_version(cur, org_id))
+                if _etag_matches(event, etag):
+                    return _not_modified(etag)
+
+            # 행을 dict/datetime으로 만들지 않고 컬럼 바이트에서 바로 JSON 객체를 만듭니다.
+            with conn.cursor(pymysql.cursors.PreparedJSONCursor) as cur:
                 cur.execute("""
                     SELECT g.group_id, g.group_name, g.org_name, g.contact_name,
                            g.zipcode, g.address1, g.address2, g.mobile_phone, g.office_phone,
-                           g.description, g.created_at, g.updated_at,
-                           COALESCE(t.target_count, 0) as target_count
+                           g.description, g.created_at, g.updated_at, g.target_count
                     FROM nm_groups g
-                    LEFT JOIN (
-                        SELECT group_id, COUNT(*) as target_count
-                        FROM nm_targets
-                        WHERE is_deleted = 0
-                        GROUP BY group_id
-                    ) t ON g.group_id = t.group_id
                     WHERE g.org_id = %s AND g.is_deleted = 0
                     ORDER BY g.created_at DESC
                 """, (org_id,))
                 
-                businesses = cur.fetchall()
-                print(f"조회된 사업 수: {len(businesses)}")
-                for business in businesses:
-                    print(f"  - group_id: {business.get('group_id')}, group_name: {business.get('group_name')}, org_name: {business.get('org_name')}")
-                return _resp(200, {"ok": True, "data": businesses})
+                businesses = cur.fetchall_json()
+                count = cur.rowcount
+            log.debug("사업 목록 조회", org_id=org_id, count=count)
+            log.rows("사업 목록 행", businesses, org_id=org_id)
+            return _resp_text(200, '{"ok": true, "data": %s}' % businesses,
+                              {"ETag": etag, "Cache-Control": _LIST_CACHE_CONTROL})
                 
     except PermissionError as e:
         return _resp(401, {"ok": False, "message": str(e)})
@@ -322,13 +991,9 @@ def get_business(event, business_id):
 # 사업 생성
 def create_business(event):
     try:
-        print(f"create_business 호출됨. Event: {event}")
-        
         org_id = require_auth(event)
-        print(f"인증된 org_id: {org_id}")
         
         body = json.loads(event.get("body") or "{}")
-        print(f"요청 body: {body}")
         
         group_name = escape_single_quotes(body.get("name"))
         org_name = escape_single_quotes(body.get("organizationName"))
@@ -341,8 +1006,6 @@ def create_business(event):
         office_phone = escape_single_quotes(office_phone_raw) if office_phone_raw and office_phone_raw.strip() else None
         description = escape_single_quotes(body.get("description"))
         
-        print(f"파싱된 데이터 - group_name: {group_name}, contact_name: {contact_name}")
-        
         # 필수 필드 검증 (5개 항목)
         required_fields = {
             "그룹명": group_name,
@@ -354,7 +1017,7 @@ def create_business(event):
         
         missing_fields = [field for field, value in required_fields.items() if not value or value.strip() == ""]
         if missing_fields:
-            print(f"필수 필드 누락: {missing_fields}")
+            log.info("필수 필드 누락", missing=missing_fields)
             return _resp(400, {"ok": False, "message": f"다음 필수 항목을 입력해주세요: {', '.join(missing_fields)}"})
         
         # 입력 제한 검증
@@ -369,8 +1032,6 @@ def create_business(event):
         
         with get_conn() as conn:
             with conn.cursor() as cur:
-                print(f"조직명: {org_name}")
-                
                 cur.execute("""
                     INSERT INTO nm_groups (org_id, group_name, org_name, contact_name, 
                                          zipcode, address1, address2, mobile_phone, office_phone, 
@@ -380,7 +1041,7 @@ def create_business(event):
                       mobile_phone, office_phone, description))
                 
                 group_id = cur.lastrowid
-                print(f"그룹 생성 성공. group_id: {group_id}")
+                log.info("그룹 생성 성공", org_id=org_id, group_id=group_id)
                 
                 return _resp(201, {
                     "ok": True, 
@@ -389,10 +1050,9 @@ def create_business(event):
                 })
                 
     except PermissionError as e:
-        print(f"권한 오류: {str(e)}")
         return _resp(401, {"ok": False, "message": str(e)})
     except Exception as e:
-        print(f"사업 생성 오류: {str(e)}")
+        log.error("사업 생성 오류", error=str(e))
         return _resp(500, {"ok": False, "message": f"사업 생성 중 오류가 발생했습니다: {str(e)}"})
 
 # 사업 수정
@@ -424,16 +1084,7 @@ def update_business(event, business_id):
         
         with get_conn() as conn:
             with conn.cursor() as cur:
-                # 그룹 존재 확인
-                cur.execute("""
-                    SELECT group_id FROM nm_groups 
-                    WHERE group_id = %s AND org_id = %s AND is_deleted = 0
-                """, (business_id, org_id))
-                
-                if not cur.fetchone():
-                    return _resp(404, {"ok": False, "message": "그룹을 찾을 수 없습니다."})
-                
-                # 그룹 정보 업데이트
+                # 그룹 정보 업데이트 (소유권 확인은 UPDATE 조건에 포함)
                 update_fields = []
                 params = []
                 
@@ -475,13 +1126,12 @@ def update_business(event, business_id):
                 
                 if update_fields:
                     update_fields.append("updated_at = NOW()")
-                    params.extend([business_id, org_id])
-                    
-                    cur.execute(f"""
-                        UPDATE nm_groups 
-                        SET {', '.join(update_fields)}
-                        WHERE group_id = %s AND org_id = %s
-                    """, params)
+                    found = _update_group(cur, org_id, business_id, ", ".join(update_fields), params)
+                else:
+                    found = _group_exists(cur, org_id, business_id)
+                
+                if not found:
+                    return _resp(404, {"ok": False, "message": "그룹을 찾을 수 없습니다."})
                 
                 return _resp(200, {"ok": True, "message": "사업 정보가 수정되었습니다."})
                 
@@ -497,22 +1147,13 @@ def delete_business(event, business_id):
         
         with get_conn() as conn:
             with conn.cursor() as cur:
-                # 그룹 존재 확인
-                cur.execute("""
-                    SELECT group_id FROM nm_groups 
-                    WHERE group_id = %s AND org_id = %s AND is_deleted = 0
-                """, (business_id, org_id))
+                # 그룹 삭제 (soft delete, 소유권 확인 포함)
+                found = _update_group(cur, org_id, business_id,
+                                      "is_deleted = 1, deleted_at = NOW(), updated_at = NOW()", ())
                 
-                if not cur.fetchone():
+                if not found:
                     return _resp(404, {"ok": False, "message": "그룹을 찾을 수 없습니다."})
                 
-                # 그룹 삭제 (soft delete)
-                cur.execute("""
-                    UPDATE nm_groups 
-                    SET is_deleted = 1, deleted_at = NOW(), updated_at = NOW()
-                    WHERE group_id = %s AND org_id = %s
-                """, (business_id, org_id))
-                
                 return _resp(200, {"ok": True, "message": "사업이 삭제되었습니다."})
                 
     except PermissionError as e:
@@ -520,138 +1161,236 @@ def delete_business(event, business_id):
     except Exception as e:
         return _resp(500, {"ok": False, "message": f"사업 삭제 중 오류가 발생했습니다: {str(e)}"})
 
+# ----------------------------------------
+# 대상자 목록 페이지네이션 / 필드 선택
+TARGETS_PAGE_MAX = int(os.getenv("TARGETS_PAGE_MAX", "1000"))
+
+def _join_address(zipcode, address1):
+    """우편번호와 기본주소를 합칩니다."""
+    if zipcode and address1:
+        return f"{zipcode} {address1}"
+    return address1 or zipcode or ""
+
+
+def _format_registered_at(created_at):
+    if not created_at:
+        return ""
+    if hasattr(created_at, "strftime"):
+        return created_at.strftime("%Y-%m-%d")
+    # DB_RAW_TEMPORALS=1 이면 "YYYY-MM-DD HH:MM:SS" 문자열
+    return str(created_at)[:10]
+
+
+# 대상자 응답 필드 정의: (응답 필드명, nm_targets 컬럼, 변환)
+# 변환이 None이면 컬럼 값을 그대로 쓰고 NULL은 ""로, 함수면 컬럼 값들을 인자로 호출, 그 외에는 고정 값입니다.
+_TARGET_RESPONSE_FIELDS = (
+    ("id", ("target_id",), None),
+    ("name", ("target_name",), None),
+    ("targetType", ("target_type",), None),
+    ("targetHousehold", ("target_gubun",), None),
+    ("zipcode", ("zipcode",), None),
+    ("address", ("zipcode", "address1"), _join_address),
+    ("detailAddress", ("address2",), None),
+    ("mobilePhone", ("mobile_phone",), None),
+    ("phone", ("office_phone",), None),
+    ("applicationReason", ("apply_reason",), None),
+    ("directions", ("directions",), None),
+    ("registeredAt", ("created_at",), _format_registered_at),
+    ("status", (), "active"),
+)
+
+# 응답 필드명 -> 필요한 nm_targets 컬럼
+_TARGET_FIELD_COLUMNS = {name: columns for name, columns, _ in _TARGET_RESPONSE_FIELDS}
+
+# 응답 필드명 -> _TARGET_RESPONSE_FIELDS 변환과 같은 값을 만드는 SQL 식 (JSON 직접 생성 경로용)
+# prepared 쿼리의 %는 %%로 씁니다.
+_TARGET_FIELD_SQL = {
+    "id": "t.target_id",
+    "name": "COALESCE(t.target_name, '')",
+    "targetType": "COALESCE(t.target_type, '')",
+    "targetHousehold": "COALESCE(t.target_gubun, '')",
+    "zipcode": "COALESCE(t.zipcode, '')",
+    "address": """CASE WHEN t.zipcode <> '' AND t.address1 <> '' THEN CONCAT(t.zipcode, ' ', t.address1)
+                       ELSE COALESCE(NULLIF(t.address1, ''), NULLIF(t.zipcode, ''), '') END""",
+    "detailAddress": "COALESCE(t.address2, '')",
+    "mobilePhone": "COALESCE(t.mobile_phone, '')",
+    "phone": "COALESCE(t.office_phone, '')",
+    "applicationReason": "COALESCE(t.apply_reason, '')",
+    "directions": "COALESCE(t.directions, '')",
+    "registeredAt": "COALESCE(DATE_FORMAT(t.created_at, '%%Y-%%m-%%d'), '')",
+    "status": "'active'",
+}
+
+
+def _select_targets_json(conn, org_id, business_id, fields=None, after=None):
+    """대상자 전체 목록을 응답 형식의 JSON 배열 문자열과 행 수로 조회합니다.
+
+    필드 변환을 SQL 식으로 하고 PreparedJSONCursor로 컬럼 바이트에서 바로 JSON을 만들므로
+    레코드나 dict를 거치지 않습니다. 그룹 존재/권한은 호출 전에 확인했다고 가정하고
+    (_targets_version), 대상자가 없으면 빈 배열("[]")을 반환합니다.
+    after=(created_at, target_id)를 주면 _select_targets와 같은 키셋 조건으로 그 뒤의 대상자만 조회합니다.
+    """
+    select_sql = ",\n                   ".join(
+        f"{_TARGET_FIELD_SQL[name]} AS {name}" for name in fields or _TARGET_FIELD_SQL)
+    join_params = []
+    join_sql = ""
+    if after is not None:
+        join_sql = " AND (t.created_at < %s OR (t.created_at = %s AND t.target_id < %s))"
+        join_params = [after[0], after[0], after[1]]
+    with conn.cursor(pymysql.cursors.PreparedJSONCursor) as cur:
+        cur.execute(f"""
+            SELECT {select_sql}
+            FROM nm_groups g
+            JOIN nm_targets t ON t.group_id = g.group_id AND t.is_deleted = 0{join_sql}
+            WHERE g.group_id = %s AND g.org_id = %s AND g.is_deleted = 0
+            ORDER BY t.created_at DESC, t.target_id DESC
+        """, (*join_params, business_id, org_id))
+        return cur.fetchall_json(), cur.rowcount
+
+
+@functools.lru_cache(maxsize=32)
+def _target_mapper(columns, fields=None):
+    """조회 컬럼 배치와 응답 필드 조합마다 레코드 -> 응답 dict 변환 함수를 한 번만 만듭니다.
+
+    _TARGET_RESPONSE_FIELDS를 인덱스 접근만 하는 함수 하나로 컴파일하므로
+    행마다 중간 dict를 만들거나 .get()을 반복하지 않습니다.
+    """
+    index = {column: i for i, column in enumerate(columns)}
+    spec = {name: (cols, convert) for name, cols, convert in _TARGET_RESPONSE_FIELDS}
+    namespace = {}
+    items = []
+    for name in fields or spec:
+        cols, convert = spec[name]
+        args = [f"r[{index[c]}]" for c in cols]
+        if convert is None:
+            expr = f'("" if {args[0]} is None else {args[0]})'
+        elif callable(convert):
+            fn = f"_f{len(namespace)}"
+            namespace[fn] = convert
+            expr = f"{fn}({', '.join(args)})"
+        else:
+            expr = repr(convert)
+        items.append(f"{name!r}: {expr}")
+    exec(f"def map_row(r):\n    return {{{', '.join(items)}}}\n", namespace)
+    return namespace["map_row"]
+
+
+def _format_targets(rows, fields=None):
+    """대상자 레코드 목록을 프론트엔드 응답 형식으로 변환합니다."""
+    if not rows:
+        return []
+    map_row = _target_mapper(rows[0]._fields, tuple(fields) if fields else None)
+    return [map_row(row) for row in rows]
+
+
+def _parse_target_fields(value):
+    """fields=id,name,... 파라미터를 (응답 필드 목록, 조회 컬럼 목록)으로 변환합니다."""
+    if not value:
+        return None, None
+    fields = [f.strip() for f in value.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in _TARGET_FIELD_COLUMNS]
+    if unknown:
+        raise ValueError(f"알 수 없는 필드입니다: {', '.join(unknown)}")
+    # 커서 생성을 위해 target_id, created_at은 항상 조회
+    columns = ["target_id", "created_at"]
+    for f in fields:
+        for c in _TARGET_FIELD_COLUMNS[f]:
+            if c not in columns:
+                columns.append(c)
+    return fields, columns
+
+
+def _encode_cursor(row):
+    created_at = row.created_at
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat(sep=" ")
+    raw = json.dumps([created_at, row.target_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(value):
+    try:
+        raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+        created_at, target_id = json.loads(raw)
+        return str(created_at), int(target_id)
+    except Exception:
+        raise ValueError("잘못된 cursor 값입니다.")
+
+
+def _parse_limit(value):
+    if value in (None, ""):
+        return None
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit은 숫자로 입력해주세요.")
+    if limit < 1:
+        raise ValueError("limit은 1 이상이어야 합니다.")
+    return min(limit, TARGETS_PAGE_MAX)
+# ----------------------------------------
+
 # 대상자 목록 조회
 def get_targets(event, business_id):
     try:
-        print(f"get_targets 시작 - business_id: {business_id}")
         org_id = require_auth(event)
-        print(f"인증 성공 - org_id: {org_id}")
         
-        print("데이터베이스 연결 시도")
+        # 페이지네이션 / 필드 선택 파라미터 (limit이 없으면 전체 목록)
+        query_params = event.get("queryStringParameters") or {}
+        try:
+            limit = _parse_limit(query_params.get("limit"))
+            cursor = query_params.get("cursor")
+            after = _decode_cursor(cursor) if cursor else None
+            fields, columns = _parse_target_fields(query_params.get("fields"))
+        except ValueError as e:
+            return _resp(400, {"ok": False, "message": str(e)})
+        
         with get_conn() as conn:
-            print("데이터베이스 연결 성공")
+            # 목록이 바뀌지 않았으면 버전 쿼리 한 번으로 304 응답 (사업 권한 확인 포함)
             with conn.cursor() as cur:
-                print("커서 생성 성공")
-                
-                # 사업 권한 확인
-                print(f"사업 권한 확인 쿼리 실행 - business_id: {business_id}, org_id: {org_id}")
-                cur.execute("""
-                    SELECT group_id FROM nm_groups 
-                    WHERE group_id = %s AND org_id = %s AND is_deleted = 0
-                """, (business_id, org_id))
-                
-                group_check = cur.fetchone()
-                print(f"사업 권한 확인 결과: {group_check}")
-                
-                if not group_check:
-                    print("사업을 찾을 수 없음")
-                    return _resp(404, {"ok": False, "message": "사업을 찾을 수 없습니다."})
-                
-                # 대상자 목록 조회
-                print(f"대상자 조회 시작 - business_id: {business_id}, org_id: {org_id}")
-                
-                # 먼저 해당 그룹의 모든 대상자 확인 (삭제 여부 무관)
-                print("전체 대상자 조회 쿼리 실행")
-                try:
-                    cur.execute("""
-                        SELECT target_id, target_name, is_deleted, created_at
-                        FROM nm_targets 
-                        WHERE group_id = %s
-                        ORDER BY created_at DESC
-                    """, (business_id,))
-                    
-                    all_targets = cur.fetchall()
-                    print(f"그룹 {business_id}의 전체 대상자 수: {len(all_targets)}")
-                    for target in all_targets:
-                        print(f"  - target_id: {target[0]}, name: {target[1]}, is_deleted: {target[2]}, created_at: {target[3]}")
-                except Exception as e:
-                    print(f"전체 대상자 조회 오류: {str(e)}")
-                    all_targets = []
-                
-                # 실제 조회 쿼리 (실제 DB 컬럼명 사용)
-                print("삭제되지 않은 대상자 조회 쿼리 실행")
+                version = _targets_version(cur, org_id, business_id)
+            if version is None:
+                return _resp(404, {"ok": False, "message": "사업을 찾을 수 없습니다."})
+            etag = _list_etag("targets", org_id, business_id,
+                              [query_params.get(k) for k in ("limit", "cursor", "fields")], version)
+            if _etag_matches(event, etag):
+                return _not_modified(etag)
+
+            if limit is None:
+                # 전체 목록(cursor가 있으면 그 뒤 전체): 응답 본문을 컬럼 바이트에서 바로 만듭니다.
                 try:
-                    cur.execute("""
-                        SELECT target_id, target_name, target_type, target_gubun,
-                               zipcode, address1, address2, mobile_phone, office_phone,
-                               apply_reason, directions, created_at, updated_at
-                        FROM nm_targets 
-                        WHERE group_id = %s AND is_deleted = 0
-                        ORDER BY created_at DESC
-                    """, (business_id,))
-                    
-                    targets = cur.fetchall()
-                    print(f"삭제되지 않은 대상자 수: {len(targets)}")
+                    rows, count = _select_targets_json(conn, org_id, business_id, fields, after)
                 except Exception as e:
-                    print(f"대상자 조회 쿼리 오류: {str(e)}")
+                    log.error("대상자 조회 쿼리 오류", business_id=business_id, error=str(e))
                     return _resp(500, {"ok": False, "message": f"대상자 조회 쿼리 오류: {str(e)}"})
+                log.rows("대상자 목록 행", rows, business_id=business_id)
+                log.debug("대상자 목록 조회", business_id=business_id, count=count, next_cursor=None)
+                return _resp_text(200, '{"ok": true, "data": %s, "nextCursor": null}' % rows,
+                                  {"ETag": etag, "Cache-Control": _LIST_CACHE_CONTROL})
+
+            # 대상자 목록 조회 (사업 권한 확인 포함, 다음 페이지 여부 확인을 위해 limit+1건 조회)
+            try:
+                targets = _select_targets(conn, org_id, business_id, columns=columns, after=after,
+                                          limit=limit + 1 if limit else None)
                 
-                # 데이터베이스 필드명을 프론트엔드 필드명으로 변환
-                print("데이터 변환 시작")
-                formatted_targets = []
-                for i, target in enumerate(targets):
-                    try:
-                        print(f"대상자 {i+1} 변환 시작: {target}")
-                        # 안전한 데이터 변환 (딕셔너리 형태로 접근)
-                        target_id = target.get('target_id', 0) if target.get('target_id') is not None else 0
-                        target_name = target.get('target_name', '') if target.get('target_name') is not None else ""
-                        target_type = target.get('target_type', '') if target.get('target_type') is not None else ""
-                        target_gubun = target.get('target_gubun', '') if target.get('target_gubun') is not None else ""
-                        zipcode = target.get('zipcode', '') if target.get('zipcode') is not None else ""
-                        address1 = target.get('address1', '') if target.get('address1') is not None else ""
-                        address2 = target.get('address2', '') if target.get('address2') is not None else ""
-                        mobile_phone = target.get('mobile_phone', '') if target.get('mobile_phone') is not None else ""
-                        office_phone = target.get('office_phone', '') if target.get('office_phone') is not None else ""
-                        apply_reason = target.get('apply_reason', '') if target.get('apply_reason') is not None else ""
-                        directions = target.get('directions', '') if target.get('directions') is not None else ""
-                        created_at = target.get('created_at') if target.get('created_at') is not None else None
-                        
-                        # 주소 합치기
-                        full_address = ""
-                        if zipcode and address1:
-                            full_address = f"{zipcode} {address1}"
-                        elif address1:
-                            full_address = address1
-                        elif zipcode:
-                            full_address = zipcode
-                        
-                        # 날짜 형식 변환
-                        registered_at = ""
-                        if created_at:
-                            try:
-                                if hasattr(created_at, 'strftime'):
-                                    registered_at = created_at.strftime("%Y-%m-%d")
-                                else:
-                                    registered_at = str(created_at)
-                            except Exception as date_error:
-                                print(f"날짜 변환 오류: {date_error}")
-                                registered_at = str(created_at)
-                        
-                        formatted_target = {
-                            "id": target_id,
-                            "name": target_name,
-                            "targetType": target_type,
-                            "targetHousehold": target_gubun,
-                            "zipcode": zipcode,
-                            "address": full_address,
-                            "detailAddress": address2,
-                            "mobilePhone": mobile_phone,
-                            "phone": office_phone,
-                            "applicationReason": apply_reason,
-                            "directions": directions,
-                            "registeredAt": registered_at,
-                            "status": "active"
-                        }
-                        formatted_targets.append(formatted_target)
-                        print(f"대상자 {i+1} 변환 완료")
-                    except Exception as e:
-                        print(f"대상자 데이터 변환 오류: {str(e)}, target: {target}")
-                        # 에러가 발생해도 계속 진행
-                        continue
+                if targets is None:
+                    return _resp(404, {"ok": False, "message": "사업을 찾을 수 없습니다."})
                 
-                print(f"변환된 대상자 수: {len(formatted_targets)}")
-                print(f"최종 응답 데이터: {formatted_targets}")
-                return _resp(200, {"ok": True, "data": formatted_targets})
+                next_cursor = None
+                if limit and len(targets) > limit:
+                    targets = targets[:limit]
+                    next_cursor = _encode_cursor(targets[-1])
+            except Exception as e:
+                log.error("대상자 조회 쿼리 오류", business_id=business_id, error=str(e))
+                return _resp(500, {"ok": False, "message": f"대상자 조회 쿼리 오류: {str(e)}"})
+            
+            # 데이터베이스 필드명을 프론트엔드 필드명으로 변환
+            log.rows("대상자 목록 행", targets, business_id=business_id)
+            formatted_targets = _format_targets(targets, fields)
+            
+            log.debug("대상자 목록 조회", business_id=business_id, count=len(formatted_targets),
+                      next_cursor=next_cursor)
+            return _resp(200, {"ok": True, "data": formatted_targets, "nextCursor": next_cursor},
+                         {"ETag": etag, "Cache-Control": _LIST_CACHE_CONTROL})
                 
     except PermissionError as e:
         return _resp(401, {"ok": False, "message": str(e)})
@@ -663,72 +1402,17 @@ def get_target(event, business_id, target_id):
     try:
         org_id = require_auth(event)
         with get_conn() as conn:
-            with conn.cursor() as cur:
-                # 사업 권한 확인
-                cur.execute("""
-                    SELECT group_id FROM nm_groups 
-                    WHERE group_id = %s AND org_id = %s AND is_deleted = 0
-                """, (business_id, org_id))
-                
-                if not cur.fetchone():
-                    return _resp(404, {"ok": False, "message": "사업을 찾을 수 없습니다."})
-                
-                # 대상자 조회
-                cur.execute("""
-                    SELECT target_id, target_name, target_type, target_gubun,
-                           zipcode, address1, address2, mobile_phone, office_phone,
-                           apply_reason, directions, created_at, updated_at
-                    FROM nm_targets 
-                    WHERE target_id = %s AND group_id = %s AND is_deleted = 0
-                """, (target_id, business_id))
-                
-                target = cur.fetchone()
-                if not target:
-                    return _resp(404, {"ok": False, "message": "대상자를 찾을 수 없습니다."})
-                
-                # 데이터베이스 필드명을 프론트엔드 필드명으로 변환 (딕셔너리 형태로 접근)
-                zipcode = target.get('zipcode', '') if target.get('zipcode') is not None else ""
-                address1 = target.get('address1', '') if target.get('address1') is not None else ""
-                created_at = target.get('created_at') if target.get('created_at') is not None else None
-                
-                # 주소 합치기
-                full_address = ""
-                if zipcode and address1:
-                    full_address = f"{zipcode} {address1}"
-                elif address1:
-                    full_address = address1
-                elif zipcode:
-                    full_address = zipcode
-                
-                # 날짜 형식 변환
-                registered_at = ""
-                if created_at:
-                    try:
-                        if hasattr(created_at, 'strftime'):
-                            registered_at = created_at.strftime("%Y-%m-%d")
-                        else:
-                            registered_at = str(created_at)
-                    except Exception as date_error:
-                        print(f"날짜 변환 오류: {date_error}")
-                        registered_at = str(created_at)
-                
-                formatted_target = {
-                    "id": target.get('target_id', 0),
-                    "name": target.get('target_name', ''),
-                    "targetType": target.get('target_type', ''),
-                    "targetHousehold": target.get('target_gubun', ''),
-                    "zipcode": zipcode,
-                    "address": full_address,
-                    "detailAddress": target.get('address2', ''),
-                    "mobilePhone": target.get('mobile_phone', ''),
-                    "phone": target.get('office_phone', ''),
-                    "applicationReason": target.get('apply_reason', ''),
-                    "directions": target.get('directions', ''),
-                    "registeredAt": registered_at,
-                    "status": "active"
-                }
-                
-                return _resp(200, {"ok": True, "data": formatted_target})
+            # 사업 권한 확인 + 대상자 조회
+            group_found, target = _select_target(conn, org_id, business_id, target_id)
+            
+            if not group_found:
+                return _resp(404, {"ok": False, "message": "사업을 찾을 수 없습니다."})
+            
+            if not target:
+                return _resp(404, {"ok": False, "message": "대상자를 찾을 수 없습니다."})
+            
+            # 데이터베이스 필드명을 프론트엔드 필드명으로 변환
+            return _resp(200, {"ok": True, "data": _format_targets([target])[0]})
                 
     except PermissionError as e:
         return _resp(401, {"ok": False, "message": str(e)})
@@ -756,26 +1440,22 @@ def create_target(event, business_id):
             return _resp(400, {"ok": False, "message": "이름을 입력해주세요."})
         
         with get_conn() as conn:
-            with conn.cursor() as cur:
-                # 사업 권한 확인
-                cur.execute("""
-                    SELECT group_id FROM nm_groups 
-                    WHERE group_id = %s AND org_id = %s AND is_deleted = 0
-                """, (business_id, org_id))
-                
-                if not cur.fetchone():
+            with conn.cursor() as cur, _transaction(conn, begin=False):
+                # BEGIN, 사업의 대상자 수 증가, 대상자 생성(사업 권한 확인 포함)을 한 번에 전송
+                # 두 문장이 같은 소유권 조건이라 서로의 결과에 의존하지 않습니다. 대상자 수를
+                # 먼저 바꿔 사업 행을 배타 잠금한 뒤 INSERT 합니다. (잠금 순서, 교착 방지)
+                _, _, inserted = cur.execute_batch([
+                    ("BEGIN", None),
+                    _owned_target_count_stmt(org_id, business_id, 1),
+                    _insert_target_stmt(org_id, business_id, (
+                        target_name, target_type, target_gubun, zipcode, address1, address2,
+                        mobile_phone, office_phone, apply_reason, directions)),
+                ])
+
+                if not inserted.rowcount:
                     return _resp(404, {"ok": False, "message": "사업을 찾을 수 없습니다."})
-                
-                # 대상자 생성
-                cur.execute("""
-                    INSERT INTO nm_targets (group_id, target_name, target_type, target_gubun, zipcode, address1, address2, mobile_phone, office_phone, apply_reason, directions, is_deleted)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 0)
-                """, (business_id, target_name, target_type, target_gubun, zipcode, address1, address2, mobile_phone, office_phone, apply_reason, directions))
-                
-                target_id = cur.lastrowid
-                
-                # 사업의 대상자 수 증가 (nm_groups 테이블에는 target_count 컬럼이 없으므로 제거)
-                
+                target_id = inserted.lastrowid
+
                 return _resp(201, {
                     "ok": True, 
                     "message": "대상자가 생성되었습니다.",
@@ -795,25 +1475,7 @@ def update_target(event, business_id, target_id):
         
         with get_conn() as conn:
             with conn.cursor() as cur:
-                # 사업 권한 확인
-                cur.execute("""
-                    SELECT group_id FROM nm_groups 
-                    WHERE group_id = %s AND org_id = %s AND is_deleted = 0
-                """, (business_id, org_id))
-                
-                if not cur.fetchone():
-                    return _resp(404, {"ok": False, "message": "사업을 찾을 수 없습니다."})
-                
-                # 대상자 존재 확인
-                cur.execute("""
-                    SELECT target_id FROM nm_targets 
-                    WHERE target_id = %s AND group_id = %s AND is_deleted = 0
-                """, (target_id, business_id))
-                
-                if not cur.fetchone():
-                    return _resp(404, {"ok": False, "message": "대상자를 찾을 수 없습니다."})
-                
-                # 대상자 정보 업데이트
+                # 대상자 정보 업데이트 (사업 권한/대상자 존재 확인은 UPDATE 조건에 포함)
                 update_fields = []
                 params = []
                 
@@ -837,18 +1499,19 @@ def update_target(event, business_id, target_id):
                             value = str(value).replace("-", "") if value else ""
                         # 작은따옴표 이스케이프 처리
                         value = escape_single_quotes(value)
-                        update_fields.append(f"{field_mapping[field]} = %s")
+                        update_fields.append(f"t.{field_mapping[field]} = %s")
                         params.append(value)
                 
                 if update_fields:
-                    update_fields.append("updated_at = NOW()")
-                    params.extend([target_id, business_id])
-                    
-                    cur.execute(f"""
-                        UPDATE nm_targets 
-                        SET {', '.join(update_fields)}
-                        WHERE target_id = %s AND group_id = %s
-                    """, params)
+                    update_fields.append("t.updated_at = NOW()")
+                    found = _update_target(cur, org_id, business_id, target_id, ", ".join(update_fields), params)
+                else:
+                    found = _select_target(conn, org_id, business_id, target_id)[1] is not None
+                
+                if not found:
+                    if not _group_exists(cur, org_id, business_id):
+                        return _resp(404, {"ok": False, "message": "사업을 찾을 수 없습니다."})
+                    return _resp(404, {"ok": False, "message": "대상자를 찾을 수 없습니다."})
                 
                 return _resp(200, {"ok": True, "message": "대상자 정보가 수정되었습니다."})
                 
@@ -863,34 +1526,25 @@ def delete_target(event, business_id, target_id):
         org_id = require_auth(event)
         
         with get_conn() as conn:
-            with conn.cursor() as cur:
-                # 사업 권한 확인
-                cur.execute("""
-                    SELECT group_id FROM nm_groups 
-                    WHERE group_id = %s AND org_id = %s AND is_deleted = 0
-                """, (business_id, org_id))
-                
-                if not cur.fetchone():
+            with conn.cursor() as cur, _transaction(conn, begin=False):
+                # BEGIN, 사업 행 잠금, 대상자 삭제(soft delete, 사업 권한/대상자 존재 확인 포함)를
+                # 한 번에 전송. 사업 행을 먼저 잠가 target_count 감소와 교착되지 않게 합니다.
+                _, group, deleted = cur.execute_batch([
+                    ("BEGIN", None),
+                    _group_stmt(org_id, business_id, lock=True),
+                    _update_target_stmt(org_id, business_id, target_id,
+                                        "t.is_deleted = 1, t.deleted_at = NOW(), t.updated_at = NOW()", ()),
+                ])
+                found = deleted.rowcount
+
+                if not group.rows:
                     return _resp(404, {"ok": False, "message": "사업을 찾을 수 없습니다."})
-                
-                # 대상자 존재 확인
-                cur.execute("""
-                    SELECT target_id FROM nm_targets 
-                    WHERE target_id = %s AND group_id = %s AND is_deleted = 0
-                """, (target_id, business_id))
-                
-                if not cur.fetchone():
+                if not found:
                     return _resp(404, {"ok": False, "message": "대상자를 찾을 수 없습니다."})
-                
-                # 대상자 삭제 (soft delete)
-                cur.execute("""
-                    UPDATE nm_targets 
-                    SET is_deleted = 1, deleted_at = NOW(), updated_at = NOW()
-                    WHERE target_id = %s AND group_id = %s
-                """, (target_id, business_id))
-                
-                # 사업의 대상자 수 감소 (nm_groups 테이블에는 target_count 컬럼이 없으므로 제거)
-                
+
+                # 사업의 대상자 수 감소 (같은 트랜잭션)
+                _adjust_target_count(cur, business_id, -found)
+
                 return _resp(200, {"ok": True, "message": "대상자가 삭제되었습니다."})
                 
     except PermissionError as e:
@@ -898,114 +1552,930 @@ def delete_target(event, business_id, target_id):
     except Exception as e:
         return _resp(500, {"ok": False, "message": f"대상자 삭제 중 오류가 발생했습니다: {str(e)}"})
 
+# ----------------------------------------
+# 대상자 일괄 삭제/복원/구분 변경
+# POST /businesses/{id}/targets:batchDelete   {"targetIds": [1, 2, ...]}
+# POST /businesses/{id}/targets:batchRestore  {"targetIds": [1, 2, ...]}
+# POST /businesses/{id}/targets:batchRetag    {"targets": [{"id": 1, "targetType": "...", "targetHousehold": "..."}, ...]}
+# 행마다 UPDATE 를 보내지 않고 Cursor.executemany 의 UPDATE 묶음 전송을 사용합니다.
+# 없거나 이미 처리된 대상자는 건너뛰고, 처리된 수를 응답합니다.
+TARGETS_BATCH_MAX = int(os.getenv("TARGETS_BATCH_MAX", "1000"))
+
+# 구분 변경 가능한 필드: 요청 필드명 -> (nm_targets 컬럼, 이름, 최대 길이)
+_RETAG_FIELDS = {
+    "targetType": ("target_type", "대상구분", 50),
+    "targetHousehold": ("target_gubun", "대상가구", 50),
+}
+
+
+def _parse_target_id(value):
+    if isinstance(value, bool):
+        raise ValueError(value)
+    target_id = int(value)
+    if target_id <= 0:
+        raise ValueError(value)
+    return target_id
+
+
+def _parse_target_ids(body):
+    """요청 본문의 targetIds 를 중복 없는 양의 정수 목록으로 바꿉니다. 잘못되면 ValueError."""
+    ids = body.get("targetIds")
+    if not isinstance(ids, list) or not ids:
+        raise ValueError("targetIds 목록이 필요합니다.")
+    if len(ids) > TARGETS_BATCH_MAX:
+        raise ValueError(f"한 번에 최대 {TARGETS_BATCH_MAX}명까지 처리할 수 있습니다.")
+    try:
+        return list(dict.fromkeys(_parse_target_id(v) for v in ids))
+    except (TypeError, ValueError):
+        raise ValueError("targetIds 는 대상자 번호 목록이어야 합니다.")
+
+
+def _batch_soft_delete(event, business_id, restore):
+    """일괄 삭제(restore=False)와 복원(restore=True) 공통 처리."""
+    action = "복원" if restore else "삭제"
+    try:
+        org_id = require_auth(event)
+        try:
+            target_ids = _parse_target_ids(json.loads(event.get("body") or "{}"))
+        except ValueError as e:
+            return _resp(400, {"ok": False, "message": str(e)})
+
+        if restore:
+            set_sql = "t.is_deleted = 0, t.deleted_at = NULL, t.updated_at = NOW()"
+        else:
+            set_sql = "t.is_deleted = 1, t.deleted_at = NOW(), t.updated_at = NOW()"
+
+        with get_conn() as conn:
+            with conn.cursor() as cur, _transaction(conn):
+                # 사업 행(target_count)을 먼저 잠그고 대상자 행을 바꿉니다. (delete_target 과 같은 순서)
+                if not _group_exists(cur, org_id, business_id, lock=True):
+                    return _resp(404, {"ok": False, "message": "사업을 찾을 수 없습니다."})
+                changed = _update_targets(cur, org_id, business_id, set_sql,
+                                          [(target_id,) for target_id in target_ids], deleted=restore)
+                _adjust_target_count(cur, business_id, changed if restore else -changed)
+
+        log.info(f"대상자 일괄 {action}", business_id=business_id, requested=len(target_ids), changed=changed)
+        key = "restored" if restore else "deleted"
+        return _resp(200, {
+            "ok": True,
+            "message": f"{changed}명이 {action}되었습니다.",
+            "data": {key: changed, "skipped": len(target_ids) - changed},
+        })
+
+    except PermissionError as e:
+        return _resp(401, {"ok": False, "message": str(e)})
+    except Exception as e:
+        return _resp(500, {"ok": False, "message": f"대상자 일괄 {action} 중 오류가 발생했습니다: {str(e)}"})
+
+
+# 대상자 일괄 삭제
+def batch_delete_targets(event, business_id):
+    return _batch_soft_delete(event, business_id, restore=False)
+
+
+# 대상자 일괄 복원
+def batch_restore_targets(event, business_id):
+    return _batch_soft_delete(event, business_id, restore=True)
+
+
+def _parse_retag_items(body):
+    """targets 항목을 {바꿀 필드 조합: [(값..., target_id)]} 로 묶습니다. 잘못되면 ValueError.
+
+    executemany 묶음 전송은 SET 모양이 같은 행끼리만 되므로 필드 조합별로 나눕니다.
+    같은 대상자가 여러 번 나오면 마지막 항목을 씁니다.
+    """
+    items = body.get("targets")
+    if not isinstance(items, list) or not items:
+        raise ValueError("targets 목록이 필요합니다.")
+    if len(items) > TARGETS_BATCH_MAX:
+        raise ValueError(f"한 번에 최대 {TARGETS_BATCH_MAX}명까지 처리할 수 있습니다.")
+    by_id = {}
+    for item in items:
+        if not isinstance(item, dict):
+            raise ValueError("targets 항목은 객체여야 합니다.")
+        try:
+            target_id = _parse_target_id(item.get("id"))
+        except (TypeError, ValueError):
+            raise ValueError("targets 항목의 id 는 대상자 번호여야 합니다.")
+        values = {}
+        for field, (_, label, max_len) in _RETAG_FIELDS.items():
+            value = item.get(field)
+            if value is None:
+                continue
+            value = str(value).strip()
+            if len(value) > max_len:
+                raise ValueError(f"{label}은(는) {max_len}자 이내로 입력해주세요.")
+            values[field] = escape_single_quotes(value)
+        if not values:
+            raise ValueError(f"대상자 {target_id}: 변경할 targetType 또는 targetHousehold 가 없습니다.")
+        by_id.pop(target_id, None)
+        by_id[target_id] = values
+
+    groups = {}
+    for target_id, values in by_id.items():
+        fields = tuple(values)
+        groups.setdefault(fields, []).append((*values.values(), target_id))
+    return groups, len(by_id)
+
+
+# 대상자 구분 일괄 변경
+def batch_retag_targets(event, business_id):
+    try:
+        org_id = require_auth(event)
+        try:
+            groups, requested = _parse_retag_items(json.loads(event.get("body") or "{}"))
+        except ValueError as e:
+            return _resp(400, {"ok": False, "message": str(e)})
+
+        updated = 0
+        with get_conn() as conn:
+            with conn.cursor() as cur, _transaction(conn):
+                for fields, rows in groups.items():
+                    set_sql = ", ".join(f"t.{_RETAG_FIELDS[field][0]} = %s" for field in fields)
+                    updated += _update_targets(cur, org_id, business_id, set_sql + ", t.updated_at = NOW()", rows)
+                if not updated and not _group_exists(cur, org_id, business_id):
+                    return _resp(404, {"ok": False, "message": "사업을 찾을 수 없습니다."})
+
+        log.info("대상자 구분 일괄 변경", business_id=business_id, requested=requested, updated=updated)
+        return _resp(200, {
+            "ok": True,
+            "message": f"{updated}명의 구분이 변경되었습니다.",
+            "data": {"updated": updated, "skipped": requested - updated},
+        })
+
+    except PermissionError as e:
+        return _resp(401, {"ok": False, "message": str(e)})
+    except Exception as e:
+        return _resp(500, {"ok": False, "message": f"대상자 구분 일괄 변경 중 오류가 발생했습니다: {str(e)}"})
+
+# ----------------------------------------
+# 대상자 검색 인덱스 조회
+# 이름은 ngram FULLTEXT 인덱스(ftx_targets_name)의 구문 검색, 전화번호는 숫자만 남긴
+# 생성 컬럼의 앞자리/뒷자리 인덱스(ix_targets_*_digits, *_digits_rev) 범위 조회로 찾습니다.
+# 각 조건을 UNION 가지로 나눠 가지마다 자기 인덱스를 타게 하고, 찾은 target_id만
+# 기본키로 다시 읽습니다. 스키마는 sql query.sql 의 대상자 검색 인덱스 참고.
+# SEARCH_NGRAM_SIZE: 서버 ngram_token_size 와 같은 값. 이보다 짧은 이름 검색어는
+#                    FULLTEXT로 찾을 수 없어 그룹 안에서 LIKE로 찾습니다.
+# SEARCH_PHONE_MIN_DIGITS: 전화번호로 검색할 최소 숫자 수
+SEARCH_NGRAM_SIZE = int(os.getenv("SEARCH_NGRAM_SIZE", "2"))
+SEARCH_PHONE_MIN_DIGITS = int(os.getenv("SEARCH_PHONE_MIN_DIGITS", "3"))
+
+_PHONE_QUERY_RE = re.compile(r"[\d\s()+\-]+")
+
+
+def _like_escape(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _search_branches(business_id, term):
+    """검색어를 (SQL, 파라미터) UNION 가지 목록으로 바꿉니다.
+
+    숫자와 전화번호 기호로만 된 검색어는 핸드폰/집전화의 앞자리·뒷자리로,
+    나머지는 이름으로 찾습니다.
+    """
+    live = "group_id = %s AND is_deleted = 0"
+    branches = []
+    if _PHONE_QUERY_RE.fullmatch(term):
+        digits = re.sub(r"\D", "", term)
+        if len(digits) >= SEARCH_PHONE_MIN_DIGITS:
+            prefix, suffix = digits + "%", digits[::-1] + "%"
+            for column in ("mobile_digits", "office_digits"):
+                branches.append((f"SELECT target_id FROM nm_targets WHERE {live} AND {column} LIKE %s",
+                                 (business_id, prefix)))
+                branches.append((f"SELECT target_id FROM nm_targets WHERE {live} AND {column}_rev LIKE %s",
+                                 (business_id, suffix)))
+        return branches
+    if len(term) >= SEARCH_NGRAM_SIZE:
+        # 큰따옴표로 감싼 구문 검색: 검색어의 n-gram이 연속으로 나오는 이름만 찾습니다.
+        phrase = '"' + term.replace('"', " ") + '"'
+        branches.append((f"SELECT target_id FROM nm_targets WHERE {live} "
+                         "AND MATCH(target_name) AGAINST (%s IN BOOLEAN MODE)",
+                         (business_id, phrase)))
+    else:
+        branches.append((f"SELECT target_id FROM nm_targets WHERE {live} AND target_name LIKE %s",
+                         (business_id, f"%{_like_escape(term)}%")))
+    return branches
+
+
+def _search_targets(conn, org_id, business_id, term):
+    """그룹 소유권 확인과 인덱스 검색을 한 쿼리로 수행합니다. 반환값은 _select_targets와 같습니다."""
+    branches = _search_branches(business_id, term)
+    if not branches:
+        # 숫자가 너무 짧은 전화번호 검색어: 그룹 확인만 합니다.
+        with conn.cursor() as cur:
+            return [] if _group_exists(cur, org_id, business_id) else None
+    union_sql = "\n                UNION\n                ".join(sql for sql, _ in branches)
+    union_params = [p for _, params in branches for p in params]
+    with conn.cursor(pymysql.cursors.PreparedRecordCursor) as cur:
+        cur.execute(f"""
+            SELECT {_TARGET_COLUMNS}
+            FROM nm_groups g
+            LEFT JOIN (
+                {union_sql}
+            ) m ON 1 = 1
+            LEFT JOIN nm_targets t ON t.target_id = m.target_id
+            WHERE g.group_id = %s AND g.org_id = %s AND g.is_deleted = 0
+            ORDER BY t.created_at DESC, t.target_id DESC
+        """, (*union_params, business_id, org_id))
+        rows = cur.fetchall()
+    if not rows:
+        return None
+    return [row for row in rows if row.target_id is not None]
+
+
 # 대상자 검색
 def search_targets(event, business_id):
     try:
         org_id = require_auth(event)
         query_params = event.get("queryStringParameters") or {}
-        search_term = escape_single_quotes(query_params.get("q", ""))
-        
+        search_term = escape_single_quotes((query_params.get("q") or "").strip())
+
         if not search_term:
             return _resp(400, {"ok": False, "message": "검색어를 입력해주세요."})
-        
+
+        with get_conn() as conn:
+            # 사업 권한 확인 + 대상자 검색
+            targets = _search_targets(conn, org_id, business_id, search_term)
+
+            if targets is None:
+                return _resp(404, {"ok": False, "message": "사업을 찾을 수 없습니다."})
+            
+            # 데이터베이스 필드명을 프론트엔드 필드명으로 변환
+            return _resp(200, {"ok": True, "data": _format_targets(targets)})
+                
+    except PermissionError as e:
+        return _resp(401, {"ok": False, "message": str(e)})
+    except Exception as e:
+        return _resp(500, {"ok": False, "message": f"대상자 검색 중 오류가 발생했습니다: {str(e)}"})
+
+# ----------------------------------------
+# 엑셀 내보내기 (서버 스트리밍)
+# 대상자 행을 SSCursor로 한 줄씩 읽어 XLSX(시트 XML을 담은 zip)에 바로 기록합니다.
+# 공유 문자열 테이블 대신 inline string을 사용하고, EXPORT_SPOOL_BYTES 를 넘는 파일은 /tmp 에
+# 기록하므로 파일을 만드는 동안의 메모리 사용량은 명단 크기와 무관하게 일정합니다.
+# 응답 본문(base64)은 조각별로 인코딩하며, Lambda 응답 한도(6MB)를 넘으면 413 으로 거절합니다.
+# 레이아웃은 프론트엔드 TargetList.js의 엑셀받기(1.단체정보 / 2.추천대상정보)와 동일합니다.
+EXPORT_SPOOL_BYTES = int(os.getenv("EXPORT_SPOOL_BYTES", str(1024 * 1024)))
+# base64 응답 본문 최대 크기 (6MB 응답 한도에서 헤더/JSON 여유분을 뺀 값)
+EXPORT_MAX_BODY_BYTES = int(os.getenv("EXPORT_MAX_BODY_BYTES", str(6 * 1024 * 1024 - 64 * 1024)))
+# base64 로 인코딩할 조각 크기. 3의 배수여야 조각별 결과를 그대로 이어 붙일 수 있습니다.
+_EXPORT_B64_CHUNK = 3 * 256 * 1024
+
+_XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+_XML_INVALID_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+# 스타일 1번: 얇은 테두리 + 위/왼쪽 정렬 + 줄바꿈
+_XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="맑은 고딕"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="2"><border><left/><right/><top/><bottom/><diagonal/></border>'
+    '<border><left style="thin"/><right style="thin"/><top style="thin"/><bottom style="thin"/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="1" xfId="0" applyBorder="1" applyAlignment="1">'
+    '<alignment horizontal="left" vertical="top" wrapText="1"/></xf></cellXfs>'
+    '</styleSheet>'
+)
+
+
+def _xlsx_col(index):
+    """0부터 시작하는 열 번호를 A, B, ..., AA 형식으로 변환합니다."""
+    name = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        name = chr(65 + rem) + name
+    return name
+
+
+class _XlsxStreamWriter:
+    """시트 하나짜리 XLSX를 행 단위로 기록하는 최소 구현입니다."""
+
+    def __init__(self, fileobj, sheet_name, col_widths):
+        self._zip = zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED)
+        self._zip.writestr("[Content_Types].xml", _XLSX_CONTENT_TYPES)
+        self._zip.writestr("_rels/.rels", _XLSX_ROOT_RELS)
+        self._zip.writestr("xl/_rels/workbook.xml.rels", _XLSX_WORKBOOK_RELS)
+        self._zip.writestr("xl/styles.xml", _XLSX_STYLES)
+        self._zip.writestr("xl/workbook.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{xml_escape(sheet_name)}" sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>'
+        ))
+        self._sheet = self._zip.open("xl/worksheets/sheet1.xml", "w")
+        cols = "".join(
+            f'<col min="{i}" max="{i}" width="{w}" customWidth="1"/>'
+            for i, w in enumerate(col_widths, start=1)
+        )
+        self._write(
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            f'<cols>{cols}</cols><sheetData>'
+        )
+        self._row = 0
+
+    def _write(self, text):
+        self._sheet.write(text.encode("utf-8"))
+
+    def write_row(self, values, height=None):
+        self._row += 1
+        row = self._row
+        cells = []
+        for col, value in enumerate(values):
+            if value is None or value == "":
+                continue
+            ref = f"{_xlsx_col(col)}{row}"
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                cells.append(f'<c r="{ref}" s="1"><v>{value}</v></c>')
+            else:
+                text = xml_escape(_XML_INVALID_CHARS.sub("", str(value)))
+                cells.append(f'<c r="{ref}" s="1" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+        height_attr = f' ht="{height}" customHeight="1"' if height else ""
+        self._write(f'<row r="{row}"{height_attr}>{"".join(cells)}</row>')
+
+    def close(self):
+        self._write("</sheetData></worksheet>")
+        self._sheet.close()
+        self._zip.close()
+
+
+_EXPORT_COL_WIDTHS = (8, 15, 15, 20, 12, 25, 20, 15, 15, 50, 30)
+_EXPORT_HEADER = ("연번", "대상자명", "대상구분", "대상가구", "우편번호", "기본주소", "상세주소",
+                  "핸드폰", "집전화", "신청사유", "찾아가는길")
+_MOBILE_PREFIXES = ("010", "011", "016", "017", "018", "019")
+_AREA_CODES = ("031", "032", "033", "041", "042", "043", "051", "052", "053", "061", "062", "063")
+
+
+def _format_phone(phone):
+    """TargetList.js의 formatPhoneNumber와 같은 규칙으로 전화번호에 하이픈을 넣습니다."""
+    if not phone:
+        return ""
+    numbers = re.sub(r"\D", "", phone)
+    if len(numbers) == 11 and numbers.startswith(_MOBILE_PREFIXES):
+        return f"{numbers[:3]}-{numbers[3:7]}-{numbers[7:]}"
+    if numbers.startswith("02"):
+        if len(numbers) == 9:
+            return f"{numbers[:2]}-{numbers[2:5]}-{numbers[5:]}"
+        if len(numbers) == 10:
+            return f"{numbers[:2]}-{numbers[2:6]}-{numbers[6:]}"
+    if len(numbers) == 10 and numbers.startswith(_AREA_CODES):
+        return f"{numbers[:3]}-{numbers[3:6]}-{numbers[6:]}"
+    if len(numbers) == 10:
+        return f"{numbers[:3]}-{numbers[3:6]}-{numbers[6:]}"
+    if len(numbers) >= 11:
+        return f"{numbers[:3]}-{numbers[3:7]}-{numbers[7:11]}"
+    return phone
+
+
+def _export_row_height(apply_reason, directions):
+    """신청사유(50자/줄), 찾아가는길(30자/줄) 기준으로 행 높이를 계산합니다. (20~200)"""
+    max_lines = 1
+    for text, width in ((apply_reason, 50), (directions, 30)):
+        if text:
+            text = str(text)
+            max_lines = max(max_lines, text.count("\n") + 1, -(-len(text) // width))
+    return min(200, max(20, max_lines * 15 + 10))
+
+
+def _write_targets_xlsx(fileobj, group, rows):
+    """그룹 정보와 대상자 행 이터레이터로 엑셀 파일을 기록하고 기록한 대상자 수를 반환합니다."""
+    writer = _XlsxStreamWriter(fileobj, "대상자명단", _EXPORT_COL_WIDTHS)
+    address = " ".join(filter(None, (group["zipcode"], group["address1"], group["address2"]))).strip()
+    for values in (
+        ("1.단체정보",),
+        ("단체명", group["group_name"] or ""),
+        ("주소", address),
+        ("담당자명", group["contact_name"] or ""),
+        ("핸드폰", _format_phone(group["mobile_phone"])),
+        ("일반전화", _format_phone(group["office_phone"])),
+        (),
+        ("2.추천대상정보",),
+        _EXPORT_HEADER,
+    ):
+        writer.write_row(values, height=20)
+
+    count = 0
+    for row in rows:
+        count += 1
+        (target_name, target_type, target_gubun, zipcode, address1, address2,
+         mobile_phone, office_phone, apply_reason, directions) = row
+        writer.write_row(
+            (count, target_name, target_type, target_gubun, zipcode, address1, address2,
+             mobile_phone, office_phone, apply_reason, directions),
+            height=_export_row_height(apply_reason, directions),
+        )
+    writer.close()
+    return count
+
+
+def _base64_file(fileobj):
+    """파일 전체를 한 번에 읽지 않고 조각별로 base64 인코딩한 문자열을 반환합니다."""
+    fileobj.seek(0)
+    parts = []
+    for chunk in iter(lambda: fileobj.read(_EXPORT_B64_CHUNK), b""):
+        parts.append(base64.b64encode(chunk).decode("ascii"))
+    return "".join(parts)
+
+
+# 대상자 엑셀 내보내기
+def export_targets(event, business_id):
+    try:
+        org_id = require_auth(event)
         with get_conn() as conn:
             with conn.cursor() as cur:
-                # 사업 권한 확인
                 cur.execute("""
-                    SELECT group_id FROM nm_groups 
+                    SELECT group_name, zipcode, address1, address2, contact_name, mobile_phone, office_phone
+                    FROM nm_groups
                     WHERE group_id = %s AND org_id = %s AND is_deleted = 0
                 """, (business_id, org_id))
-                
-                if not cur.fetchone():
+                group = cur.fetchone()
+            if not group:
+                return _resp(404, {"ok": False, "message": "사업을 찾을 수 없습니다."})
+
+            # 행을 버퍼링하지 않는 SSCursor로 읽으면서 바로 시트에 기록
+            with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES) as fileobj:
+                with conn.cursor(pymysql.cursors.SSCursor) as cur:
+                    cur.execute("""
+                        SELECT target_name, target_type, target_gubun, zipcode, address1, address2,
+                               mobile_phone, office_phone, apply_reason, directions
+                        FROM nm_targets
+                        WHERE group_id = %s AND is_deleted = 0
+                        ORDER BY created_at DESC, target_id DESC
+                    """, (business_id,))
+                    count = _write_targets_xlsx(fileobj, group, cur.fetchall_unbuffered())
+                size = fileobj.seek(0, io.SEEK_END)
+                if -(-size // 3) * 4 > EXPORT_MAX_BODY_BYTES:
+                    log.warning("엑셀 파일이 응답 크기 한도를 넘습니다", business_id=business_id,
+                                count=count, bytes=size)
+                    return _resp(413, {
+                        "ok": False,
+                        "message": f"대상자 {count}명의 엑셀 파일({size / (1024 * 1024):.1f}MB)이 "
+                                   f"응답 크기 한도를 넘어 내려받을 수 없습니다.",
+                    })
+                body = _base64_file(fileobj)
+
+        log.info("대상자 엑셀 내보내기", business_id=business_id, count=count)
+        file_name = f"{group['group_name'] or '대상자'}_명단_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
+        headers = dict(_CORS_HEADERS)
+        headers["Content-Type"] = _XLSX_MIME
+        headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(file_name)}"
+        return {
+            "statusCode": 200,
+            "headers": headers,
+            "body": body,
+            "isBase64Encoded": True,
+        }
+
+    except PermissionError as e:
+        return _resp(401, {"ok": False, "message": str(e)})
+    except Exception as e:
+        return _resp(500, {"ok": False, "message": f"엑셀 내보내기 중 오류가 발생했습니다: {str(e)}"})
+# ----------------------------------------
+
+# ----------------------------------------
+# 대상자 일괄 등록
+# JSON 배열, CSV, XLSX(엑셀받기 양식) 업로드를 한 번에 검증한 뒤
+# Cursor.executemany(다중 행 INSERT로 묶어서 전송)로 등록합니다.
+# DB_LOCAL_INFILE=1 이고 행 수가 BULK_LOAD_DATA_MIN_ROWS 이상이면
+# 메모리 버퍼를 LOAD DATA LOCAL INFILE 로 전송합니다. (MySQL 서버의 local_infile=ON 필요)
+BULK_IMPORT_MAX_ROWS = int(os.getenv("BULK_IMPORT_MAX_ROWS", "5000"))
+BULK_LOAD_DATA_MIN_ROWS = int(os.getenv("BULK_LOAD_DATA_MIN_ROWS", "2000"))
+
+# 일괄 등록 컬럼 순서 (nm_targets 컬럼, 요청 필드명, 엑셀/CSV 헤더, 최대 길이)
+_BULK_COLUMNS = (
+    ("target_name", "name", "대상자명", 100),
+    ("target_type", "targetType", "대상구분", 50),
+    ("target_gubun", "targetHousehold", "대상가구", 50),
+    ("zipcode", "zipcode", "우편번호", 10),
+    ("address1", "address", "기본주소", 200),
+    ("address2", "detailAddress", "상세주소", 200),
+    ("mobile_phone", "mobilePhone", "핸드폰", 20),
+    ("office_phone", "phone", "집전화", 20),
+    ("apply_reason", "applicationReason", "신청사유", None),
+    ("directions", "directions", "찾아가는길", None),
+)
+_BULK_HEADER_KEYS = {}
+for _column, _key, _label, _max_len in _BULK_COLUMNS:
+    _BULK_HEADER_KEYS[_key] = _key
+    _BULK_HEADER_KEYS[_label] = _key
+    _BULK_HEADER_KEYS[_column] = _key
+
+_BULK_INSERT_SQL = """
+    INSERT INTO nm_targets (group_id, target_name, target_type, target_gubun, zipcode, address1, address2, mobile_phone, office_phone, apply_reason, directions, is_deleted)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 0)
+"""
+_XLSX_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+def _table_to_records(rows):
+    """헤더 행(대상자명 또는 name 포함)을 찾아 그 아래 행들을 dict로 변환합니다."""
+    header = None
+    for line_no, values in enumerate(rows, start=1):
+        cells = [str(v).strip() if v is not None else "" for v in values]
+        if header is None:
+            if "대상자명" in cells or "name" in cells:
+                header = [_BULK_HEADER_KEYS.get(c) for c in cells]
+            continue
+        if not any(cells):
+            continue
+        record = {key: cells[i] for i, key in enumerate(header) if key and i < len(cells)}
+        yield line_no, record
+    if header is None:
+        raise ValueError("헤더 행(대상자명)을 찾을 수 없습니다.")
+
+
+def _xlsx_rows(data):
+    """첫 번째 시트의 행을 값 리스트로 읽습니다. (공유 문자열, inline string 지원)"""
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        shared = []
+        if "xl/sharedStrings.xml" in zf.namelist():
+            with zf.open("xl/sharedStrings.xml") as f:
+                for _, elem in ElementTree.iterparse(f):
+                    if elem.tag == _XLSX_NS + "si":
+                        shared.append("".join(t.text or "" for t in elem.iter(_XLSX_NS + "t")))
+                        elem.clear()
+        sheet = next(n for n in sorted(zf.namelist()) if n.startswith("xl/worksheets/sheet"))
+        with zf.open(sheet) as f:
+            for _, elem in ElementTree.iterparse(f):
+                if elem.tag != _XLSX_NS + "row":
+                    continue
+                values = []
+                for c in elem.iter(_XLSX_NS + "c"):
+                    col = 0
+                    for ch in re.match(r"[A-Z]+", c.get("r", "A")).group():
+                        col = col * 26 + ord(ch) - 64
+                    while len(values) < col - 1:
+                        values.append("")
+                    cell_type = c.get("t")
+                    if cell_type == "inlineStr":
+                        value = "".join(t.text or "" for t in c.iter(_XLSX_NS + "t"))
+                    else:
+                        v = c.find(_XLSX_NS + "v")
+                        value = v.text if v is not None else ""
+                        if cell_type == "s" and value:
+                            value = shared[int(value)]
+                    values.append(value)
+                elem.clear()
+                yield values
+
+
+def _parse_bulk_body(event):
+    """요청 본문을 (행 번호, dict) 목록으로 변환합니다."""
+    headers = {k.lower(): v for k, v in (event.get("headers") or {}).items()}
+    content_type = (headers.get("content-type") or "application/json").split(";")[0].strip().lower()
+    raw = event.get("body") or ""
+    data = base64.b64decode(raw) if event.get("isBase64Encoded") else raw.encode("utf-8")
+
+    if content_type == _XLSX_MIME:
+        return list(_table_to_records(_xlsx_rows(data)))
+    if content_type in ("text/csv", "application/csv"):
+        text = data.decode("utf-8-sig")
+        return list(_table_to_records(csv.reader(io.StringIO(text))))
+
+    payload = json.loads(data.decode("utf-8") or "[]")
+    if isinstance(payload, dict):
+        payload = payload.get("targets")
+    if not isinstance(payload, list):
+        raise ValueError("대상자 배열(JSON) 또는 CSV/XLSX 파일을 보내주세요.")
+    return [(i, item if isinstance(item, dict) else {}) for i, item in enumerate(payload, start=1)]
+
+
+def _validate_bulk_record(record):
+    """create_target과 같은 규칙으로 한 행을 검증/정리합니다. (값 튜플, 오류 메시지)"""
+    values = []
+    for column, key, label, max_len in _BULK_COLUMNS:
+        value = record.get(key)
+        value = "" if value is None else str(value).strip()
+        if key in ("mobilePhone", "phone"):
+            value = value.replace("-", "")
+        if max_len and len(value) > max_len:
+            return None, f"{label}은(는) {max_len}자 이내로 입력해주세요."
+        values.append(escape_single_quotes(value))
+    if not values[0]:
+        return None, "이름을 입력해주세요."
+    return values, None
+
+
+def _load_data_buffer(business_id, rows):
+    """LOAD DATA 기본 형식(탭 구분, \\N = NULL)의 메모리 버퍼를 만듭니다."""
+    def field(value):
+        if value is None:
+            return "\\N"
+        return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+                .replace("\n", "\\n").replace("\r", "\\r"))
+
+    buf = io.BytesIO()
+    for values in rows:
+        buf.write(("\t".join(field(v) for v in (business_id, *values)) + "\n").encode("utf-8"))
+    buf.seek(0)
+    return buf
+
+
+def _bulk_insert_targets(conn, cur, business_id, rows):
+    """검증된 행들을 등록하고 대상자 수를 늘린 뒤 등록된 행 수를 반환합니다.
+
+    사업 행을 잠근 트랜잭션 안에서 호출해야 합니다.
+    """
+    if conn._local_infile and len(rows) >= BULK_LOAD_DATA_MIN_ROWS:
+        file_name = f"nm_targets_bulk_{business_id}_{time.monotonic_ns()}.tsv"
+        conn.register_local_infile(file_name, _load_data_buffer(business_id, rows))
+        inserted = cur.execute(f"""
+            LOAD DATA LOCAL INFILE %s INTO TABLE nm_targets CHARACTER SET utf8mb4
+            ({", ".join(["group_id"] + [c[0] for c in _BULK_COLUMNS])})
+        """, (file_name,))
+    else:
+        inserted = cur.executemany(_BULK_INSERT_SQL, [(business_id, *values) for values in rows])
+    _adjust_target_count(cur, business_id, inserted)
+    return inserted
+
+
+# 대상자 일괄 등록
+def bulk_create_targets(event, business_id):
+    try:
+        org_id = require_auth(event)
+        try:
+            records = _parse_bulk_body(event)
+        except (ValueError, KeyError, zipfile.BadZipFile, ElementTree.ParseError, UnicodeDecodeError) as e:
+            return _resp(400, {"ok": False, "message": f"파일을 읽을 수 없습니다: {str(e)}"})
+
+        if not records:
+            return _resp(400, {"ok": False, "message": "등록할 대상자가 없습니다."})
+        if len(records) > BULK_IMPORT_MAX_ROWS:
+            return _resp(400, {"ok": False, "message": f"한 번에 최대 {BULK_IMPORT_MAX_ROWS}명까지 등록할 수 있습니다."})
+
+        # 한 번에 전체 행 검증
+        rows, errors = [], []
+        for line_no, record in records:
+            values, error = _validate_bulk_record(record)
+            if error:
+                errors.append({"row": line_no, "message": error})
+            else:
+                rows.append(values)
+
+        inserted = 0
+        with get_conn() as conn:
+            with conn.cursor() as cur, _transaction(conn):
+                # 사업 행을 먼저 잠그고 등록 (대상자 수 증가와 교착되지 않게)
+                if not _group_exists(cur, org_id, business_id, lock=True):
                     return _resp(404, {"ok": False, "message": "사업을 찾을 수 없습니다."})
-                
-                # 대상자 검색
-                search_pattern = f"%{search_term}%"
-                cur.execute("""
-                    SELECT target_id, target_name, target_type, target_gubun,
-                           zipcode, address1, address2, mobile_phone, office_phone,
-                           apply_reason, directions, created_at, updated_at
-                    FROM nm_targets 
-                    WHERE group_id = %s AND is_deleted = 0
-                    AND (target_name LIKE %s OR mobile_phone LIKE %s OR office_phone LIKE %s)
-                    ORDER BY created_at DESC
-                """, (business_id, search_pattern, search_pattern, search_pattern))
-                
-                targets = cur.fetchall()
-                
-                # 데이터베이스 필드명을 프론트엔드 필드명으로 변환 (딕셔너리 형태로 접근)
-                formatted_targets = []
-                for target in targets:
-                    try:
-                        # 안전한 데이터 변환
-                        zipcode = target.get('zipcode', '') if target.get('zipcode') is not None else ""
-                        address1 = target.get('address1', '') if target.get('address1') is not None else ""
-                        created_at = target.get('created_at') if target.get('created_at') is not None else None
-                        
-                        # 주소 합치기
-                        full_address = ""
-                        if zipcode and address1:
-                            full_address = f"{zipcode} {address1}"
-                        elif address1:
-                            full_address = address1
-                        elif zipcode:
-                            full_address = zipcode
-                        
-                        # 날짜 형식 변환
-                        registered_at = ""
-                        if created_at:
-                            try:
-                                if hasattr(created_at, 'strftime'):
-                                    registered_at = created_at.strftime("%Y-%m-%d")
-                                else:
-                                    registered_at = str(created_at)
-                            except Exception as date_error:
-                                print(f"날짜 변환 오류: {date_error}")
-                                registered_at = str(created_at)
-                        
-                        formatted_target = {
-                            "id": target.get('target_id', 0),
-                            "name": target.get('target_name', ''),
-                            "targetType": target.get('target_type', ''),
-                            "targetHousehold": target.get('target_gubun', ''),
-                            "zipcode": zipcode,
-                            "address": full_address,
-                            "detailAddress": target.get('address2', ''),
-                            "mobilePhone": target.get('mobile_phone', ''),
-                            "phone": target.get('office_phone', ''),
-                            "applicationReason": target.get('apply_reason', ''),
-                            "directions": target.get('directions', ''),
-                            "registeredAt": registered_at,
-                            "status": "active"
-                        }
-                        formatted_targets.append(formatted_target)
-                    except Exception as e:
-                        print(f"검색 대상자 데이터 변환 오류: {str(e)}, target: {target}")
-                        continue
-                
-                return _resp(200, {"ok": True, "data": formatted_targets})
-                
+                if rows:
+                    inserted = _bulk_insert_targets(conn, cur, business_id, rows)
+
+        log.info("대상자 일괄 등록", business_id=business_id, inserted=inserted, failed=len(errors))
+        return _resp(201 if inserted else 400, {
+            "ok": bool(inserted),
+            "message": f"{inserted}명이 등록되었습니다." if inserted else "등록된 대상자가 없습니다.",
+            "data": {"inserted": inserted, "failed": len(errors), "errors": errors},
+        })
+
     except PermissionError as e:
         return _resp(401, {"ok": False, "message": str(e)})
     except Exception as e:
-        return _resp(500, {"ok": False, "message": f"대상자 검색 중 오류가 발생했습니다: {str(e)}"})
+        return _resp(500, {"ok": False, "message": f"대상자 일괄 등록 중 오류가 발생했습니다: {str(e)}"})
+# ----------------------------------------
+
+# ----------------------------------------
+# 대상자 수(target_count) 정산 작업
+# EventBridge 스케줄 규칙에서 입력 {"job": "reconcile_target_counts"} 로 호출합니다.
+# 그룹 행을 RECONCILE_BATCH_SIZE 개씩 FOR UPDATE 로 잠근 뒤 활성 대상자 수를 집계합니다.
+# 대상자 쓰기 경로는 target_count 증감에서 이 잠금을 기다리므로, 잠근 뒤 읽은 집계와
+# 이후의 증감이 어긋나지 않습니다.
+RECONCILE_BATCH_SIZE = int(os.getenv("RECONCILE_BATCH_SIZE", "500"))
+
+
+def reconcile_target_counts(conn, batch_size=RECONCILE_BATCH_SIZE):
+    """어긋난 target_count 를 바로잡고 {"checked": 검사한 그룹 수, "fixed": 고친 그룹 수}를 반환합니다."""
+    checked = fixed = 0
+    last_id = 0
+    with conn.cursor(pymysql.cursors.Cursor) as cur:
+        while True:
+            with _transaction(conn):
+                cur.execute("""
+                    SELECT group_id, target_count FROM nm_groups
+                    WHERE group_id > %s
+                    ORDER BY group_id
+                    LIMIT %s
+                    FOR UPDATE
+                """, (last_id, batch_size))
+                groups = cur.fetchall()
+                if not groups:
+                    break
+                cur.execute("""
+                    SELECT group_id, COUNT(*) FROM nm_targets
+                    WHERE group_id BETWEEN %s AND %s AND is_deleted = 0
+                    GROUP BY group_id
+                """, (groups[0][0], groups[-1][0]))
+                actual = dict(cur.fetchall())
+                drift = [(actual.get(group_id, 0), group_id)
+                         for group_id, count in groups if count != actual.get(group_id, 0)]
+                if drift:
+                    cur.executemany("""
+                        UPDATE nm_groups
+                        SET target_count = %s, updated_at = updated_at
+                        WHERE group_id = %s
+                    """, drift)
+                    log.warning("target_count 불일치 수정", count=len(drift),
+                                groups=[group_id for _, group_id in drift[:20]])
+            checked += len(groups)
+            fixed += len(drift)
+            last_id = groups[-1][0]
+    return {"checked": checked, "fixed": fixed}
+
+
+_JOBS = {
+    "reconcile_target_counts": reconcile_target_counts,
+}
+
+
+def run_job(name):
+    job = _JOBS.get(name)
+    if job is None:
+        log.error("알 수 없는 작업", job=name)
+        return {"ok": False, "job": name, "message": "알 수 없는 작업입니다."}
+    started = time.monotonic()
+    with get_conn() as conn:
+        result = job(conn)
+    log.info("작업 완료", job=name, elapsed_ms=round((time.monotonic() - started) * 1000), **result)
+    return {"ok": True, "job": name, **result}
+# ----------------------------------------
+
+# ----------------------------------------
+# 라우팅
+# (메서드, 경로 템플릿, 핸들러) 표를 import 시점에 세그먼트 트리로 만들어 둡니다.
+# 노드마다 정적 세그먼트 dict 와 경로 파라미터 자식 하나를 두고, 요청 경로는 세그먼트당
+# dict 조회 한 번으로 핸들러와 형 변환된 경로 파라미터를 찾습니다. (라우트 수와 무관)
+# 정적 세그먼트가 파라미터보다 우선하므로 /targets/search 가 /targets/{target_id} 에
+# 가려지지 않습니다. 일치하는 경로가 없으면 404, 경로는 있지만 메서드가 없으면 405 입니다.
+
+def _int_param(value):
+    # int()는 " 5", "+5", "1_0" 도 받아들이므로 ASCII 숫자만 허용합니다.
+    if not (value.isascii() and value.isdigit()):
+        raise ValueError(value)
+    return int(value)
+
+
+_PARAM_TYPES = {"int": _int_param, "str": str}
+
+
+def _split_path(path):
+    return [segment for segment in path.split("/") if segment]
+
+
+class _RouteNode:
+    __slots__ = ("static", "param", "param_name", "param_type", "methods")
+
+    def __init__(self):
+        self.static = {}
+        self.param = None
+        self.param_name = None
+        self.param_type = None
+        self.methods = {}
+
+
+class _Router:
+    """경로 템플릿 세그먼트 트리. 템플릿의 {name} 또는 {name:int} 는 경로 파라미터입니다."""
+
+    def __init__(self, routes=()):
+        self._root = _RouteNode()
+        for method, template, func in routes:
+            self.add(method, template, func)
+
+    def add(self, method, template, func):
+        node = self._root
+        for segment in _split_path(template):
+            if segment.startswith("{") and segment.endswith("}"):
+                name, _, type_name = segment[1:-1].partition(":")
+                param_type = _PARAM_TYPES[type_name or "str"]
+                if node.param is None:
+                    node.param = _RouteNode()
+                    node.param_name, node.param_type = name, param_type
+                elif (node.param_name, node.param_type) != (name, param_type):
+                    raise ValueError(f"경로 파라미터 충돌: {template}")
+                node = node.param
+            else:
+                node = node.static.setdefault(segment, _RouteNode())
+        if method in node.methods:
+            raise ValueError(f"중복 라우트: {method} {template}")
+        node.methods[method] = func
+
+    def match(self, path):
+        """경로의 ({메서드: 핸들러}, 경로 파라미터)를 반환합니다. 없는 경로면 (None, None)."""
+        node = self._root
+        params = {}
+        for segment in _split_path(path):
+            child = node.static.get(segment)
+            if child is None:
+                child = node.param
+                if child is None:
+                    return None, None
+                try:
+                    params[node.param_name] = node.param_type(segment)
+                except ValueError:
+                    return None, None
+            node = child
+        if not node.methods:
+            return None, None
+        return node.methods, params
+
+
+def health(event):
+    return _resp(200, {"ok": True, "message": "healthy"})
+
+
+def logout(event):
+    return _resp(200, {"ok": True, "message": "로그아웃되었습니다."})
+
+
+# DB 연결 테스트
+def db_check(event):
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT NOW() AS server_time")
+            rows = cur.fetchall()
+    return _resp(200, {"ok": True, "data": rows})
+
+
+_router = _Router([
+    ("GET", "/", db_check),
+    ("GET", "/health", health),
+    # 인증 관련 엔드포인트
+    ("POST", "/login", login),
+    ("GET", "/auth/verify", verify_token),
+    ("POST", "/auth/logout", logout),
+    # 사업 관련 엔드포인트
+    ("GET", "/businesses", get_businesses),
+    ("POST", "/businesses", create_business),
+    ("GET", "/businesses/{business_id:int}", get_business),
+    ("PUT", "/businesses/{business_id:int}", update_business),
+    ("DELETE", "/businesses/{business_id:int}", delete_business),
+    # 대상자 관련 엔드포인트
+    ("GET", "/businesses/{business_id:int}/targets", get_targets),
+    ("POST", "/businesses/{business_id:int}/targets", create_target),
+    ("POST", "/businesses/{business_id:int}/targets:bulk", bulk_create_targets),
+    ("POST", "/businesses/{business_id:int}/targets:batchDelete", batch_delete_targets),
+    ("POST", "/businesses/{business_id:int}/targets:batchRestore", batch_restore_targets),
+    ("POST", "/businesses/{business_id:int}/targets:batchRetag", batch_retag_targets),
+    ("GET", "/businesses/{business_id:int}/targets/export.xlsx", export_targets),
+    ("GET", "/businesses/{business_id:int}/targets/search", search_targets),
+    ("GET", "/businesses/{business_id:int}/targets/{target_id:int}", get_target),
+    ("PUT", "/businesses/{business_id:int}/targets/{target_id:int}", update_target),
+    ("DELETE", "/businesses/{business_id:int}/targets/{target_id:int}", delete_target),
+])
+# ----------------------------------------
 
 def handler(event, context):
-    path = (event.get("rawPath") or event.get("path") or "").rstrip("/") or "/"
+    try:
+        # 예약 작업 (HTTP 요청이 아닌 이벤트)
+        if event.get("job"):
+            return run_job(event["job"])
+        return _encode_response(event, _dispatch(event))
+    finally:
+        if _db_stats is not None:
+            _db_stats.flush(request_id=getattr(context, "aws_request_id", None),
+                            job=event.get("job"), path=event.get("rawPath") or event.get("path"))
+
+
+def _dispatch(event):
+    path = event.get("rawPath") or event.get("path") or "/"
     method = (event.get("requestContext", {}).get("http", {}).get("method")
               or event.get("httpMethod") or "GET").upper()
     
-    print(f"요청 처리: {method} {path}")
-    print(f"Headers: {event.get('headers', {})}")
+    log.debug("요청 처리", method=method, path=path)
     
     # OPTIONS 요청 처리 (CORS preflight)
     if method == "OPTIONS":
-        print(f"OPTIONS 요청 처리: {path}")
         return {
             "statusCode": 200,
             "headers": {
                 "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,Authorization,X-Amz-Date,X-Api-Key,X-Amz-Security-Token",
+                "Access-Control-Allow-Headers": "Content-Type,Authorization,If-None-Match,X-Amz-Date,X-Api-Key,X-Amz-Security-Token",
                 "Access-Control-Allow-Methods": "GET,POST,PUT,DELETE,OPTIONS",
                 "Access-Control-Max-Age": "86400",
                 "Content-Type": "application/json"
@@ -1013,70 +2483,27 @@ def handler(event, context):
             "body": ""
         }
     
-    try:
-        # Health check
-        if path == "/health":
-            return _resp(200, {"ok": True, "message": "healthy"})
-        
-        # 인증 관련 엔드포인트
-        if path == "/login" and method == "POST":
-            return login(event)
-        
-        if path == "/auth/verify" and method == "GET":
-            return verify_token(event)
-        
-        if path == "/auth/logout" and method == "POST":
-            return _resp(200, {"ok": True, "message": "로그아웃되었습니다."})
-        
-        # 사업 관련 엔드포인트
-        if path == "/businesses" and method == "GET":
-            return get_businesses(event)
-        
-        if path == "/businesses" and method == "POST":
-            return create_business(event)
-        
-        # 사업 상세/수정/삭제 (동적 경로)
-        if path.startswith("/businesses/"):
-            path_parts = path.split("/")
-            if len(path_parts) >= 3:
-                business_id = path_parts[2]
-                
-                if len(path_parts) == 3:  # /businesses/{id}
-                    if method == "GET":
-                        return get_business(event, business_id)
-                    elif method == "PUT":
-                        return update_business(event, business_id)
-                    elif method == "DELETE":
-                        return delete_business(event, business_id)
-                
-                elif len(path_parts) == 4 and path_parts[3] == "targets":  # /businesses/{id}/targets
-                    if method == "GET":
-                        return get_targets(event, business_id)
-                    elif method == "POST":
-                        return create_target(event, business_id)
-                
-                elif len(path_parts) == 5 and path_parts[3] == "targets":  # /businesses/{id}/targets/{target_id}
-                    target_id = path_parts[4]
-                    if method == "GET":
-                        return get_target(event, business_id, target_id)
-                    elif method == "PUT":
-                        return update_target(event, business_id, target_id)
-                    elif method == "DELETE":
-                        return delete_target(event, business_id, target_id)
-                
-                elif len(path_parts) == 5 and path_parts[3] == "targets" and path_parts[4] == "search":  # /businesses/{id}/targets/search
-                    if method == "GET":
-                        return search_targets(event, business_id)
-        
-        # 기본 응답 (DB 연결 테스트)
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT NOW() AS server_time")
-                rows = cur.fetchall()
-        return _resp(200, {"ok": True, "data": rows})
+    methods, params = _router.match(path)
+    if methods is None:
+        return _resp(404, {"ok": False, "message": "요청한 경로를 찾을 수 없습니다."})
+    func = methods.get(method)
+    if func is None:
+        return _resp(405, {"ok": False, "message": "허용되지 않는 메서드입니다."},
+                     {"Allow": ", ".join(sorted(methods))})
 
-    except Exception as e:
-        return _resp(500, {"ok": False, "error": str(e)})
+    # 조회 요청은 처리 중 웜 연결이 끊겼으면 새 연결로 한 번만 다시 실행합니다.
+    # 쓰기 요청은 서버에 반영됐는지 알 수 없으므로 다시 실행하지 않습니다.
+    attempts = 2 if method == "GET" else 1
+    for attempt in range(attempts):
+        drops = _conn_drops
+        try:
+            resp = func(event, **params)
+        except Exception as e:
+            log.error("요청 처리 오류", method=method, path=path, error=str(e))
+            resp = _resp(500, {"ok": False, "error": str(e)})
+        if _conn_drops == drops or attempt + 1 == attempts:
+            return resp
+        log.warning("요청 처리 중 DB 연결 끊김, 새 연결로 다시 실행합니다", method=method, path=path)
 
 def lambda_handler(event, context):
     return handler(event, context)
@@ -0,0 +1,1033 @@
+"""
+asyncio support: :class:`AsyncConnection` and the async cursors.
+
+The protocol code is shared with the blocking :class:`~pymysql.connections.Connection`
+(option parsing, handshake payloads, packet classes, converters, row decoding);
+only the I/O is done over an ``asyncio`` stream, so independent queries on
+separate connections can run concurrently in one event loop::
+
+    async with AsyncConnection(host=..., user=..., password=...) as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT ...")
+            rows = await cur.fetchall()
+
+Cancellation: if a task is cancelled while a command is on the wire or its
+reply is being read, the stream position is unknown, so the connection is
+closed rather than reused. An unbuffered cursor left by an exception or a
+cancellation in the ``async with`` body is cleaned up the same way; a cursor
+closed normally reads the rest of its result set so the connection stays usable.
+
+Not supported: the compressed protocol, ``LOAD DATA LOCAL INFILE``, server
+side prepared statements and custom auth plugin handlers.
+"""
+
+import asyncio
+import socket
+import struct
+import warnings
+
+from . import _auth, err
+from .charset import charset_by_name
+from .connections import (
+    DEBUG,
+    MAX_PACKET_LEN,
+    PIPELINE_WINDOW,
+    Connection,
+    MySQLResult,
+    _pack_int24,
+)
+from .constants import CLIENT, COMMAND, CR, ER
+from .cursors import (
+    RE_INSERT_VALUES,
+    RE_UPDATE_BY_KEY,
+    Cursor,
+    DictCursorMixin,
+    RecordCursorMixin,
+)
+from .protocol import FieldDescriptorPacket, MysqlPacket, OKPacketWrapper, dump_packet
+
+# asyncio.wait_for runs the awaitable in another task, and before Python 3.12 a
+# cancellation arriving just as that task finishes is lost: the caller goes on
+# to its next read instead of seeing CancelledError. asyncio.timeout (3.11+)
+# runs in the caller's task, so use it where it exists.
+if hasattr(asyncio, "timeout"):
+
+    async def _wait(awaitable, timeout):
+        async with asyncio.timeout(timeout):
+            return await awaitable
+
+else:
+    _wait = asyncio.wait_for
+
+
+class AsyncConnection(Connection):
+    """
+    A :class:`~pymysql.connections.Connection` that does its I/O with asyncio.
+
+    Takes the same arguments as ``Connection``, but never connects in the
+    constructor: use ``await conn.connect()``, ``async with conn`` or
+    :func:`connect`. Methods that talk to the server (``connect``, ``close``,
+    ``ping``, ``begin``, ``commit``, ``rollback``, ``select_db``,
+    ``autocommit``, ``set_character_set``, ``show_warnings``, ``kill``) are
+    coroutines. ``cursorclass`` defaults to :class:`AsyncCursor` and must be
+    one of the async cursors.
+    """
+
+    _reader = None
+    _writer = None
+
+    def __init__(self, *, cursorclass=None, **kwargs):
+        if kwargs.get("compress"):
+            raise err.NotSupportedError(
+                "AsyncConnection does not support the compressed protocol"
+            )
+        if kwargs.get("local_infile"):
+            raise err.NotSupportedError(
+                "AsyncConnection does not support LOAD DATA LOCAL INFILE"
+            )
+        kwargs["defer_connect"] = True
+        super().__init__(cursorclass=cursorclass or AsyncCursor, **kwargs)
+
+    def __enter__(self):
+        raise TypeError("Use 'async with' with AsyncConnection")
+
+    async def __aenter__(self):
+        if self._sock is None:
+            await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is not None and not issubclass(exc_type, Exception):
+            # Cancelled (or KeyboardInterrupt): don't start more I/O.
+            self._force_close()
+        elif self._sock is not None:
+            await self.close()
+
+    async def close(self):
+        """
+        Send the quit message and close the stream.
+
+        :raise Error: If the connection is already closed.
+        """
+        if self._closed:
+            raise err.Error("Already closed")
+        self._closed = True
+        if self._writer is None:
+            return
+        writer = self._writer
+        try:
+            writer.write(struct.pack("<iB", 1, COMMAND.COM_QUIT))
+            writer.close()
+            await writer.wait_closed()
+        except Exception:
+            pass
+        finally:
+            self._force_close()
+
+    def _force_close(self):
+        """Close the stream without QUIT message."""
+        if self._writer is not None:
+            try:
+                self._writer.transport.abort()
+            except Exception:
+                # e.g. the event loop is already closed
+                pass
+        self._reader = self._writer = None
+        self._sock = None
+        if self._result is not None:
+            # Rows left on the closed stream are gone with it.
+            self._result.unbuffered_active = False
+            self._result = None
+
+    __del__ = _force_close
+
+    async def autocommit(self, value):
+        self.autocommit_mode = bool(value)
+        current = self.get_autocommit()
+        if value != current:
+            await self._send_autocommit_mode()
+
+    async def _read_ok_packet(self):
+        pkt = await self._read_packet()
+        if not pkt.is_ok_packet():
+            raise err.OperationalError(
+                CR.CR_COMMANDS_OUT_OF_SYNC,
+                "Command Out of Sync",
+            )
+        ok = OKPacketWrapper(pkt)
+        self.server_status = ok.server_status
+        return ok
+
+    async def _send_autocommit_mode(self):
+        await self._execute_command(
+            COMMAND.COM_QUERY, "SET AUTOCOMMIT = %s" % self.escape(self.autocommit_mode)
+        )
+        await self._read_ok_packet()
+
+    async def begin(self):
+        """Begin transaction."""
+        await self._execute_command(COMMAND.COM_QUERY, "BEGIN")
+        await self._read_ok_packet()
+
+    async def commit(self):
+        """Commit changes to stable storage."""
+        await self._execute_command(COMMAND.COM_QUERY, "COMMIT")
+        await self._read_ok_packet()
+
+    async def rollback(self):
+        """Roll back the current transaction."""
+        await self._execute_command(COMMAND.COM_QUERY, "ROLLBACK")
+        await self._read_ok_packet()
+
+    async def show_warnings(self):
+        """Send the "SHOW WARNINGS" SQL command."""
+        await self._execute_command(COMMAND.COM_QUERY, "SHOW WARNINGS")
+        result = AsyncMySQLResult(self)
+        await result.read()
+        return result.rows
+
+    async def select_db(self, db):
+        """Set current db."""
+        await self._execute_command(COMMAND.COM_INIT_DB, db)
+        await self._read_ok_packet()
+
+    def register_local_infile(self, filename, fileobj):
+        raise err.NotSupportedError(
+            "AsyncConnection does not support LOAD DATA LOCAL INFILE"
+        )
+
+    # The following methods are INTERNAL USE ONLY (called from AsyncCursor)
+    async def query(self, sql, unbuffered=False):
+        if isinstance(sql, str):
+            sql = sql.encode(self.encoding, "surrogateescape")
+        await self._execute_command(COMMAND.COM_QUERY, sql)
+        self._affected_rows = await self._read_query_result(unbuffered=unbuffered)
+        return self._affected_rows
+
+    async def next_result(self, unbuffered=False):
+        self._affected_rows = await self._read_query_result(unbuffered=unbuffered)
+        return self._affected_rows
+
+    async def execute_pipelined(self, commands):
+        """See :meth:`Connection.execute_pipelined` (text protocol commands only)."""
+        results = []
+        start = 0
+        while start < len(commands):
+            pending = []
+            size = 0
+            for command, payload, _ in commands[start:]:
+                await self._execute_command(command, payload)
+                pending.append(self._next_seq_id)
+                size += len(payload)
+                if size >= PIPELINE_WINDOW:
+                    break
+            start += len(pending)
+
+            for seq_id in pending:
+                self._next_seq_id = seq_id
+                try:
+                    await self._read_query_result()
+                    result = self._result
+                    while self._result.has_next:
+                        await self.next_result()
+                except err.MySQLError as e:
+                    if not self._sock:
+                        e.batch_index = len(results)
+                        raise
+                    results.append(e)
+                else:
+                    results.append(result)
+        return results
+
+    def prepare(self, *args, **kwargs):
+        raise err.NotSupportedError(
+            "AsyncConnection does not support server side prepared statements"
+        )
+
+    execute_prepared = prepare
+
+    async def kill(self, thread_id):
+        if not isinstance(thread_id, int):
+            raise TypeError("thread_id must be an integer")
+        await self.query(f"KILL {thread_id:d}")
+
+    async def ping(self, reconnect=True):
+        """
+        Check if the server is alive.
+
+        :param reconnect: If the connection is closed, reconnect.
+        :raise Error: If the connection is closed and reconnect=False.
+        """
+        if self._sock is None:
+            if reconnect:
+                await self.connect()
+                reconnect = False
+            else:
+                raise err.Error("Already closed")
+        try:
+            await self._execute_command(COMMAND.COM_PING, "")
+            await self._read_ok_packet()
+        except Exception:
+            if reconnect:
+                await self.connect()
+                await self.ping(False)
+            else:
+                raise
+
+    async def set_charset(self, charset):
+        """Deprecated. Use set_character_set() instead."""
+        await self.set_character_set(charset)
+
+    async def set_character_set(self, charset, collation=None):
+        """
+        Set charaset (and collation)
+
+        Send "SET NAMES charset [COLLATE collation]" query.
+        Update Connection.encoding based on charset.
+        """
+        # Make sure charset is supported.
+        encoding = charset_by_name(charset).encoding
+
+        if collation:
+            query = f"SET NAMES {charset} COLLATE {collation}"
+        else:
+            query = f"SET NAMES {charset}"
+        await self._execute_command(COMMAND.COM_QUERY, query)
+        await self._read_packet()
+        self.charset = charset
+        self.encoding = encoding
+        self.collation = collation
+
+    async def connect(self):
+        self._closed = False
+        try:
+            if self.unix_socket:
+                reader, writer = await _wait(
+                    asyncio.open_unix_connection(self.unix_socket),
+                    self.connect_timeout,
+                )
+                self.host_info = "Localhost via UNIX socket"
+                self._secure = True
+            else:
+                kwargs = {}
+                if self.bind_address is not None:
+                    kwargs["local_addr"] = (self.bind_address, 0)
+                reader, writer = await _wait(
+                    asyncio.open_connection(self.host, self.port, **kwargs),
+                    self.connect_timeout,
+                )
+                self.host_info = "socket %s:%d" % (self.host, self.port)
+                sock = writer.get_extra_info("socket")
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+            self._reader = reader
+            self._writer = writer
+            # ``_sock`` is only kept as the "connection is open" marker used
+            # by the shared Connection code; all I/O goes through the streams.
+            self._sock = writer.get_extra_info("socket")
+            self._next_seq_id = 0
+            self._result = None
+
+            self._parse_server_information(await self._read_packet())
+            await self._request_authentication()
+
+            await self.set_character_set(self.charset, self.collation)
+
+            if self.sql_mode is not None:
+                await self.query("SET sql_mode=%s" % self.escape(self.sql_mode))
+
+            if self.init_command is not None:
+                async with AsyncCursor(self) as c:
+                    await c.execute(self.init_command)
+
+            if self.autocommit_mode is not None:
+                await self.autocommit(self.autocommit_mode)
+        except BaseException as e:
+            self._force_close()
+
+            if isinstance(e, (OSError, IOError)):
+                exc = err.OperationalError(
+                    CR.CR_CONN_HOST_ERROR,
+                    f"Can't connect to MySQL server on {self.host!r} ({e})",
+                )
+                # Keep original exception and traceback to investigate error.
+                exc.original_exception = e
+                raise exc from e
+            raise
+
+    async def write_packet(self, payload):
+        """Writes an entire "mysql packet" in its entirety to the network
+        adding its length and sequence number.
+        """
+        data = _pack_int24(len(payload)) + bytes([self._next_seq_id]) + payload
+        if DEBUG:
+            dump_packet(data)
+        await self._write_bytes(data)
+        self._next_seq_id = (self._next_seq_id + 1) % 256
+
+    async def _read_packet(self, packet_type=MysqlPacket):
+        """Read an entire "mysql packet" in its entirety from the network
+        and return a MysqlPacket type that represents the results.
+
+        :raise OperationalError: If the connection to the MySQL server is lost.
+        :raise InternalError: If the packet sequence number is wrong.
+        """
+        return packet_type(await self._read_packet_data(), self.encoding)
+
+    async def _read_packet_data(self):
+        """Read one "mysql packet" (joining 16MB splits) and return its payload.
+
+        Error packets are raised here.
+        """
+        data = None
+        while True:
+            packet_header = await self._read_bytes(4)
+            btrl, btrh, packet_number = struct.unpack("<HBB", packet_header)
+            bytes_to_read = btrl + (btrh << 16)
+            if packet_number != self._next_seq_id:
+                self._force_close()
+                if packet_number == 0:
+                    # MariaDB sends error packet with seqno==0 when shutdown
+                    raise err.OperationalError(
+                        CR.CR_SERVER_LOST,
+                        "Lost connection to MySQL server during query",
+                    )
+                raise err.InternalError(
+                    "Packet sequence number wrong - got %d expected %d"
+                    % (packet_number, self._next_seq_id)
+                )
+            self._next_seq_id = (self._next_seq_id + 1) % 256
+
+            recv_data = await self._read_bytes(bytes_to_read)
+            if DEBUG:
+                dump_packet(recv_data)
+            data = recv_data if data is None else data + recv_data
+            # https://dev.mysql.com/doc/internals/en/sending-more-than-16mbyte.html
+            if bytes_to_read < MAX_PACKET_LEN:
+                break
+
+        if data and data[0] == 0xFF:
+            if self._result is not None and self._result.unbuffered_active is True:
+                self._result.unbuffered_active = False
+            MysqlPacket(data, self.encoding).raise_for_error()
+        return data
+
+    async def _read_bytes(self, num_bytes):
+        reader = self._reader
+        if reader is None:
+            raise err.InterfaceError(0, "")
+        try:
+            if self._read_timeout is None:
+                return await reader.readexactly(num_bytes)
+            return await _wait(reader.readexactly(num_bytes), self._read_timeout)
+        except (asyncio.IncompleteReadError, OSError) as e:
+            self._force_close()
+            raise err.OperationalError(
+                CR.CR_SERVER_LOST,
+                f"Lost connection to MySQL server during query ({e!r})",
+            )
+        except BaseException:
+            # Cancelled while waiting for (part of) a reply: what is left on
+            # the stream belongs to this command, so the connection is unusable.
+            self._force_close()
+            raise
+
+    async def _write_bytes(self, data):
+        writer = self._writer
+        if writer is None:
+            raise err.InterfaceError(0, "")
+        try:
+            writer.write(data)
+            if self._write_timeout is None:
+                await writer.drain()
+            else:
+                await _wait(writer.drain(), self._write_timeout)
+        except OSError as e:
+            self._force_close()
+            raise err.OperationalError(
+                CR.CR_SERVER_GONE_ERROR, f"MySQL server has gone away ({e!r})"
+            )
+        except BaseException:
+            self._force_close()
+            raise
+
+    async def _read_query_result(self, unbuffered=False):
+        self._result = None
+        result = AsyncMySQLResult(self)
+        if unbuffered:
+            await result.init_unbuffered_query()
+        else:
+            await result.read()
+        self._result = result
+        if result.server_status is not None:
+            self.server_status = result.server_status
+        return result.affected_rows
+
+    async def _execute_command(self, command, sql):
+        """
+        :raise InterfaceError: If the connection is closed.
+        """
+        if not self._sock:
+            raise err.InterfaceError(0, "")
+
+        # If the last query was unbuffered, make sure it finishes before
+        # sending new commands
+        if self._result is not None:
+            if self._result.unbuffered_active:
+                warnings.warn("Previous unbuffered result was left incomplete")
+                await self._result._finish_unbuffered_query()
+            while self._result.has_next:
+                await self.next_result()
+            self._result = None
+
+        if isinstance(sql, str):
+            sql = sql.encode(self.encoding)
+
+        packet_size = min(MAX_PACKET_LEN, len(sql) + 1)  # +1 is for command
+
+        prelude = struct.pack("<iB", packet_size, command)
+        packet = prelude + sql[: packet_size - 1]
+        await self._write_bytes(packet)
+        if DEBUG:
+            dump_packet(packet)
+        self._next_seq_id = 1
+
+        if packet_size < MAX_PACKET_LEN:
+            return
+
+        sql = sql[packet_size - 1 :]
+        while True:
+            packet_size = min(MAX_PACKET_LEN, len(sql))
+            await self.write_packet(sql[:packet_size])
+            sql = sql[packet_size:]
+            if not sql and packet_size < MAX_PACKET_LEN:
+                break
+
+    async def _request_authentication(self):
+        data_init, data = self._handshake_response()
+
+        if self.ssl and self.server_capabilities & CLIENT.SSL:
+            await self.write_packet(data_init)
+            if not hasattr(self._writer, "start_tls"):  # Python < 3.11
+                raise err.NotSupportedError(
+                    "AsyncConnection needs Python 3.11+ for SSL connections"
+                )
+            await self._writer.start_tls(self.ctx, server_hostname=self.host)
+            self._secure = True
+
+        await self.write_packet(data)
+        auth_packet = await self._read_packet()
+
+        if auth_packet.is_auth_switch_request():
+            auth_packet.read_uint8()  # 0xfe packet identifier
+            plugin_name = auth_packet.read_string()
+            if (
+                self.server_capabilities & CLIENT.PLUGIN_AUTH
+                and plugin_name is not None
+            ):
+                auth_packet = await self._process_auth(plugin_name, auth_packet)
+            else:
+                raise err.OperationalError("received unknown auth switch request")
+        elif auth_packet.is_extra_auth_data():
+            if self._auth_plugin_name == "caching_sha2_password":
+                auth_packet = await self._caching_sha2_password_auth(auth_packet)
+            else:
+                raise err.OperationalError(
+                    "Received extra packet for auth method %r", self._auth_plugin_name
+                )
+
+    async def _auth_roundtrip(self, send_data):
+        await self.write_packet(send_data)
+        pkt = await self._read_packet()
+        pkt.check_error()
+        return pkt
+
+    async def _process_auth(self, plugin_name, auth_packet):
+        if plugin_name == b"caching_sha2_password":
+            return await self._caching_sha2_password_auth(auth_packet)
+        elif plugin_name == b"mysql_native_password":
+            data = _auth.scramble_native_password(self.password, auth_packet.read_all())
+        elif plugin_name == b"client_ed25519":
+            data = _auth.ed25519_password(self.password, auth_packet.read_all())
+        elif plugin_name == b"mysql_clear_password":
+            data = self.password + b"\0"
+        else:
+            raise err.OperationalError(
+                CR.CR_AUTH_PLUGIN_CANNOT_LOAD,
+                "Authentication plugin '%s' not supported by AsyncConnection"
+                % plugin_name,
+            )
+        return await self._auth_roundtrip(data)
+
+    async def _caching_sha2_password_auth(self, pkt):
+        # Same exchange as _auth.caching_sha2_password_auth.
+        if not self.password:
+            return await self._auth_roundtrip(b"")
+
+        if pkt.is_auth_switch_request():
+            self.salt = pkt.read_all()
+            if self.salt.endswith(b"\0"):
+                self.salt = self.salt[:-1]
+            scrambled = _auth.scramble_caching_sha2(self.password, self.salt)
+            pkt = await self._auth_roundtrip(scrambled)
+
+        if not pkt.is_extra_auth_data():
+            raise err.OperationalError(
+                "caching sha2: Unknown packet for fast auth: %s" % pkt._data[:1]
+            )
+
+        # 3 - fast auth succeeded, 4 - need full auth
+        pkt.advance(1)
+        n = pkt.read_uint8()
+
+        if n == 3:
+            pkt = await self._read_packet()
+            pkt.check_error()  # pkt must be OK packet
+            return pkt
+
+        if n != 4:
+            raise err.OperationalError(
+                "caching sha2: Unknown result for fast auth: %s" % n
+            )
+
+        if self._secure:
+            return await self._auth_roundtrip(self.password + b"\0")
+
+        if not self.server_public_key:
+            pkt = await self._auth_roundtrip(b"\x02")  # Request public key
+            if not pkt.is_extra_auth_data():
+                raise err.OperationalError(
+                    "caching sha2: Unknown packet for public key: %s" % pkt._data[:1]
+                )
+            self.server_public_key = pkt._data[1:]
+
+        data = _auth.sha2_rsa_encrypt(self.password, self.salt, self.server_public_key)
+        return await self._auth_roundtrip(data)
+
+
+class AsyncMySQLResult(MySQLResult):
+    """MySQLResult reading rows with ``await`` from an :class:`AsyncConnection`."""
+
+    def __del__(self):
+        # Can't drain the rest of the rows without awaiting.
+        if self.unbuffered_active and self.connection is not None:
+            self.connection._force_close()
+
+    async def read(self):
+        try:
+            first_packet = await self.connection._read_packet()
+
+            if first_packet.is_ok_packet():
+                self._read_ok_packet(first_packet)
+            elif first_packet.is_load_local_packet():
+                self._reject_load_local()
+            else:
+                self.field_count = first_packet.read_length_encoded_integer()
+                await self._get_descriptions()
+                await self._read_rowdata_packet()
+        finally:
+            self.connection = None
+
+    async def init_unbuffered_query(self):
+        first_packet = await self.connection._read_packet()
+
+        if first_packet.is_ok_packet():
+            self.connection = None
+            self._read_ok_packet(first_packet)
+        elif first_packet.is_load_local_packet():
+            try:
+                self._reject_load_local()
+            finally:
+                self.connection = None
+        else:
+            self.field_count = first_packet.read_length_encoded_integer()
+            await self._get_descriptions()
+            self.affected_rows = 18446744073709551615
+            self.unbuffered_active = True
+
+    def _reject_load_local(self):
+        # The server waits for file data this connection won't send.
+        self.connection._force_close()
+        raise err.NotSupportedError(
+            "AsyncConnection does not support LOAD DATA LOCAL INFILE"
+        )
+
+    async def _read_row(self):
+        """Read and decode the next row, or return None at EOF."""
+        data = await self.connection._read_packet_data()
+        if data[0] == 0xFE and len(data) < 9:
+            self._check_packet_is_eof(MysqlPacket(data, self.connection.encoding))
+            return None
+        return self._read_row_from_view(data)
+
+    async def _read_rowdata_packet_unbuffered(self):
+        # Check if in an active query
+        if not self.unbuffered_active:
+            return
+
+        row = await self._read_row()
+        if row is None:  # EOF
+            self.unbuffered_active = False
+            self.connection = None
+            self.rows = None
+            return
+
+        self.affected_rows = 1
+        self.rows = (row,)
+        return row
+
+    async def _finish_unbuffered_query(self):
+        # The server sends the whole result set regardless; read up to EOF.
+        while self.unbuffered_active:
+            try:
+                data = await self.connection._read_packet_data()
+            except err.OperationalError as e:
+                if e.args[0] in (
+                    ER.QUERY_TIMEOUT,
+                    ER.STATEMENT_TIMEOUT,
+                ):
+                    self.unbuffered_active = False
+                    self.connection = None
+                    return
+                raise
+
+            if data[0] == 0xFE and len(data) < 9:
+                self._check_packet_is_eof(MysqlPacket(data, self.connection.encoding))
+                self.unbuffered_active = False
+                self.connection = None
+
+    async def _read_rowdata_packet(self):
+        rows = []
+        read_row = self._read_row
+        while True:
+            row = await read_row()
+            if row is None:
+                break
+            rows.append(row)
+
+        self.affected_rows = len(rows)
+        self.rows = tuple(rows)
+
+    async def _get_descriptions(self):
+        conn = self.connection
+        fields = [
+            await conn._read_packet(FieldDescriptorPacket)
+            for _ in range(self.field_count)
+        ]
+        eof_packet = await conn._read_packet()
+        assert eof_packet.is_eof_packet(), "Protocol error, expecting EOF"
+        self._set_descriptions(fields)
+
+
+class AsyncCursor(Cursor):
+    """
+    Buffered cursor for :class:`AsyncConnection`.
+
+    ``execute``, ``executemany``, ``callproc``, ``nextset``, ``close`` and the
+    ``fetch*`` methods are coroutines. Supports ``async with`` and
+    ``async for``.
+    """
+
+    __iter__ = None
+
+    def __enter__(self):
+        raise TypeError("Use 'async with' with async cursors")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is not None and not issubclass(exc_type, Exception):
+            self._abandon()
+        else:
+            await self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        row = await self.fetchone()
+        if row is None:
+            raise StopAsyncIteration
+        return row
+
+    def _abandon(self):
+        """Drop the cursor without reading further; close a mid-result connection."""
+        conn = self.connection
+        self.connection = None
+        if conn is None:
+            return
+        result = self._result
+        if result is not None and result is conn._result:
+            if result.unbuffered_active or result.has_next:
+                conn._force_close()
+
+    async def close(self):
+        """
+        Closing a cursor just exhausts all remaining data.
+        """
+        conn = self.connection
+        if conn is None:
+            return
+        try:
+            while await self.nextset():
+                pass
+        finally:
+            self.connection = None
+
+    async def _nextset(self, unbuffered=False):
+        """Get the next query set."""
+        conn = self._get_db()
+        current_result = self._result
+        if current_result is None or current_result is not conn._result:
+            return None
+        if not current_result.has_next:
+            return None
+        self._result = None
+        self._clear_result()
+        await conn.next_result(unbuffered=unbuffered)
+        self._do_get_result()
+        return True
+
+    async def nextset(self):
+        return await self._nextset(False)
+
+    async def execute(self, query, args=None):
+        """Execute a query. See :meth:`Cursor.execute`."""
+        while await self.nextset():
+            pass
+        query = self.mogrify(query, args)
+        result = await self._query(query)
+        self._executed = query
+        return result
+
+    async def execute_batch(self, statements):
+        """Execute several statements with one round trip.
+        See :meth:`Cursor.execute_batch`."""
+        while await self.nextset():
+            pass
+        conn = self._get_db()
+        statements = list(statements)
+        commands = [self._batch_command(conn, q, args) for q, args in statements]
+        return self._batch_results(statements, await conn.execute_pipelined(commands))
+
+    async def executemany(self, query, args):
+        """Run several data against one query. See :meth:`Cursor.executemany`."""
+        if not args:
+            return
+        m = RE_INSERT_VALUES.match(query)
+        if m:
+            q_prefix = m.group(1) % ()
+            q_values = m.group(2).rstrip()
+            q_postfix = m.group(3) or ""
+            assert q_values[0] == "(" and q_values[-1] == ")"
+            return await self._do_execute_many(
+                q_prefix,
+                q_values,
+                q_postfix,
+                args,
+                self.max_stmt_length,
+                self._get_db().encoding,
+            )
+        m = RE_UPDATE_BY_KEY.match(query)
+        if m:
+            args = list(args)
+            statements = self._update_many_statements(m, args)
+            if statements is not None:
+                rows = 0
+                for sql in statements:
+                    rows += await self.execute(sql)
+                self.rowcount = rows
+                return rows
+        rows = 0
+        for arg in args:
+            rows += await self.execute(query, arg)
+        self.rowcount = rows
+        return rows
+
+    async def _do_execute_many(
+        self, prefix, values, postfix, args, max_stmt_length, encoding
+    ):
+        conn = self._get_db()
+        escape = self._escape_args
+        if isinstance(prefix, str):
+            prefix = prefix.encode(encoding)
+        if isinstance(postfix, str):
+            postfix = postfix.encode(encoding)
+        sql = bytearray(prefix)
+        args = iter(args)
+        v = values % escape(next(args), conn)
+        if isinstance(v, str):
+            v = v.encode(encoding, "surrogateescape")
+        sql += v
+        rows = 0
+        for arg in args:
+            v = values % escape(arg, conn)
+            if isinstance(v, str):
+                v = v.encode(encoding, "surrogateescape")
+            if len(sql) + len(v) + len(postfix) + 1 > max_stmt_length:
+                rows += await self.execute(sql + postfix)
+                sql = bytearray(prefix)
+            else:
+                sql += b","
+            sql += v
+        rows += await self.execute(sql + postfix)
+        self.rowcount = rows
+        return rows
+
+    async def callproc(self, procname, args=()):
+        """Execute stored procedure procname with args. See :meth:`Cursor.callproc`."""
+        conn = self._get_db()
+        if args:
+            fmt = f"@_{procname}_%d=%s"
+            await self._query(
+                "SET %s"
+                % ",".join(
+                    fmt % (index, conn.escape(arg)) for index, arg in enumerate(args)
+                )
+            )
+            await self.nextset()
+        q = "CALL {}({})".format(
+            procname,
+            ",".join(["@_%s_%d" % (procname, i) for i in range(len(args))]),
+        )
+        await self._query(q)
+        self._executed = q
+        return args
+
+    async def fetchone(self):
+        """Fetch the next row."""
+        return super().fetchone()
+
+    async def fetchmany(self, size=None):
+        """Fetch several rows."""
+        return super().fetchmany(size)
+
+    async def fetchall(self):
+        """Fetch all the rows."""
+        return super().fetchall()
+
+    async def _query(self, q):
+        conn = self._get_db()
+        self._clear_result()
+        await conn.query(q)
+        self._do_get_result()
+        return self.rowcount
+
+
+class AsyncDictCursor(DictCursorMixin, AsyncCursor):
+    """An async cursor which returns results as a dictionary"""
+
+
+class AsyncRecordCursor(RecordCursorMixin, AsyncCursor):
+    """An async cursor which returns results as namedtuple records"""
+
+
+class AsyncSSCursor(AsyncCursor):
+    """
+    Unbuffered async cursor: rows are read from the server as they are
+    fetched, so ``async for row in cursor`` streams a result set of any size.
+
+    Closing the cursor (or leaving ``async with`` normally) reads the rest of
+    the result set; leaving on a cancellation closes the connection instead.
+    """
+
+    def _conv_row(self, row):
+        return row
+
+    async def close(self):
+        conn = self.connection
+        if conn is None:
+            return
+
+        try:
+            if self._result is not None and self._result is conn._result:
+                await self._result._finish_unbuffered_query()
+            while await self.nextset():
+                pass
+        finally:
+            self.connection = None
+
+    async def _query(self, q):
+        conn = self._get_db()
+        self._clear_result()
+        await conn.query(q, unbuffered=True)
+        self._do_get_result()
+        return self.rowcount
+
+    async def nextset(self):
+        return await self._nextset(unbuffered=True)
+
+    async def read_next(self):
+        """Read next row."""
+        return self._conv_row(await self._result._read_rowdata_packet_unbuffered())
+
+    async def fetchone(self):
+        """Fetch next row."""
+        self._check_executed()
+        row = await self.read_next()
+        if row is None:
+            self.warning_count = self._result.warning_count
+            return None
+        self.rownumber += 1
+        return row
+
+    async def fetchall(self):
+        """Fetch all remaining rows into a list; use ``async for`` to stream."""
+        return [row async for row in self]
+
+    async def fetchmany(self, size=None):
+        """Fetch many."""
+        self._check_executed()
+        if size is None:
+            size = self.arraysize
+
+        rows = []
+        for i in range(size):
+            row = await self.read_next()
+            if row is None:
+                self.warning_count = self._result.warning_count
+                break
+            rows.append(row)
+            self.rownumber += 1
+        if not rows:
+            return ()
+        return rows
+
+    async def scroll(self, value, mode="relative"):
+        self._check_executed()
+
+        if mode == "relative":
+            if value < 0:
+                raise err.NotSupportedError(
+                    "Backwards scrolling not supported by this cursor"
+                )
+            for _ in range(value):
+                await self.read_next()
+            self.rownumber += value
+        elif mode == "absolute":
+            if value < self.rownumber:
+                raise err.NotSupportedError(
+                    "Backwards scrolling not supported by this cursor"
+                )
+            for _ in range(value - self.rownumber):
+                await self.read_next()
+            self.rownumber = value
+        else:
+            raise err.ProgrammingError("unknown scroll mode %s" % mode)
+
+
+class AsyncSSDictCursor(DictCursorMixin, AsyncSSCursor):
+    """An unbuffered async cursor, which returns results as a dictionary"""
+
+
+class AsyncSSRecordCursor(RecordCursorMixin, AsyncSSCursor):
+    """An unbuffered async cursor, which returns results as namedtuple records"""
+
+
+async def connect(*args, **kwargs):
+    """Create and connect an :class:`AsyncConnection`."""
+    conn = AsyncConnection(*args, **kwargs)
+    await conn.connect()
+    return conn
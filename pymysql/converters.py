@@ -150,6 +150,9 @@ DATETIME_RE = re.compile(
     r"(\d{1,4})-(\d{1,2})-(\d{1,2})[T ](\d{1,2}):(\d{1,2}):(\d{1,2})(?:.(\d{1,6}))?"
 )
 
+_datetime_fromisoformat = datetime.datetime.fromisoformat
+_date_fromisoformat = datetime.date.fromisoformat
+
 
 def convert_datetime(obj):
     """Returns a DATETIME or TIMESTAMP column value as a datetime object:
@@ -169,6 +172,22 @@ def convert_datetime(obj):
     if isinstance(obj, (bytes, bytearray)):
         obj = obj.decode("ascii")
 
+    # Fast path for the fixed layouts MySQL sends, "YYYY-MM-DD HH:MM:SS" and
+    # "YYYY-MM-DD HH:MM:SS.ffffff". fromisoformat() parses both in C; anything
+    # else (other fraction widths, illegal dates) goes through the regex.
+    n = len(obj)
+    if (
+        (n == 19 or n == 26)
+        and obj[4] == "-"
+        and obj[10] in " T"
+        and obj[13] == ":"
+        and obj[16] == ":"
+    ):
+        try:
+            return _datetime_fromisoformat(obj)
+        except ValueError:
+            pass
+
     m = DATETIME_RE.match(obj)
     if not m:
         return convert_date(obj)
@@ -204,6 +223,15 @@ def convert_timedelta(obj):
     if isinstance(obj, (bytes, bytearray)):
         obj = obj.decode("ascii")
 
+    # Fast path for non-negative "HH:MM:SS", the usual layout of TIME values.
+    if len(obj) == 8 and obj[2] == ":" and obj[5] == ":" and obj[0] != "-":
+        try:
+            return datetime.timedelta(
+                0, int(obj[:2]) * 3600 + int(obj[3:5]) * 60 + int(obj[6:])
+            )
+        except ValueError:
+            pass
+
     m = TIMEDELTA_RE.match(obj)
     if not m:
         return obj
@@ -289,6 +317,11 @@ def convert_date(obj):
     """
     if isinstance(obj, (bytes, bytearray)):
         obj = obj.decode("ascii")
+    if len(obj) == 10 and obj[4] == "-" and obj[7] == "-":
+        try:
+            return _date_fromisoformat(obj)
+        except ValueError:
+            pass
     try:
         return datetime.date(*[int(x) for x in obj.split("-", 2)])
     except ValueError:
@@ -358,6 +391,20 @@ decoders = {
 # for MySQLdb compatibility
 conversions = encoders.copy()
 conversions.update(decoders)
+
+#: Conversions that leave DATE, DATETIME, TIMESTAMP and TIME values as the
+#: strings MySQL sends ("YYYY-MM-DD HH:MM:SS[.ffffff]"), for callers that only
+#: re-serialize them. Pass as ``connect(conv=raw_temporal_conversions)``; the
+#: binary protocol (prepared statements) then formats them the same way.
+raw_temporal_conversions = conversions.copy()
+raw_temporal_conversions.update(
+    {
+        FIELD_TYPE.TIMESTAMP: through,
+        FIELD_TYPE.DATETIME: through,
+        FIELD_TYPE.TIME: through,
+        FIELD_TYPE.DATE: through,
+    }
+)
 Thing2Literal = escape_str
 
 # Run doctests with `pytest --doctest-modules pymysql/converters.py`
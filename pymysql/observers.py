@@ -0,0 +1,106 @@
+"""
+Connection instrumentation hooks.
+
+::
+
+    class Timing(ConnectionObserver):
+        def after_result(self, conn, sql, stats, error):
+            print(fingerprint(sql), stats.elapsed, stats.rows)
+
+    conn = pymysql.connect(..., observers=[Timing()])
+
+Observers are called synchronously on the thread using the connection, so they
+should be cheap and must not use the connection themselves. An exception raised
+by an observer doesn't reach the caller; it is reported with a RuntimeWarning
+and the remaining observers still run. A connection without observers skips
+all of this; only its byte and packet counters are kept up to date.
+"""
+
+import functools
+import re
+from collections import namedtuple
+
+#: Measurements for one result read by :meth:`Connection._read_query_result`.
+#:
+#: ``wait`` is the time blocked in the first ``recv`` of the result (server
+#: execution plus one round trip; 0 when the response was already buffered,
+#: e.g. in a pipelined batch), ``transfer`` the time blocked in the rest of
+#: them and ``decode`` the remainder of ``elapsed``, spent parsing packets and
+#: converting rows. Times are in seconds.
+ResultStats = namedtuple(
+    "ResultStats",
+    "bytes_received packets rows elapsed wait transfer decode",
+)
+
+
+class ConnectionObserver:
+    """
+    Base class for connection observers. Every hook is a no-op; override the
+    ones you need.
+
+    *sql* is the statement text as bytes: the query for COM_QUERY and
+    COM_STMT_PREPARE, the prepared SQL for COM_STMT_EXECUTE and None for other
+    commands. *error* is the exception that ended the operation, or None.
+    """
+
+    def before_connect(self, conn):
+        pass
+
+    def after_connect(self, conn, elapsed, error):
+        pass
+
+    def before_command(self, conn, command, sql):
+        pass
+
+    def after_command(self, conn, command, sql, bytes_sent, elapsed, error):
+        """Called once the command is written; *elapsed* doesn't include the reply."""
+
+    def before_result(self, conn, sql):
+        pass
+
+    def after_result(self, conn, sql, stats, error):
+        """
+        Called after a result is read, with a :data:`ResultStats`. For
+        unbuffered results only the header has been read at this point, so
+        ``rows`` is 0.
+        """
+
+
+_FINGERPRINT_RE = re.compile(
+    r"""
+      (?P<comment>/\*.*?\*/)
+    | (?P<ident>`[^`]*`)
+    | '(?:[^'\\]|\\.|'')*'
+    | "(?:[^"\\]|\\.|"")*"
+    | \b0x[0-9a-f]+\b
+    | (?<![\w.$])\d+(?:\.\d*)?(?:e[-+]?\d+)?
+    """,
+    re.VERBOSE | re.IGNORECASE | re.DOTALL,
+)
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROWS_RE = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+
+
+def _fingerprint_token(m):
+    if m.group("comment"):
+        return " "
+    if m.group("ident"):
+        return m.group("ident")
+    return "?"
+
+
+@functools.lru_cache(maxsize=512)
+def fingerprint(sql):
+    """
+    Normalize *sql* (str or bytes) so statements that differ only in literal
+    values compare equal: literals become ``?``, value lists and multi-row
+    VALUES collapse to ``(?+)``, comments are dropped and whitespace is
+    squeezed. Returns None for None.
+    """
+    if sql is None:
+        return None
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    sql = _FINGERPRINT_RE.sub(_fingerprint_token, sql).replace("_binary?", "?")
+    sql = _ROWS_RE.sub("(?+)", _LIST_RE.sub("(?+)", sql))
+    return " ".join(sql.split())
@@ -0,0 +1,333 @@
+"""
+Thread-safe connection pool.
+
+::
+
+    pool = ConnectionPool(min_size=1, max_size=10, host=..., user=..., password=...)
+
+    with pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT ...")
+
+Each connection is handed to one thread at a time (PyMySQL connections are
+not thread safe; ``threadsafety = 1``). Idle connections are reused most
+recently used first, so the ones beyond what the load needs age out through
+``idle_timeout``.
+"""
+
+import contextlib
+import threading
+import time
+from collections import deque
+
+from . import err
+from .connections import Connection
+from .constants import SERVER_STATUS
+
+
+class PoolTimeout(err.OperationalError):
+    """No connection became available within the acquire timeout."""
+
+
+class _Entry:
+    __slots__ = (
+        "conn",
+        "created_at",
+        "last_used",
+        "charset",
+        "collation",
+        "autocommit",
+    )
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = self.last_used = time.monotonic()
+        # Session state to restore when the connection is returned.
+        self.charset = conn.charset
+        self.collation = conn.collation
+        self.autocommit = conn.autocommit_mode
+
+
+class ConnectionPool:
+    """
+    A pool of :class:`~pymysql.connections.Connection` objects.
+
+    :param min_size: Connections opened up front and kept through idle pruning.
+        (default: 0)
+    :param max_size: Upper bound on open connections, in use or idle. (default: 10)
+    :param max_lifetime: Close connections older than this many seconds when
+        they are acquired or returned. None disables it. (default: 3600)
+    :param idle_timeout: Close connections idle longer than this many seconds
+        (down to *min_size*). None disables it. (default: 600)
+    :param ping_interval: Health check a connection with ``ping()`` before
+        handing it out if it has been idle this many seconds. 0 pings on every
+        acquire, None never. (default: 30)
+    :param connection_class: Connection class to instantiate. (default: Connection)
+    :param connect_kwargs: Passed to *connection_class*.
+
+    Returned connections are rolled back if a transaction is open and get the
+    autocommit mode, charset and collation they were created with back.
+    Connections that fail a health check, lose their socket or can't be reset
+    are closed and replaced; :meth:`stats` counts them as ``recycled_error``.
+    """
+
+    def __init__(
+        self,
+        min_size=0,
+        max_size=10,
+        *,
+        max_lifetime=3600,
+        idle_timeout=600,
+        ping_interval=30,
+        connection_class=Connection,
+        **connect_kwargs,
+    ):
+        if max_size < 1 or not 0 <= min_size <= max_size:
+            raise ValueError("need 0 <= min_size <= max_size and max_size >= 1")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self.connection_class = connection_class
+        self.connect_kwargs = connect_kwargs
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = deque()  # _Entry, most recently used on the right
+        self._in_use = {}  # id(conn) -> _Entry
+        self._size = 0  # idle + in use + being opened
+        self._closed = False
+
+        self._acquires = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled_lifetime = 0
+        self._recycled_idle = 0
+        self._recycled_error = 0
+
+        for _ in range(min_size):
+            with self._cond:
+                self._size += 1
+            entry = self._open()
+            with self._cond:
+                self._idle.append(entry)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _open(self):
+        """Open a connection for a slot already counted in ``_size``."""
+        try:
+            conn = self.connection_class(**self.connect_kwargs)
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created += 1
+        return _Entry(conn)
+
+    def _discard(self, entry, reason=None):
+        """Close *entry* and free its slot."""
+        with self._cond:
+            self._size -= 1
+            if reason == "lifetime":
+                self._recycled_lifetime += 1
+            elif reason == "idle":
+                self._recycled_idle += 1
+            elif reason == "error":
+                self._recycled_error += 1
+            self._cond.notify()
+        conn = entry.conn
+        try:
+            if conn.open and reason != "error":
+                conn.close()
+            else:
+                conn._force_close()
+        except Exception:
+            pass
+
+    def _expired(self, entry, now):
+        lifetime, idle_timeout = self.max_lifetime, self.idle_timeout
+        if lifetime is not None and now - entry.created_at >= lifetime:
+            return "lifetime"
+        if idle_timeout is not None and now - entry.last_used >= idle_timeout:
+            return "idle"
+        return None
+
+    def _prune_idle(self, now):
+        """Pop idle connections past their lifetime or idle timeout (lock held)."""
+        expired = []
+        keep = self.min_size
+        idle = self._idle
+        # Oldest-used on the left; stop at the first one still fresh.
+        while idle and self._size - len(expired) > keep:
+            reason = self._expired(idle[0], now)
+            if reason is None:
+                break
+            expired.append((idle.popleft(), reason))
+        return expired
+
+    def acquire(self, blocking=True, timeout=None):
+        """
+        Take a connection from the pool, opening one if below *max_size*.
+
+        :param blocking: If false, raise :class:`PoolTimeout` right away when
+            every connection is in use.
+        :param timeout: Seconds to wait for a connection when blocking.
+            None waits forever.
+        :raise PoolTimeout: If no connection became available in time.
+        :raise InterfaceError: If the pool is closed.
+        """
+        start = time.monotonic()
+        deadline = None
+        if not blocking:
+            deadline = start
+        elif timeout is not None:
+            deadline = start + timeout
+
+        while True:
+            entry = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise err.InterfaceError(0, "Pool is closed")
+                    expired = self._prune_idle(time.monotonic())
+                    if expired:
+                        break
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._timeouts += 1
+                            raise PoolTimeout(
+                                "No connection available in the pool "
+                                f"(max_size={self.max_size})"
+                            )
+                    self._cond.wait(remaining)
+
+            if expired:
+                for old, reason in expired:
+                    self._discard(old, reason)
+                continue
+
+            if entry is None:
+                entry = self._open()
+            else:
+                now = time.monotonic()
+                reason = self._expired(entry, now)
+                if reason is not None:
+                    self._discard(entry, reason)
+                    continue
+                if (
+                    self.ping_interval is not None
+                    and now - entry.last_used >= self.ping_interval
+                ):
+                    try:
+                        entry.conn.ping(reconnect=False)
+                    except err.Error:
+                        self._discard(entry, "error")
+                        continue
+
+            waited = time.monotonic() - start
+            with self._cond:
+                self._in_use[id(entry.conn)] = entry
+                self._acquires += 1
+                self._wait_total += waited
+                if waited > self._wait_max:
+                    self._wait_max = waited
+            return entry.conn
+
+    def release(self, conn):
+        """
+        Return *conn* to the pool.
+
+        Its session is reset first; a connection that was closed, can't be
+        reset or is past ``max_lifetime`` is closed instead of pooled.
+        """
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+        if entry is None:
+            raise ValueError("connection does not belong to this pool")
+
+        if not conn.open:
+            self._discard(entry, "error")
+            return
+        try:
+            self._reset(entry)
+        except err.Error:
+            self._discard(entry, "error")
+            return
+
+        now = time.monotonic()
+        if self._closed:
+            self._discard(entry)
+            return
+        if self._expired(entry, now) == "lifetime":
+            self._discard(entry, "lifetime")
+            return
+        entry.last_used = now
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def _reset(self, entry):
+        conn = entry.conn
+        if conn.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+            conn.rollback()
+        autocommit = entry.autocommit
+        if autocommit is not None and conn.get_autocommit() != autocommit:
+            conn.autocommit(autocommit)
+        if conn.charset != entry.charset or conn.collation != entry.collation:
+            conn.set_character_set(entry.charset, entry.collation)
+
+    @contextlib.contextmanager
+    def connection(self, blocking=True, timeout=None):
+        """Context manager that acquires a connection and releases it on exit."""
+        conn = self.acquire(blocking, timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Close idle connections; connections in use are closed when released."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._cond.notify_all()
+        for entry in idle:
+            self._discard(entry)
+
+    def stats(self):
+        """Return a snapshot of pool counters as a dict."""
+        with self._cond:
+            acquires = self._acquires
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "max_size": self.max_size,
+                "acquires": acquires,
+                "wait_total": self._wait_total,
+                "wait_avg": self._wait_total / acquires if acquires else 0.0,
+                "wait_max": self._wait_max,
+                "timeouts": self._timeouts,
+                "created": self._created,
+                "recycled_lifetime": self._recycled_lifetime,
+                "recycled_idle": self._recycled_idle,
+                "recycled_error": self._recycled_error,
+            }
+
@@ -72,6 +72,54 @@ CREATE TABLE nm_targets (
       ON UPDATE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
+-- 대상자 목록 키셋 페이지네이션용 인덱스
+-- GET /businesses/{id}/targets?limit=&cursor= 가 (created_at DESC, target_id DESC) 순서로
+-- 정렬/범위 조건을 인덱스만으로 처리하도록 합니다.
+CREATE INDEX ix_targets_group_list
+    ON nm_targets (group_id, is_deleted, created_at, target_id);
+
+-- 대상자 목록 ETag 버전 쿼리용 인덱스
+-- (행 수, MAX(updated_at), target_id/updated_at 체크섬)을 행을 읽지 않고 인덱스만으로 계산합니다.
+CREATE INDEX ix_targets_group_updated
+    ON nm_targets (group_id, is_deleted, updated_at);
+
+-- 사업별 활성 대상자 수 카운터
+-- GET /businesses 가 nm_targets 전체를 GROUP BY 집계하지 않고 이 컬럼을 바로 읽습니다.
+-- 대상자 등록/삭제/일괄 등록이 같은 트랜잭션에서 증감하고,
+-- 예약 작업 {"job": "reconcile_target_counts"} 가 어긋난 값을 바로잡습니다.
+ALTER TABLE nm_groups
+    ADD COLUMN target_count INT NOT NULL DEFAULT 0 AFTER description;
+
+-- 기존 데이터 채우기 (updated_at = updated_at: 카운터 변경으로 수정일이 바뀌지 않도록)
+UPDATE nm_groups g
+LEFT JOIN (
+    SELECT group_id, COUNT(*) AS cnt
+    FROM nm_targets
+    WHERE is_deleted = 0
+    GROUP BY group_id
+) t ON t.group_id = g.group_id
+SET g.target_count = COALESCE(t.cnt, 0), g.updated_at = g.updated_at;
+
+-- 대상자 검색 인덱스 (GET /businesses/{id}/targets/search)
+-- 이름: ngram FULLTEXT 인덱스. 한글 이름을 2글자(ngram_token_size, 기본 2) 단위로 색인하고
+--       InnoDB가 INSERT/UPDATE/DELETE 때 함께 갱신합니다.
+--       기본 불용어(영문 단어)가 들어간 토큰은 색인에서 빠지므로 인덱스 생성 세션에서 끕니다.
+-- 전화번호: 숫자만 남긴 생성 컬럼과 뒤집은 생성 컬럼에 (group_id, ...) 인덱스를 두어
+--       앞자리(prefix) / 뒷자리(suffix) 검색을 인덱스 범위 조회로 처리합니다.
+ALTER TABLE nm_targets
+    ADD COLUMN mobile_digits     VARCHAR(20) AS (REGEXP_REPLACE(mobile_phone, '[^0-9]', '')) STORED,
+    ADD COLUMN mobile_digits_rev VARCHAR(20) AS (REVERSE(mobile_digits)) STORED,
+    ADD COLUMN office_digits     VARCHAR(20) AS (REGEXP_REPLACE(office_phone, '[^0-9]', '')) STORED,
+    ADD COLUMN office_digits_rev VARCHAR(20) AS (REVERSE(office_digits)) STORED,
+    ADD INDEX ix_targets_mobile_digits     (group_id, mobile_digits),
+    ADD INDEX ix_targets_mobile_digits_rev (group_id, mobile_digits_rev),
+    ADD INDEX ix_targets_office_digits     (group_id, office_digits),
+    ADD INDEX ix_targets_office_digits_rev (group_id, office_digits_rev);
+
+SET SESSION innodb_ft_enable_stopword = OFF;
+ALTER TABLE nm_targets
+    ADD FULLTEXT INDEX ftx_targets_name (target_name) WITH PARSER ngram;
+
 
 
 nnm_0x4c5bde
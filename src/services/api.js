@@ -152,9 +152,10 @@ export const businessAPI = {
 // 대상자 관련 API
 export const targetAPI = {
   // 대상자 목록 조회
-  getTargets: async (businessId) => {
+  // params: { limit, cursor, fields } (생략 시 전체 목록)
+  getTargets: async (businessId, params) => {
     try {
-      const response = await api.get(`/businesses/${businessId}/targets`);
+      const response = await api.get(`/businesses/${businessId}/targets`, { params });
       return response.data;
     } catch (error) {
       throw new Error(error.response?.data?.message || '대상자 목록을 불러오는데 실패했습니다.');
@@ -181,6 +182,21 @@ export const targetAPI = {
     }
   },
 
+  // 대상자 일괄 등록
+  // targets: 대상자 배열(JSON) 또는 CSV/XLSX 파일(File)
+  bulkCreateTargets: async (businessId, targets) => {
+    try {
+      const isFile = typeof Blob !== 'undefined' && targets instanceof Blob;
+      const response = await api.post(`/businesses/${businessId}/targets:bulk`, targets, {
+        headers: isFile ? { 'Content-Type': targets.type || 'text/csv' } : undefined,
+        timeout: 60000,
+      });
+      return response.data;
+    } catch (error) {
+      throw new Error(error.response?.data?.message || '대상자 일괄 등록에 실패했습니다.');
+    }
+  },
+
   // 대상자 수정
   updateTarget: async (businessId, targetId, targetData) => {
     try {
@@ -201,6 +217,19 @@ export const targetAPI = {
     }
   },
 
+  // 대상자 엑셀 내보내기 (서버에서 생성한 xlsx를 Blob으로 반환)
+  exportTargets: async (businessId) => {
+    try {
+      const response = await api.get(`/businesses/${businessId}/targets/export.xlsx`, {
+        responseType: 'blob',
+        timeout: 60000,
+      });
+      return response.data;
+    } catch (error) {
+      throw new Error('엑셀 파일을 내려받는데 실패했습니다.');
+    }
+  },
+
   // 대상자 검색
   searchTargets: async (businessId, searchTerm) => {
     try {
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# The vendored packages and lambda_function live at the repository root.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# lambda_function refuses to import without its database settings; the tests
+# route get_conn to fake_mysql servers instead.
+for name in ("DB_HOST", "DB_USER", "DB_PASSWORD", "DB_NAME"):
+    os.environ.setdefault(name, "test")
@@ -0,0 +1,405 @@
+"""
+A scripted stand-in for a MySQL server, connected to a pymysql Connection over
+a socketpair (no handshake, no MySQL needed).
+
+    def handler(server, sql):
+        if sql.startswith("SELECT"):
+            server.result([("id", FIELD_TYPE.LONGLONG)], [(1,)])
+        else:
+            server.ok(1)
+
+    conn, server = connect(handler)
+
+:func:`connect_async` does the same for an :class:`~pymysql.aio.AsyncConnection`.
+The handler runs on the server thread once per COM_QUERY or COM_STMT_EXECUTE
+and answers with :meth:`FakeServer.ok`, :meth:`~FakeServer.error` or
+:meth:`~FakeServer.result`. For COM_STMT_EXECUTE the parameters are
+substituted into the prepared SQL as literals, and :meth:`~FakeServer.result`
+sends binary protocol rows. Statements MySQL can't prepare (BEGIN, COMMIT, ...)
+fail COM_STMT_PREPARE with ER_UNSUPPORTED_PS, as on a real server.
+"""
+
+import asyncio
+import datetime
+import re
+import socket
+import struct
+import threading
+import zlib
+from decimal import Decimal
+
+from pymysql import aio, connections
+from pymysql.constants import COMMAND, ER, FIELD_TYPE, FLAG
+from pymysql.converters import escape_string
+
+MAX_PACKET_LEN = 2**24 - 1
+CHARSET_UTF8MB4 = 45
+CHARSET_BINARY = 63
+
+_UNPREPARABLE = re.compile(
+    r"\s*(?:BEGIN|COMMIT|ROLLBACK|START\s+TRANSACTION|LOAD\s+DATA)\b", re.IGNORECASE
+)
+
+
+def lenenc(n):
+    if n < 251:
+        return bytes([n])
+    if n < 1 << 16:
+        return b"\xfc" + struct.pack("<H", n)
+    if n < 1 << 24:
+        return b"\xfd" + struct.pack("<I", n)[:3]
+    return b"\xfe" + struct.pack("<Q", n)
+
+
+def lenenc_str(b):
+    if isinstance(b, str):
+        b = b.encode("utf-8")
+    return lenenc(len(b)) + b
+
+
+def column(name, type_code, flags=0, charset=CHARSET_UTF8MB4, decimals=0):
+    """A column definition for :meth:`FakeServer.result`."""
+    return (name, type_code, flags, charset, decimals)
+
+
+def ok_handler(server, sql):
+    """Answer OK; affected rows = number of rows in a multi-row VALUES list."""
+    server.ok(sql.count("),(") + 1 if server.command == COMMAND.COM_QUERY else 0)
+
+
+class FakeServer:
+    """Serves one connection; :attr:`commands` records ``(command, payload)``."""
+
+    def __init__(self, sock, handler=None, compress=False):
+        self.sock = sock
+        self.handler = handler or ok_handler
+        self.compress = compress
+        self.commands = []
+        self.queries = []
+        self.statements = {}
+        #: ``{sql: (error code, message)}`` for COM_STMT_PREPARE to fail with
+        self.prepare_errors = {}
+        self.command = None
+        self.seq = 0
+        self._compressed_seq = 0
+        self._inflated = b""
+        self.exception = None
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    # framing
+
+    def _recv_exact(self, n):
+        data = bytearray()
+        while len(data) < n:
+            chunk = self.sock.recv(n - len(data))
+            if not chunk:
+                raise EOFError
+            data += chunk
+        return bytes(data)
+
+    def _read(self, n):
+        if not self.compress:
+            return self._recv_exact(n)
+        while len(self._inflated) < n:
+            header = self._recv_exact(7)
+            length = header[0] | header[1] << 8 | header[2] << 16
+            assert header[3] == self._compressed_seq, "compressed sequence id"
+            self._compressed_seq = (header[3] + 1) % 256
+            inflated_length = header[4] | header[5] << 8 | header[6] << 16
+            data = self._recv_exact(length)
+            if inflated_length:
+                data = zlib.decompress(data)
+                assert len(data) == inflated_length
+            self._inflated += data
+        data, self._inflated = self._inflated[:n], self._inflated[n:]
+        return data
+
+    def _read_packet(self):
+        payload = b""
+        while True:
+            header = self._read(4)
+            length = header[0] | header[1] << 8 | header[2] << 16
+            assert header[3] == self.seq, "sequence id"
+            self.seq = (self.seq + 1) % 256
+            payload += self._read(length)
+            if length < MAX_PACKET_LEN:
+                return payload
+
+    def send(self, payload):
+        """Send one packet, split at 16MB, in its own compressed frame(s)."""
+        data = b""
+        while True:
+            part, payload = payload[:MAX_PACKET_LEN], payload[MAX_PACKET_LEN:]
+            data += struct.pack("<I", len(part))[:3] + bytes([self.seq]) + part
+            self.seq = (self.seq + 1) % 256
+            if len(part) < MAX_PACKET_LEN:
+                break
+        if self.compress:
+            frames = b""
+            for start in range(0, len(data), MAX_PACKET_LEN):
+                chunk = data[start : start + MAX_PACKET_LEN]
+                packed = zlib.compress(chunk) if len(chunk) >= 50 else None
+                frames += struct.pack("<I", len(packed or chunk))[:3]
+                frames += bytes([self._compressed_seq])
+                frames += struct.pack("<I", len(chunk) if packed else 0)[:3]
+                frames += packed or chunk
+                self._compressed_seq = (self._compressed_seq + 1) % 256
+            data = frames
+        self.sock.sendall(data)
+
+    def close(self):
+        """Drop the connection, as a server restart or network failure would."""
+        self.sock.shutdown(socket.SHUT_RDWR)
+        self.sock.close()
+
+    # replies
+
+    def ok(self, affected_rows=0, insert_id=0, status=2):
+        self.send(
+            b"\x00"
+            + lenenc(affected_rows)
+            + lenenc(insert_id)
+            + struct.pack("<HH", status, 0)
+        )
+
+    def eof(self, status=2):
+        self.send(b"\xfe" + struct.pack("<HH", 0, status))
+
+    def error(self, code, message):
+        self.send(b"\xff" + struct.pack("<H", code) + b"#HY000" + message.encode())
+
+    def result(self, columns, rows, status=2):
+        """Send a result set; *columns* are ``(name, type)`` or :func:`column`."""
+        columns = [c if len(c) == 5 else column(*c) for c in columns]
+        binary = self.command == COMMAND.COM_STMT_EXECUTE
+        self.send(lenenc(len(columns)))
+        for name, type_code, flags, charset, decimals in columns:
+            self.send(
+                lenenc_str("def")
+                + lenenc_str("db")
+                + lenenc_str("t")
+                + lenenc_str("t")
+                + lenenc_str(name)
+                + lenenc_str(name)
+                + b"\x0c"
+                + struct.pack("<HIBHBxx", charset, 255, type_code, flags, decimals)
+            )
+        self.eof()
+        for row in rows:
+            if binary:
+                self.send(_binary_row(columns, row))
+            else:
+                self.send(b"".join(_text_value(value) for value in row))
+        self.eof(status)
+
+    # commands
+
+    def _serve(self):
+        try:
+            while True:
+                self.seq = 0
+                self._compressed_seq = 0
+                payload = self._read_packet()
+                self.commands.append((payload[0], payload[1:]))
+                self.command = payload[0]
+                if not self._dispatch(payload[0], payload[1:]):
+                    return
+        except (EOFError, OSError):
+            return
+        except BaseException as e:
+            # e.g. a failed protocol assertion: let the client see a lost connection
+            self.exception = e
+            self.sock.close()
+
+    def _dispatch(self, command, body):
+        if command == COMMAND.COM_QUIT:
+            return False
+        if command == COMMAND.COM_QUERY:
+            self._handle(body.decode("utf-8"))
+        elif command == COMMAND.COM_STMT_PREPARE:
+            self._prepare(body.decode("utf-8"))
+        elif command == COMMAND.COM_STMT_EXECUTE:
+            sql, count = self.statements[struct.unpack_from("<I", body)[0]]
+            parts = sql.split("?")
+            values = _execute_params(body, count) + [""]
+            self._handle("".join(a + b for a, b in zip(parts, values)))
+        elif command == COMMAND.COM_STMT_CLOSE:
+            pass
+        else:
+            self.ok()
+        return True
+
+    def _handle(self, sql):
+        self.queries.append(sql)
+        self.handler(self, sql)
+
+    def _prepare(self, sql):
+        if sql in self.prepare_errors:
+            self.error(*self.prepare_errors[sql])
+            return
+        if _UNPREPARABLE.match(sql):
+            self.error(
+                ER.UNSUPPORTED_PS,
+                "This command is not supported in the prepared statement protocol yet",
+            )
+            return
+        statement_id = len(self.statements) + 1
+        count = sql.count("?")
+        self.statements[statement_id] = (sql, count)
+        self.send(b"\x00" + struct.pack("<IHHxH", statement_id, 0, count, 0))
+        if count:
+            for _ in range(count):
+                self.send(
+                    lenenc_str("def")
+                    + lenenc_str("") * 3
+                    + lenenc_str("?")
+                    + lenenc_str("")
+                    + b"\x0c"
+                    + struct.pack("<HIBHBxx", CHARSET_BINARY, 0, 253, 0, 0)
+                )
+            self.eof()
+
+
+def connect(handler=None, compress=False, **kwargs):
+    """Return ``(conn, server)``: a Connection talking to a :class:`FakeServer`."""
+    kwargs.setdefault("read_timeout", 10)
+    conn = connections.Connection(defer_connect=True, user="test", **kwargs)
+    conn.server_status = 2  # SERVER_STATUS_AUTOCOMMIT
+    client, server_sock = socket.socketpair()
+    conn._sock = client
+    conn._reset_recv_buffer()
+    conn._closed = False
+    if compress:
+        conn._compress = True
+        conn._next_compressed_seq_id = 0
+        conn._decompressed = b""
+        conn._decompressed_pos = 0
+    return conn, FakeServer(server_sock, handler, compress)
+
+
+async def connect_async(handler=None, **kwargs):
+    """Return ``(conn, server)``: an AsyncConnection to a :class:`FakeServer`."""
+    kwargs.setdefault("read_timeout", 10)
+    conn = aio.AsyncConnection(user="test", **kwargs)
+    conn.server_status = 2  # SERVER_STATUS_AUTOCOMMIT
+    client, server_sock = socket.socketpair()
+    conn._reader, conn._writer = await asyncio.open_connection(sock=client)
+    conn._sock = client
+    conn._closed = False
+    return conn, FakeServer(server_sock, handler)
+
+
+def _text_value(value):
+    if value is None:
+        return b"\xfb"
+    if isinstance(value, (bytes, bytearray)):
+        return lenenc_str(bytes(value))
+    if isinstance(value, datetime.timedelta):
+        sign = "-" if value < datetime.timedelta(0) else ""
+        value = abs(value)
+        minutes, seconds = divmod(value.seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        text = f"{sign}{value.days * 24 + hours:02d}:{minutes:02d}:{seconds:02d}"
+        if value.microseconds:
+            text += f".{value.microseconds:06d}"
+        return lenenc_str(text)
+    return lenenc_str(str(value))
+
+
+_INT_FORMATS = {
+    FIELD_TYPE.TINY: "b",
+    FIELD_TYPE.SHORT: "h",
+    FIELD_TYPE.YEAR: "h",
+    FIELD_TYPE.INT24: "i",
+    FIELD_TYPE.LONG: "i",
+    FIELD_TYPE.LONGLONG: "q",
+}
+
+
+def _binary_value(type_code, flags, value):
+    fmt = _INT_FORMATS.get(type_code)
+    if fmt is not None:
+        if flags & FLAG.UNSIGNED:
+            fmt = fmt.upper()
+        return struct.pack("<" + fmt, value)
+    if type_code == FIELD_TYPE.FLOAT:
+        return struct.pack("<f", value)
+    if type_code == FIELD_TYPE.DOUBLE:
+        return struct.pack("<d", value)
+    if type_code == FIELD_TYPE.DATE:
+        return struct.pack("<BHBB", 4, value.year, value.month, value.day)
+    if type_code in (FIELD_TYPE.DATETIME, FIELD_TYPE.TIMESTAMP):
+        fields = (value.year, value.month, value.day)
+        fields += (value.hour, value.minute, value.second)
+        if value.microsecond:
+            return struct.pack("<BHBBBBBI", 11, *fields, value.microsecond)
+        return struct.pack("<BHBBBBB", 7, *fields)
+    if type_code == FIELD_TYPE.TIME:
+        negative = value < datetime.timedelta(0)
+        value = abs(value)
+        hours, rest = divmod(value.seconds, 3600)
+        minutes, seconds = divmod(rest, 60)
+        fields = (negative, value.days, hours, minutes, seconds)
+        if value.microseconds:
+            return struct.pack("<BBIBBBI", 12, *fields, value.microseconds)
+        return struct.pack("<BBIBBB", 8, *fields)
+    return _text_value(value)
+
+
+def _binary_row(columns, row):
+    null_bitmap = bytearray((len(columns) + 9) // 8)
+    values = []
+    for i, ((_, type_code, flags, _, _), value) in enumerate(zip(columns, row)):
+        if value is None:
+            null_bitmap[(i + 2) >> 3] |= 1 << ((i + 2) & 7)
+        else:
+            values.append(_binary_value(type_code, flags, value))
+    return b"\x00" + bytes(null_bitmap) + b"".join(values)
+
+
+def _literal(value):
+    if value is None:
+        return "NULL"
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    if isinstance(value, bytes):
+        value = value.decode("utf-8", "replace")
+    return "'" + escape_string(str(value)) + "'"
+
+
+def _execute_params(body, count):
+    """Decode the COM_STMT_EXECUTE parameters pymysql sends."""
+    if not count:
+        return []
+    pos = 9
+    null_bitmap = body[pos : pos + (count + 7) // 8]
+    pos += (count + 7) // 8 + 1  # new_params_bound_flag
+    types = body[pos : pos + 2 * count]
+    pos += 2 * count
+    values = []
+    for i in range(count):
+        type_code, flags = types[2 * i], types[2 * i + 1]
+        if null_bitmap[i >> 3] & (1 << (i & 7)):
+            values.append(_literal(None))
+            continue
+        if type_code == FIELD_TYPE.LONGLONG:
+            (value,) = struct.unpack_from("<Q" if flags & 0x80 else "<q", body, pos)
+            pos += 8
+        elif type_code == FIELD_TYPE.DOUBLE:
+            (value,) = struct.unpack_from("<d", body, pos)
+            pos += 8
+        elif type_code in (FIELD_TYPE.DATE, FIELD_TYPE.DATETIME, FIELD_TYPE.TIME):
+            decode = {
+                FIELD_TYPE.DATE: connections._decode_binary_date,
+                FIELD_TYPE.DATETIME: connections._decode_binary_datetime,
+                FIELD_TYPE.TIME: connections._decode_binary_time,
+            }[type_code]
+            value, pos = decode(body, pos)
+        else:
+            raw, pos = connections._read_lenenc_bytes(body, pos)
+            value = bytes(raw).decode("utf-8", "replace")
+            if type_code == FIELD_TYPE.NEWDECIMAL:
+                value = Decimal(value)
+        values.append(_literal(value))
+    return values
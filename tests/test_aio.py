@@ -0,0 +1,186 @@
+"""AsyncConnection cancellation tests against the fake_mysql server."""
+
+import asyncio
+import threading
+
+import pytest
+
+from pymysql import err
+from pymysql.aio import AsyncSSCursor
+from pymysql.constants import COMMAND, FIELD_TYPE
+
+from fake_mysql import connect_async
+
+ROWS = [(i,) for i in range(10)]
+
+
+def rows(server, sql):
+    server.result([("n", FIELD_TYPE.LONGLONG)], ROWS)
+
+
+class Stall:
+    """A handler that stops after sending *packets* packets until released."""
+
+    def __init__(self, packets):
+        self.packets = packets
+        self.stalled = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, server, sql):
+        if sql != "SELECT slow":
+            return rows(server, sql)
+        send = server.send
+        sent = 0
+
+        def send_then_stall(payload):
+            nonlocal sent
+            if sent == self.packets:
+                self.stalled.set()
+                self.release.wait(5)
+            sent += 1
+            send(payload)
+
+        server.send = send_then_stall
+        try:
+            rows(server, sql)
+        finally:
+            server.send = send
+
+    async def wait(self):
+        assert await asyncio.to_thread(self.stalled.wait, 5)
+
+
+async def fetch(conn, sql, cursor=None):
+    async with conn.cursor(cursor) as cur:
+        await cur.execute(sql)
+        return await cur.fetchall()
+
+
+# 0: before any reply; 5: after the column definitions and two rows
+@pytest.mark.parametrize("packets", [0, 5], ids=["before reply", "mid result"])
+def test_cancelled_query_closes_the_connection(packets):
+    async def main():
+        stall = Stall(packets)
+        conn, server = await connect_async(stall)
+        assert await fetch(conn, "SELECT 1") == tuple(ROWS)
+
+        task = asyncio.create_task(fetch(conn, "SELECT slow"))
+        await stall.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        stall.release.set()
+
+        assert not conn.open
+        with pytest.raises(err.InterfaceError):
+            await fetch(conn, "SELECT 1")
+
+    asyncio.run(main())
+
+
+def test_query_timeout_closes_the_connection():
+    async def main():
+        stall = Stall(0)
+        conn, _ = await connect_async(stall)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(fetch(conn, "SELECT slow"), 0.1)
+        stall.release.set()
+
+        assert not conn.open
+
+    asyncio.run(main())
+
+
+def test_cancelled_unbuffered_cursor_body_closes_the_connection():
+    async def main():
+        conn, _ = await connect_async(rows)
+        fetched = asyncio.Event()
+
+        async def stream():
+            async with conn.cursor(AsyncSSCursor) as cur:
+                await cur.execute("SELECT n")
+                assert await cur.fetchone() == (0,)
+                fetched.set()
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(stream())
+        await fetched.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert not conn.open
+
+    asyncio.run(main())
+
+
+def test_unbuffered_cursor_left_normally_keeps_the_connection():
+    async def main():
+        conn, server = await connect_async(rows)
+
+        async with conn.cursor(AsyncSSCursor) as cur:
+            await cur.execute("SELECT n")
+            assert await cur.fetchone() == (0,)
+
+        assert conn.open
+        assert await fetch(conn, "SELECT 1") == tuple(ROWS)
+        assert len(server.queries) == 2
+
+    asyncio.run(main())
+
+
+def test_cancel_while_idle_keeps_the_connection():
+    async def main():
+        conn, _ = await connect_async(rows)
+
+        async def idle():
+            assert await fetch(conn, "SELECT 1") == tuple(ROWS)
+            await asyncio.sleep(10)
+
+        task = asyncio.create_task(idle())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert conn.open
+        assert await fetch(conn, "SELECT 2") == tuple(ROWS)
+
+    asyncio.run(main())
+
+
+def test_cancelled_connection_block_skips_quit():
+    async def main():
+        stall = Stall(0)
+        conn, server = await connect_async(stall)
+
+        async def use():
+            async with conn:
+                await fetch(conn, "SELECT slow")
+
+        task = asyncio.create_task(use())
+        await stall.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        stall.release.set()
+        await asyncio.to_thread(server.thread.join, 5)
+
+        assert not conn.open
+        assert COMMAND.COM_QUIT not in [command for command, _ in server.commands]
+
+    asyncio.run(main())
+
+
+def test_connection_block_left_normally_sends_quit():
+    async def main():
+        conn, server = await connect_async(rows)
+
+        async with conn:
+            await fetch(conn, "SELECT 1")
+        await asyncio.to_thread(server.thread.join, 5)
+
+        assert server.commands[-1] == (COMMAND.COM_QUIT, b"")
+
+    asyncio.run(main())
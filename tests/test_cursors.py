@@ -0,0 +1,216 @@
+"""Cursor tests against the fake_mysql server (no MySQL needed)."""
+
+import datetime
+import json
+from decimal import Decimal
+
+import pytest
+
+from pymysql import converters, cursors, err
+from pymysql.constants import COMMAND, ER, FIELD_TYPE, FLAG
+
+from fake_mysql import CHARSET_BINARY, column, connect
+
+
+def test_prepared_cursor_executemany_insert_uses_text_protocol():
+    conn, server = connect()
+    cur = conn.cursor(cursors.PreparedCursor)
+    cur.max_stmt_length = 50
+
+    rows = cur.executemany(
+        "INSERT INTO t (a, b) VALUES (%s, %s)", [(1, "x"), (2, "y"), (3, "z")]
+    )
+
+    assert rows == 3
+    assert [command for command, _ in server.commands] == [COMMAND.COM_QUERY] * 2
+    assert server.commands[0][1] == b"INSERT INTO t (a, b) VALUES (1, 'x'),(2, 'y')"
+    assert server.commands[1][1] == b"INSERT INTO t (a, b) VALUES (3, 'z')"
+    assert not conn._prepared_statements
+
+
+BINARY_COLUMNS = [
+    ("tiny", FIELD_TYPE.TINY, 0, -5),
+    ("tiny_unsigned", FIELD_TYPE.TINY, FLAG.UNSIGNED, 250),
+    ("short", FIELD_TYPE.SHORT, 0, -30_000),
+    ("int24", FIELD_TYPE.INT24, 0, -8_000_000),
+    ("long", FIELD_TYPE.LONG, 0, -2_000_000_000),
+    ("long_unsigned", FIELD_TYPE.LONG, FLAG.UNSIGNED, 4_000_000_000),
+    ("longlong", FIELD_TYPE.LONGLONG, 0, -(2**62)),
+    ("longlong_unsigned", FIELD_TYPE.LONGLONG, FLAG.UNSIGNED, 2**64 - 1),
+    ("year", FIELD_TYPE.YEAR, FLAG.UNSIGNED, 2024),
+    ("float", FIELD_TYPE.FLOAT, 0, 1.1),
+    ("double", FIELD_TYPE.DOUBLE, 0, 2.5e-300),
+    ("decimal", FIELD_TYPE.NEWDECIMAL, 0, Decimal("12.50")),
+    ("date", FIELD_TYPE.DATE, 0, datetime.date(2024, 2, 29)),
+    ("datetime", FIELD_TYPE.DATETIME, 0, datetime.datetime(2024, 1, 2, 3, 4, 5)),
+    (
+        "datetime_fraction",
+        FIELD_TYPE.DATETIME,
+        0,
+        datetime.datetime(2024, 1, 2, 3, 4, 5, 123456),
+    ),
+    ("timestamp", FIELD_TYPE.TIMESTAMP, 0, datetime.datetime(1999, 12, 31, 23, 59)),
+    ("time", FIELD_TYPE.TIME, 0, datetime.timedelta(hours=-838, seconds=-1)),
+    ("time_fraction", FIELD_TYPE.TIME, 0, datetime.timedelta(days=1, microseconds=5)),
+    ("varchar", FIELD_TYPE.VAR_STRING, 0, "한글 text"),
+    ("blob", FIELD_TYPE.BLOB, FLAG.BINARY, b"\x00\xff\x80"),
+    ("null", FIELD_TYPE.VAR_STRING, 0, None),
+]
+
+
+def binary_row(server, sql):
+    columns = [
+        column(name, type_code, flags, CHARSET_BINARY if flags & FLAG.BINARY else 45)
+        for name, type_code, flags, _ in BINARY_COLUMNS
+    ]
+    server.result(columns, [tuple(value for *_, value in BINARY_COLUMNS)])
+
+
+def test_prepared_cursor_decodes_each_binary_column_type():
+    conn, server = connect(binary_row)
+    cur = conn.cursor(cursors.PreparedCursor)
+
+    cur.execute("SELECT * FROM t WHERE id = %s", (1,))
+
+    assert server.commands[-1][0] == COMMAND.COM_STMT_EXECUTE
+    row = cur.fetchone()
+    for (name, _, _, value), decoded in zip(BINARY_COLUMNS, row):
+        assert (name, decoded) == (name, value)
+        assert type(decoded) is type(value)
+
+
+def test_prepared_cursor_matches_the_text_protocol():
+    conn, _ = connect(binary_row)
+
+    with conn.cursor(cursors.PreparedCursor) as cur:
+        cur.execute("SELECT * FROM t WHERE id = %s", (1,))
+        binary = cur.fetchone()
+    with conn.cursor() as cur:
+        cur.execute("SELECT * FROM t WHERE id = %s", (1,))
+        text = cur.fetchone()
+
+    assert binary == text
+
+
+def binary_values(server, sql):
+    columns = [
+        column("id", FIELD_TYPE.LONG),
+        column("digest", FIELD_TYPE.VAR_STRING, FLAG.BINARY, CHARSET_BINARY),
+        column("data", FIELD_TYPE.BLOB, FLAG.BINARY, CHARSET_BINARY),
+        column("flags", FIELD_TYPE.BIT, FLAG.UNSIGNED, CHARSET_BINARY),
+        column("shape", FIELD_TYPE.GEOMETRY, FLAG.BINARY, CHARSET_BINARY),
+    ]
+    row = (1, b"\xde\xad\xbe\xef", b"", b"\x05", b"\x00\x01")
+    server.result(columns, [row, (2, None, None, None, None)])
+
+
+@pytest.mark.parametrize("cursor", [cursors.JSONCursor, cursors.PreparedJSONCursor])
+def test_json_cursor_writes_binary_values_as_base64(cursor):
+    conn, _ = connect(binary_values)
+
+    with conn.cursor(cursor) as cur:
+        cur.execute("SELECT * FROM t WHERE id > %s", (0,))
+        rows = json.loads(cur.fetchall_json())
+
+    assert rows == [
+        {"id": 1, "digest": "3q2+7w==", "data": "", "flags": "BQ==", "shape": "AAE="},
+        {"id": 2, "digest": None, "data": None, "flags": None, "shape": None},
+    ]
+
+
+@pytest.mark.parametrize("cursor", [cursors.JSONCursor, cursors.PreparedJSONCursor])
+def test_json_cursor_names_the_column_it_cannot_encode(cursor):
+    conv = dict(converters.conversions)
+    conv[FIELD_TYPE.GEOMETRY] = lambda value: {value}
+    conn, _ = connect(binary_values, conv=conv)
+
+    with conn.cursor(cursor) as cur:
+        with pytest.raises(err.ProgrammingError, match="column 'shape'"):
+            cur.execute("SELECT * FROM t WHERE id > %s", (0,))
+
+
+def round_trips(conn):
+    """Record the client's sends and reads; returns the log list."""
+    log = []
+    execute_command, read_packet = conn._execute_command, conn._read_packet
+
+    def send(command, sql):
+        log.append(command)
+        return execute_command(command, sql)
+
+    def read(*args, **kwargs):
+        log.append("read")
+        return read_packet(*args, **kwargs)
+
+    conn._execute_command, conn._read_packet = send, read
+    return log
+
+
+def turns(log):
+    """Number of round trips: sends followed by a read."""
+    return sum(1 for a, b in zip(log, log[1:]) if a != "read" and b == "read")
+
+
+def commands(server):
+    return [command for command, _ in server.commands]
+
+
+def test_prepared_cursor_sends_transaction_control_without_preparing():
+    conn, server = connect()
+    cur = conn.cursor(cursors.PreparedCursor)
+
+    for sql in ("BEGIN", "start transaction", "COMMIT", "ROLLBACK"):
+        cur.execute(sql)
+
+    assert commands(server) == [COMMAND.COM_QUERY] * 4
+    assert not conn._prepared_statements
+
+
+BATCH = [
+    ("BEGIN", None),
+    ("UPDATE t SET a = %s WHERE id = %s", (1, 2)),
+    ("INSERT INTO t (a) VALUES (%s)", (3,)),
+    ("UPDATE t SET a = %s WHERE id = %s", (4, 5)),
+    ("COMMIT", None),
+]
+
+
+def test_prepared_batch_prepares_new_statements_in_one_round_trip():
+    conn, server = connect(lambda server, sql: server.ok(1))
+    cur = conn.cursor(cursors.PreparedCursor)
+    log = round_trips(conn)
+
+    results = cur.execute_batch(BATCH)
+
+    assert [r.rowcount for r in results] == [1] * 5
+    P, Q, E = COMMAND.COM_STMT_PREPARE, COMMAND.COM_QUERY, COMMAND.COM_STMT_EXECUTE
+    assert commands(server) == [P, P, Q, E, E, E, Q]
+    assert turns(log) == 2
+    assert server.queries[1:4] == [
+        "UPDATE t SET a = 1 WHERE id = 2",
+        "INSERT INTO t (a) VALUES (3)",
+        "UPDATE t SET a = 4 WHERE id = 5",
+    ]
+
+    del log[:]
+    cur.execute_batch(BATCH)
+
+    assert commands(server)[7:] == [Q, E, E, E, Q]
+    assert turns(log) == 1
+
+
+def test_prepared_batch_reads_every_prepare_response_before_raising():
+    conn, server = connect(lambda server, sql: server.ok(1))
+    server.prepare_errors["SELEC ?"] = (ER.PARSE_ERROR, "You have an error")
+    cur = conn.cursor(cursors.PreparedCursor)
+
+    with pytest.raises(err.ProgrammingError, match="You have an error"):
+        cur.execute_batch(
+            [("SELEC %s", (1,)), ("UPDATE t SET a = %s", (2,)), ("COMMIT", None)]
+        )
+
+    assert commands(server) == [COMMAND.COM_STMT_PREPARE] * 2
+    assert b"UPDATE t SET a = ?" in conn._prepared_statements
+    # the connection is still in step with the server
+    assert cur.execute("UPDATE t SET a = %s", (3,)) == 1
+    assert commands(server)[-1] == COMMAND.COM_STMT_EXECUTE
@@ -0,0 +1,284 @@
+"""PyJWKClient caching tests against a JWKS endpoint served on localhost."""
+
+import base64
+import json
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import jwt
+from jwt import api_jwk, jwk_set_cache
+from jwt.jwk_set_cache import UnknownKidCache
+
+
+def oct_key(kid, secret, use="sig"):
+    k = base64.urlsafe_b64encode(secret.encode()).rstrip(b"=").decode()
+    key = {"kty": "oct", "alg": "HS256", "k": k, "use": use}
+    if kid is not None:
+        key["kid"] = kid
+    return key
+
+
+class JWKSEndpoint:
+    """Serves ``jwks`` with ``status``; responses wait while ``gate`` is clear."""
+
+    def __init__(self, url):
+        self.url = url
+        self.jwks = {"keys": [oct_key("k1", "first-secret-0123456789abcdef01")]}
+        self.status = 200
+        self.gate = threading.Event()
+        self.gate.set()
+        self.requests = 0
+        self._arrived = threading.Condition()
+
+    def arrived(self):
+        with self._arrived:
+            self.requests += 1
+            self._arrived.notify_all()
+
+    def wait_for_requests(self, count):
+        with self._arrived:
+            assert self._arrived.wait_for(lambda: self.requests >= count, timeout=5)
+
+
+@pytest.fixture
+def endpoint():
+    endpoint = None
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            endpoint.arrived()
+            endpoint.gate.wait(5)
+            body = json.dumps(endpoint.jwks).encode()
+            self.send_response(endpoint.status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    endpoint = JWKSEndpoint(f"http://127.0.0.1:{httpd.server_port}/jwks.json")
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield endpoint
+    endpoint.gate.set()
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Monotonic time seen by the JWKS caches; advance with ``clock.now += s``."""
+    clock = types.SimpleNamespace(now=1000.0)
+    fake_time = types.SimpleNamespace(monotonic=lambda: clock.now)
+    monkeypatch.setattr(jwk_set_cache, "time", fake_time)
+    monkeypatch.setattr(api_jwk, "time", fake_time)
+    return clock
+
+
+def secret(key):
+    return key.key
+
+
+def wait_for_refresh(client):
+    future = client._refresh_future
+    if future is not None:
+        future.exception(timeout=5)
+
+
+def test_signing_keys_are_indexed_by_kid_once_per_fetch(endpoint, clock):
+    endpoint.jwks = {
+        "keys": [
+            oct_key("k1", "first-secret-0123456789abcdef01"),
+            oct_key("k1", "duplicate-secret-0123456789abcd"),
+            oct_key("enc", "encryption-secret-0123456789ab", use="enc"),
+            oct_key(None, "no-kid-secret-0123456789abcdef"),
+            oct_key("k2", "second-secret-0123456789abcdef"),
+        ]
+    }
+    client = jwt.PyJWKClient(endpoint.url, unknown_kid_backoff=0)
+
+    k1 = client.get_signing_key("k1")
+    assert secret(k1) == b"first-secret-0123456789abcdef01"
+    assert client.get_signing_key("k1") is k1
+    assert secret(client.get_signing_key("k2")) == b"second-secret-0123456789abcdef"
+    assert endpoint.requests == 1
+    assert [k.key_id for k in client.get_signing_keys()] == ["k1", "k1", "k2"]
+
+    with pytest.raises(jwt.PyJWKClientError, match='matches: "enc"'):
+        client.get_signing_key("enc")
+    assert endpoint.requests == 2  # a miss refreshes once
+
+    token = jwt.encode(
+        {"sub": "user"}, "second-secret-0123456789abcdef", headers={"kid": "k2"}
+    )
+    key = client.get_signing_key_from_jwt(token)
+    assert jwt.decode(token, key, ["HS256"]) == {"sub": "user"}
+
+
+def test_stale_key_is_served_while_the_refresh_runs(endpoint, clock):
+    client = jwt.PyJWKClient(endpoint.url, lifespan=300)
+    old = client.get_signing_key("k1")
+
+    endpoint.gate.clear()
+    endpoint.jwks = {"keys": [oct_key("k1", "rotated-secret-0123456789abcdef")]}
+    clock.now += 301
+
+    # answered from the expired set without waiting for the endpoint
+    assert client.get_signing_key("k1") is old
+    endpoint.wait_for_requests(2)
+    assert client.get_signing_key("k1") is old
+    assert endpoint.requests == 2  # still one refresh in flight
+
+    endpoint.gate.set()
+    wait_for_refresh(client)
+
+    assert secret(client.get_signing_key("k1")) == b"rotated-secret-0123456789abcdef"
+    assert endpoint.requests == 2
+
+
+def test_failed_refresh_keeps_the_stale_set(endpoint, clock):
+    client = jwt.PyJWKClient(endpoint.url, lifespan=300)
+    old = client.get_signing_key("k1")
+
+    endpoint.status = 500
+    clock.now += 301
+    assert client.get_signing_key("k1") is old
+    endpoint.wait_for_requests(2)
+    wait_for_refresh(client)
+
+    assert client.get_signing_key("k1") is old  # still expired: retries
+    endpoint.wait_for_requests(3)
+    wait_for_refresh(client)
+
+
+def test_expired_set_blocks_without_stale_while_revalidate(endpoint, clock):
+    client = jwt.PyJWKClient(endpoint.url, stale_while_revalidate=False)
+    client.get_signing_key("k1")
+
+    endpoint.jwks = {"keys": [oct_key("k1", "rotated-secret-0123456789abcdef")]}
+    clock.now += 301
+
+    assert secret(client.get_signing_key("k1")) == b"rotated-secret-0123456789abcdef"
+    assert endpoint.requests == 2
+
+
+def concurrently(count, fn):
+    start = threading.Barrier(count)
+    results = [None] * count
+
+    def run(i):
+        start.wait()
+        try:
+            results[i] = fn()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def join(threads):
+    for thread in threads:
+        thread.join(5)
+        assert not thread.is_alive()
+
+
+def test_concurrent_cold_misses_share_one_fetch(endpoint, clock):
+    client = jwt.PyJWKClient(endpoint.url)
+    endpoint.gate.clear()
+
+    threads, results = concurrently(8, lambda: client.get_signing_key("k1"))
+    endpoint.wait_for_requests(1)
+    time.sleep(0.2)  # let the other callers reach the in-flight fetch
+    endpoint.gate.set()
+    join(threads)
+
+    assert all(isinstance(r, jwt.PyJWK) for r in results)
+    assert len({id(r) for r in results}) == 1
+    assert endpoint.requests == 1
+
+
+def test_concurrent_unknown_kid_misses_share_one_refresh(endpoint, clock):
+    client = jwt.PyJWKClient(endpoint.url)
+    client.get_signing_key("k1")
+    endpoint.gate.clear()
+    endpoint.jwks["keys"].append(oct_key("k2", "second-secret-0123456789abcdef"))
+
+    threads, results = concurrently(8, lambda: client.get_signing_key("k2"))
+    endpoint.wait_for_requests(2)
+    time.sleep(0.2)
+    endpoint.gate.set()
+    join(threads)
+
+    assert all(isinstance(r, jwt.PyJWK) and r.key_id == "k2" for r in results)
+    assert endpoint.requests == 2
+
+
+def test_unknown_kid_is_not_refetched_during_backoff(endpoint, clock):
+    client = jwt.PyJWKClient(
+        endpoint.url, unknown_kid_backoff=30, max_unknown_kid_backoff=300
+    )
+    client.get_signing_key("k1")
+
+    def lookup():
+        with pytest.raises(jwt.PyJWKClientError, match='matches: "new"'):
+            client.get_signing_key("new")
+
+    lookup()
+    assert endpoint.requests == 2
+    lookup()
+    clock.now += 29
+    lookup()
+    assert endpoint.requests == 2
+
+    clock.now += 2  # 30s backoff over: refetch, still missing, wait 60s
+    lookup()
+    assert endpoint.requests == 3
+    clock.now += 59
+    lookup()
+    assert endpoint.requests == 3
+
+    endpoint.jwks["keys"].append(oct_key("new", "new-secret-0123456789abcdef012"))
+    clock.now += 2
+    assert client.get_signing_key("new").key_id == "new"
+    assert endpoint.requests == 4
+    assert not client.unknown_kids.is_blocked("new")
+
+
+def test_unknown_kid_backoff_doubles_up_to_the_cap(clock):
+    cache = UnknownKidCache(30, 100)
+    retry_after = []
+    for _ in range(4):
+        cache.add("kid")
+        retry_after.append(cache._entries["kid"][0] - clock.now)
+
+    assert retry_after == [30, 60, 100, 100]
+    assert cache.is_blocked("kid")
+    clock.now += 100
+    assert not cache.is_blocked("kid")
+
+
+def test_unknown_kid_cache_is_bounded(clock):
+    cache = UnknownKidCache(30, 300, maxsize=3)
+    for kid in ("a", "b", "c", "d"):
+        cache.add(kid)
+
+    assert [cache.is_blocked(kid) for kid in "abcd"] == [False, True, True, True]
+    cache.discard("c")
+    assert not cache.is_blocked("c")
+
+
+def test_unknown_kid_cache_disabled_with_zero_backoff(clock):
+    cache = UnknownKidCache(0, 300)
+    cache.add("kid")
+
+    assert not cache.is_blocked("kid")
@@ -0,0 +1,217 @@
+"""jwt.Verifier and jwt.decode_many must agree with jwt.decode on every token."""
+
+import base64
+import json
+import time
+
+import pytest
+
+import jwt
+
+KEY = "secret-key-for-tests-0123456789ab"
+NOW = int(time.time())
+
+
+def segment(data):
+    if not isinstance(data, bytes):
+        data = json.dumps(data).encode()
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def token(payload, key=KEY, algorithm="HS256", headers=None):
+    return jwt.encode(payload, key, algorithm=algorithm, headers=headers)
+
+
+def signed(header, payload):
+    """A token with an arbitrary header and payload segment, signed with KEY."""
+    signing_input = f"{segment(header)}.{segment(payload)}"
+    algorithm = jwt.get_algorithm_by_name("HS256")
+    signature = algorithm.sign(signing_input.encode(), algorithm.prepare_key(KEY))
+    return f"{signing_input}.{segment(signature)}"
+
+
+CLAIMS = {"sub": "user", "iss": "me", "aud": "svc", "iat": NOW, "exp": NOW + 600}
+
+TOKENS = {
+    "valid": token(CLAIMS),
+    "valid bytes": token(CLAIMS).encode(),
+    "minimal": token({"hello": "world"}),
+    "expired": token({**CLAIMS, "exp": NOW - 100}),
+    "expired within leeway": token({**CLAIMS, "exp": NOW - 10}),
+    "exp not a number": token({**CLAIMS, "exp": "soon"}),
+    "not yet valid": token({**CLAIMS, "nbf": NOW + 100}),
+    "nbf within leeway": token({**CLAIMS, "nbf": NOW + 10}),
+    "nbf not a number": token({**CLAIMS, "nbf": "later"}),
+    "issued in the future": token({**CLAIMS, "iat": NOW + 100}),
+    "iat not a number": token({**CLAIMS, "iat": "now"}),
+    "audience list": token({**CLAIMS, "aud": ["other", "svc"]}),
+    "other audience": token({**CLAIMS, "aud": "other"}),
+    "audience not a string": token({**CLAIMS, "aud": 5}),
+    "no audience": token({k: v for k, v in CLAIMS.items() if k != "aud"}),
+    "other issuer": token({**CLAIMS, "iss": "them"}),
+    "no issuer": token({k: v for k, v in CLAIMS.items() if k != "iss"}),
+    "other subject": token({**CLAIMS, "sub": "someone"}),
+    "subject not a string": token({**CLAIMS, "sub": 42}),
+    "no subject": token({k: v for k, v in CLAIMS.items() if k != "sub"}),
+    "jti not a string": token({**CLAIMS, "jti": 7}),
+    "null claim": token({**CLAIMS, "sub": None}),
+    "wrong key": token(CLAIMS, key="another-key-for-tests-0123456789"),
+    "HS512": token(CLAIMS, algorithm="HS512"),
+    "alg none": f"{segment({'alg': 'none'})}.{segment(CLAIMS)}.",
+    "no alg": signed({"typ": "JWT"}, CLAIMS),
+    "alg not a string": signed({"alg": 256}, CLAIMS),
+    "header not an object": signed([1], CLAIMS),
+    "header not json": f"{segment(b'{nope')}.{segment(CLAIMS)}.sig",
+    "header bad padding": f"a.{segment(CLAIMS)}.sig",
+    "payload not an object": signed({"alg": "HS256"}, [1, 2]),
+    "payload not json": signed({"alg": "HS256"}, b"{nope"),
+    "one segment": "abc",
+    "two segments": "abc.def",
+    "not a token": 12345,
+}
+
+SETTINGS = {
+    "defaults": {},
+    "expected claims": {"audience": "svc", "issuer": "me", "subject": "user"},
+    "issuer list": {"audience": ["svc", "x"], "issuer": ["them", "me"]},
+    "leeway": {"audience": "svc", "leeway": 30},
+    "strict audience": {"audience": "svc", "options": {"strict_aud": True}},
+    "required claims": {
+        "audience": "svc",
+        "options": {"require": ["exp", "iat", "sub", "jti"]},
+    },
+    "no exp/aud checks": {"options": {"verify_exp": False, "verify_aud": False}},
+    "no signature check": {"options": {"verify_signature": False}},
+    "two algorithms": {"audience": "svc", "algorithms": ["HS512", "HS256"]},
+}
+
+
+def outcome(fn, *args, **kwargs):
+    try:
+        return ("ok", fn(*args, **kwargs))
+    except jwt.PyJWTError as e:
+        return (type(e), str(e))
+
+
+def decode_outcome(tok, settings):
+    settings = dict(settings)
+    algorithms = settings.pop("algorithms", ["HS256"])
+    return outcome(lambda: jwt.decode(tok, KEY, algorithms, **settings))
+
+
+def verifier(settings):
+    settings = dict(settings)
+    algorithms = settings.pop("algorithms", ["HS256"])
+    return jwt.Verifier(KEY, algorithms, **settings)
+
+
+@pytest.mark.parametrize("settings", SETTINGS.values(), ids=SETTINGS.keys())
+@pytest.mark.parametrize("name", TOKENS)
+def test_verifier_matches_decode(name, settings):
+    tok = TOKENS[name]
+
+    assert outcome(verifier(settings).verify, tok) == decode_outcome(tok, settings)
+
+
+@pytest.mark.parametrize("settings", SETTINGS.values(), ids=SETTINGS.keys())
+def test_verifier_complete_matches_decode_complete(settings):
+    settings = dict(settings)
+    algorithms = settings.pop("algorithms", ["HS256"])
+    tok = TOKENS["valid"]
+
+    expected = outcome(jwt.api_jwt.decode_complete, tok, KEY, algorithms, **settings)
+    v = jwt.Verifier(KEY, algorithms, **settings)
+
+    assert outcome(v.verify_complete, tok) == expected
+
+
+def test_verifier_is_reusable_and_checks_time_per_call(monkeypatch):
+    v = jwt.Verifier(KEY, ["HS256"])
+    now = int(time.time())
+    tok = token({"exp": now + 60})
+    assert v.verify(tok) == {"exp": now + 60}
+
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+    with pytest.raises(jwt.ExpiredSignatureError):
+        v.verify(tok)
+
+
+def test_verifier_rejects_missing_algorithms_like_decode():
+    with pytest.raises(jwt.DecodeError) as decode_error:
+        jwt.decode(TOKENS["valid"], KEY)
+    with pytest.raises(jwt.DecodeError) as verifier_error:
+        jwt.Verifier(KEY)
+
+    assert str(verifier_error.value) == str(decode_error.value)
+
+
+@pytest.mark.parametrize("settings", SETTINGS.values(), ids=SETTINGS.keys())
+def test_decode_many_matches_decode(settings):
+    settings = dict(settings)
+    algorithms = settings.pop("algorithms", ["HS256"])
+    tokens = list(TOKENS.values())
+
+    results = list(jwt.decode_many(iter(tokens), KEY, algorithms, **settings))
+    settings["algorithms"] = algorithms
+    expected = [decode_outcome(tok, settings) for tok in tokens]
+    assert len(results) == len(tokens)
+    for result, (kind, value) in zip(results, expected):
+        if kind == "ok":
+            assert result.ok and result.payload == value
+        else:
+            assert not result.ok and result.payload is None
+            assert (type(result.error), str(result.error)) == (kind, value)
+
+
+def test_decode_many_is_lazy():
+    consumed = []
+
+    def tokens():
+        for name in ("valid", "expired", "wrong key"):
+            consumed.append(name)
+            yield TOKENS[name]
+
+    results = jwt.decode_many(tokens(), KEY, ["HS256"], audience="svc")
+    assert consumed == []
+    assert next(results).ok
+    assert consumed == ["valid"]
+    assert [type(r.error) for r in results] == [
+        jwt.ExpiredSignatureError,
+        jwt.InvalidSignatureError,
+    ]
+
+
+def test_decode_many_in_worker_processes_matches_decode():
+    pytest.importorskip("cryptography")
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    other_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    tokens = [
+        jwt.encode({**CLAIMS, "n": i}, private_key, algorithm="RS256")
+        for i in range(20)
+    ]
+    tokens[3] = jwt.encode(CLAIMS, other_key, algorithm="RS256")
+    tokens[7] = jwt.encode({**CLAIMS, "exp": NOW - 100}, private_key, "RS256")
+    tokens[11] = "abc.def"
+
+    results = list(
+        jwt.decode_many(
+            tokens, public_pem, ["RS256"], audience="svc", max_workers=2, chunksize=3
+        )
+    )
+
+    expected = [
+        outcome(jwt.decode, tok, public_pem, ["RS256"], audience="svc")
+        for tok in tokens
+    ]
+    assert [
+        ("ok", r.payload) if r.ok else (type(r.error), str(r.error)) for r in results
+    ] == expected
+    assert [r.payload["n"] for r in results if r.ok] == [
+        i for i in range(20) if i not in (3, 7, 11)
+    ]
@@ -0,0 +1,218 @@
+"""Handler tests with get_conn routed to fake_mysql servers."""
+
+import base64
+import datetime
+import io
+import json
+import types
+import zipfile
+
+import pytest
+
+pytest.importorskip("Crypto")
+
+import pymysql  # noqa: E402
+import lambda_function as lf  # noqa: E402
+from pymysql.constants import FIELD_TYPE  # noqa: E402
+
+from fake_mysql import connect, ok_handler  # noqa: E402
+
+
+class Database:
+    """Stands in for the MySQL server; every new connection gets a fresh server."""
+
+    def __init__(self):
+        self.handler = ok_handler
+        self.servers = []
+
+    def connect(self):
+        conn, server = connect(
+            lambda server, sql: self.handler(server, sql),
+            cursorclass=pymysql.cursors.PreparedDictCursor,
+        )
+        self.servers.append(server)
+        return conn
+
+    @property
+    def queries(self):
+        return [" ".join(q.split()) for server in self.servers for q in server.queries]
+
+
+@pytest.fixture
+def database(monkeypatch):
+    lf._discard_conn()
+    db = Database()
+    monkeypatch.setattr(lf, "_new_conn", db.connect)
+    yield db
+    lf._discard_conn()
+
+
+def event(method, path, body=None, query=None, headers=None):
+    token = lf.issue_jwt("org1")
+    return {
+        "rawPath": path,
+        "requestContext": {"http": {"method": method}},
+        "headers": {"Authorization": "Bearer " + token, **(headers or {})},
+        "body": body,
+        "queryStringParameters": query,
+    }
+
+
+def server_time(server, sql):
+    now = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    server.result([("server_time", FIELD_TYPE.DATETIME)], [(now,)])
+
+
+def test_get_is_retried_once_when_the_warm_connection_died(database):
+    database.handler = server_time
+    assert lf.handler(event("GET", "/"), None)["statusCode"] == 200
+    database.servers[0].close()
+
+    resp = lf.handler(event("GET", "/"), None)
+
+    assert resp["statusCode"] == 200
+    assert json.loads(resp["body"])["data"] == [{"server_time": "2024-01-02 03:04:05"}]
+    assert len(database.servers) == 2
+
+
+def test_get_is_not_retried_more_than_once(database):
+    database.handler = lambda server, sql: server.close()
+
+    resp = lf.handler(event("GET", "/"), None)
+
+    assert resp["statusCode"] == 500
+    assert len(database.servers) == 2
+
+
+def test_write_is_not_retried_when_the_connection_died(database):
+    database.handler = lambda server, sql: server.ok(1)
+    lf.handler(event("DELETE", "/businesses/5"), None)
+    database.servers[0].close()
+
+    resp = lf.handler(event("DELETE", "/businesses/5"), None)
+
+    assert resp["statusCode"] == 500
+    assert len(database.servers) == 1
+    # the next request reconnects
+    assert lf.handler(event("DELETE", "/businesses/5"), None)["statusCode"] == 200
+    assert len(database.servers) == 2
+
+
+def test_authorization_header_name_is_case_insensitive(database):
+    database.handler = lambda server, sql: server.ok(1)
+    request = event("DELETE", "/businesses/5")
+    # HTTP API payloads carry lower-cased header names
+    request["headers"] = {"authorization": request["headers"]["Authorization"]}
+
+    assert lf.handler(request, None)["statusCode"] == 200
+
+    request["headers"] = {}
+    assert lf.handler(request, None)["statusCode"] == 401
+
+
+def targets_after_cursor(server, sql):
+    if "BIT_XOR" in sql:  # _targets_version
+        version = (3, datetime.datetime(2024, 1, 2, 3, 4, 5), 7)
+        server.result(
+            [
+                ("cnt", FIELD_TYPE.LONGLONG),
+                ("max_updated_at", FIELD_TYPE.DATETIME),
+                ("checksum", FIELD_TYPE.LONGLONG),
+            ],
+            [version],
+        )
+    elif "t.target_id < 3" in sql:
+        server.result([("id", FIELD_TYPE.LONGLONG)], [(2,), (1,)])
+    else:
+        server.result([("id", FIELD_TYPE.LONGLONG)], [(3,), (2,), (1,)])
+
+
+def test_targets_cursor_without_limit_returns_the_rest(database):
+    database.handler = targets_after_cursor
+    last = types.SimpleNamespace(
+        created_at=datetime.datetime(2024, 1, 2, 3, 4, 5), target_id=3
+    )
+    cursor = lf._encode_cursor(last)
+
+    resp = lf.handler(
+        event("GET", "/businesses/5/targets", query={"cursor": cursor}), None
+    )
+
+    assert resp["statusCode"] == 200
+    body = json.loads(resp["body"])
+    assert body["data"] == [{"id": 2}, {"id": 1}]
+    assert body["nextCursor"] is None
+    assert "t.created_at < '2024-01-02 03:04:05'" in database.queries[-1]
+
+    resp = lf.handler(event("GET", "/businesses/5/targets"), None)
+    assert json.loads(resp["body"])["data"] == [{"id": 3}, {"id": 2}, {"id": 1}]
+
+
+GROUP_COLUMNS = [
+    (name, FIELD_TYPE.VAR_STRING)
+    for name in (
+        "group_name",
+        "zipcode",
+        "address1",
+        "address2",
+        "contact_name",
+        "mobile_phone",
+        "office_phone",
+    )
+]
+TARGET_COLUMNS = [
+    (name, FIELD_TYPE.VAR_STRING)
+    for name in (
+        "target_name",
+        "target_type",
+        "target_gubun",
+        "zipcode",
+        "address1",
+        "address2",
+        "mobile_phone",
+        "office_phone",
+        "apply_reason",
+        "directions",
+    )
+]
+
+
+def roster(count):
+    def handler(server, sql):
+        if "FROM nm_groups" in sql:
+            group = ("나눔", "01234", "서울", "1층", "담당", "01012345678", None)
+            server.result(GROUP_COLUMNS, [group])
+        else:
+            rows = [
+                (f"대상자{i}", "일반", "1인", "01234", "서울", f"{i}호",
+                 "01012345678", None, "사유 " * 20, None)
+                for i in range(count)
+            ]
+            server.result(TARGET_COLUMNS, rows)
+
+    return handler
+
+
+def test_export_encodes_the_file_in_chunks(database, monkeypatch):
+    database.handler = roster(300)
+    monkeypatch.setattr(lf, "_EXPORT_B64_CHUNK", 3 * 1000)
+
+    resp = lf.handler(event("GET", "/businesses/5/targets/export.xlsx"), None)
+
+    assert resp["statusCode"] == 200
+    assert resp["isBase64Encoded"]
+    data = base64.b64decode(resp["body"], validate=True)
+    assert len(data) > 3 * 1000
+    with zipfile.ZipFile(io.BytesIO(data)) as xlsx:
+        sheet = xlsx.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert "대상자0" in sheet and "대상자299" in sheet
+
+
+def test_export_over_the_response_limit_is_413(database, monkeypatch):
+    database.handler = roster(300)
+    monkeypatch.setattr(lf, "EXPORT_MAX_BODY_BYTES", 4096)
+
+    resp = lf.handler(event("GET", "/businesses/5/targets/export.xlsx"), None)
+
+    assert resp["statusCode"] == 413
+    assert "300명" in json.loads(resp["body"])["message"]
@@ -0,0 +1,50 @@
+"""Observer hook tests against the fake_mysql server."""
+
+import warnings
+
+from pymysql.observers import ConnectionObserver, fingerprint
+
+from fake_mysql import connect
+
+
+class Recording(ConnectionObserver):
+    def __init__(self):
+        self.results = []
+
+    def after_result(self, conn, sql, stats, error):
+        self.results.append((fingerprint(sql), stats.rows, error))
+
+
+class Failing(ConnectionObserver):
+    def before_command(self, conn, command, sql):
+        raise ValueError("observer bug")
+
+    def after_result(self, conn, sql, stats, error):
+        raise ValueError("observer bug")
+
+
+def test_observer_exception_does_not_fail_query():
+    conn, server = connect()
+    recording = Recording()
+    conn.add_observer(Failing())
+    conn.add_observer(recording)
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        rows = conn.cursor().execute("UPDATE t SET a = 1")
+
+    assert rows == 1
+    assert len(server.commands) == 1
+    assert recording.results == [("UPDATE t SET a = ?", 0, None)]
+    assert [w.category for w in caught] == [RuntimeWarning] * 2
+    assert "Failing.before_command raised ValueError" in str(caught[0].message)
+
+
+def test_observer_gets_bytes_for_bytearray_statements():
+    conn, _ = connect()
+    recording = Recording()
+    conn.add_observer(recording)
+
+    conn.cursor().execute(bytearray(b"UPDATE t SET a = 1"))
+
+    assert recording.results == [("UPDATE t SET a = ?", 0, None)]